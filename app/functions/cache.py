@@ -0,0 +1,87 @@
+"""
+Process-wide TTL cache with single-flight loading
+"""
+import threading
+import time
+
+
+class _Flight:
+    """Satu proses load yang sedang berjalan untuk sebuah key"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Cache in-memory dengan TTL per entry.
+
+    `get_or_load()` menjamin hanya satu thread yang menjalankan loader untuk
+    key yang sama; thread lain yang miss pada saat bersamaan menunggu hasil
+    load tersebut (single-flight). Error dari loader tidak di-cache.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = float(ttl)
+        self._data = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key, loader):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = loader()
+            flight.value = value
+            with self._lock:
+                self._data[key] = (time.monotonic() + self.ttl, value)
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def invalidate(self, predicate=None):
+        """Hapus semua entry, atau hanya entry yang key-nya lolos `predicate`"""
+        with self._lock:
+            if predicate is None:
+                removed = len(self._data)
+                self._data.clear()
+            else:
+                keys = [key for key in self._data if predicate(key)]
+                for key in keys:
+                    del self._data[key]
+                removed = len(keys)
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'ttl': self.ttl
+            }
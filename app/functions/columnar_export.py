@@ -0,0 +1,190 @@
+"""
+Columnar export (CSV/Parquet/Arrow) of Odoo records read in batches
+"""
+import csv
+import io
+from flask import Response, stream_with_context
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow opsional, tanpa pyarrow hanya CSV
+    pa = None
+    pq = None
+
+# format -> (mimetype, ekstensi file, butuh pyarrow)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv', False),
+    'parquet': ('application/vnd.apache.parquet', 'parquet', True),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows', True),
+}
+
+# Tipe field Odoo -> jenis kolom; tipe lain (char, text, selection, ...) jadi string
+_KINDS = {
+    'integer': 'int',
+    'float': 'float',
+    'monetary': 'float',
+    'boolean': 'bool',
+    'date': 'date',
+    'datetime': 'datetime',
+    'many2one': 'many2one',
+}
+
+
+def available_formats():
+    """Format export yang bisa dilayani dengan package yang ter-install"""
+    return [name for name, (_, _, needs_arrow) in EXPORT_FORMATS.items() if pa is not None or not needs_arrow]
+
+
+def export_columns(fields, fields_meta):
+    """
+    Susun kolom export dari list (nama kolom, field sumber).
+
+    Jenis kolom diambil dari tipe field di `fields_meta` (hasil fields_get).
+    Field many2one dipecah menjadi dua kolom: `<nama>_id` dan `<nama>` (nama record).
+
+    Returns:
+        list: (nama kolom, field sumber, jenis kolom)
+    """
+    columns = []
+    for name, source in fields:
+        kind = 'int' if source == 'id' else _KINDS.get(fields_meta.get(source, {}).get('type'), 'str')
+        if kind == 'many2one':
+            columns.append((f'{name}_id', source, 'many2one_id'))
+            columns.append((name, source, 'many2one_name'))
+        else:
+            columns.append((name, source, kind))
+    return columns
+
+
+def _column_values(records, source, kind):
+    """Nilai satu kolom untuk satu batch; False dari Odoo (field kosong) menjadi None"""
+    values = [record.get(source) for record in records]
+    if kind == 'bool':
+        return [None if value is None else bool(value) for value in values]
+    if kind == 'many2one_id':
+        return [value[0] if isinstance(value, list) and value else None for value in values]
+    if kind == 'many2one_name':
+        return [value[1] if isinstance(value, list) and len(value) >= 2 else None for value in values]
+    return [None if value is False else value for value in values]
+
+
+def _iter_csv(batches, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _, _ in columns])
+    yield buffer.getvalue().encode('utf-8')
+    for records in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(zip(*(_column_values(records, source, kind) for _, source, kind in columns)))
+        yield buffer.getvalue().encode('utf-8')
+
+
+def arrow_schema(columns):
+    """Schema pyarrow untuk kolom export (datetime Odoo selalu UTC)"""
+    types = {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'bool': pa.bool_(),
+        'date': pa.date32(),
+        'datetime': pa.timestamp('s', tz='UTC'),
+        'many2one_id': pa.int64(),
+    }
+    return pa.schema([(name, types.get(kind, pa.string())) for name, _, kind in columns])
+
+
+def _record_batch(records, columns, schema):
+    arrays = []
+    for (_, source, kind), field in zip(columns, schema):
+        values = _column_values(records, source, kind)
+        if kind == 'date':
+            arrays.append(pa.array(values, pa.string()).cast(field.type))
+        elif kind == 'datetime':
+            # Odoo mengirim datetime UTC sebagai string 'YYYY-MM-DD HH:MM:SS' tanpa offset
+            arrays.append(pa.array(values, pa.string()).cast(pa.timestamp('s')).cast(field.type))
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink:
+    """File-like tujuan writer pyarrow: tampung byte yang ditulis sampai diambil (drain)"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _iter_arrow(batches, columns, fmt):
+    schema = arrow_schema(columns)
+    sink = _ChunkSink()
+    if fmt == 'parquet':
+        # Satu row group per batch; footer ditulis saat close
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    yield sink.drain()
+    for records in batches:
+        writer.write_batch(_record_batch(records, columns, schema))
+        yield sink.drain()
+    # Writer hanya ditutup jika semua batch berhasil: export yang gagal di
+    # tengah jalan tidak menghasilkan file yang terlihat lengkap
+    writer.close()
+    yield sink.drain()
+
+
+def iter_export(batches, columns, fmt):
+    """
+    Generator byte export: setiap batch record diubah ke kolom bertipe lalu
+    ditulis dan dikirim sebelum batch berikutnya dibaca (memori terbatas
+    pada satu batch).
+
+    Args:
+        batches: Iterable list record (mis. iter_search_read)
+        columns: Hasil export_columns()
+        fmt: 'csv', 'parquet' atau 'arrow' (Arrow IPC stream)
+    """
+    chunks = _iter_csv(batches, columns) if fmt == 'csv' else _iter_arrow(batches, columns, fmt)
+    for chunk in chunks:
+        if chunk:
+            yield chunk
+
+
+def export_response(batches, columns, fmt, filename):
+    """Streaming response export sebagai attachment `<filename>.<ekstensi>`"""
+    mimetype, extension, _ = EXPORT_FORMATS[fmt]
+
+    def generate():
+        try:
+            yield from iter_export(batches, columns, fmt)
+        except Exception as e:
+            # Status 200 sudah terkirim: putuskan stream agar client tahu export tidak lengkap
+            print(f"{filename} {fmt} export failed: {e}")
+            raise
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{extension}"'}
+    )
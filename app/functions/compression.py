@@ -0,0 +1,103 @@
+"""
+Kompresi response (gzip/brotli) berdasarkan Accept-Encoding
+"""
+import zlib
+from flask import request
+from config import Config
+
+try:
+    import brotli
+except ImportError:  # brotli opsional, tanpa package-nya hanya gzip
+    brotli = None
+
+# Mimetype yang layak dikompres (JSON/teks sangat repetitif)
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/html', 'text/plain', 'text/csv')
+
+
+def available_encodings():
+    """Encoding yang didukung server, urutan = preferensi saat kualitas sama"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def _gzip_compressor():
+    # wbits 31 = container gzip (header + trailer CRC32)
+    return zlib.compressobj(Config.COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+
+
+def compress_bytes(data, encoding):
+    """Kompres seluruh body sekaligus"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=Config.COMPRESSION_BR_LEVEL)
+    compressor = _gzip_compressor()
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks, encoding):
+    """
+    Kompres iterable chunk secara incremental (untuk response generator).
+
+    Compressor di-flush setelah setiap chunk asal, jadi tiap chunk (mis.
+    satu batch export) langsung terkirim ke client tanpa menunggu akhir
+    stream; iterable asal ditutup saat stream selesai atau client memutus
+    koneksi.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=Config.COMPRESSION_BR_LEVEL)
+        process, finish = compressor.process, compressor.finish
+        flush = compressor.flush
+    else:
+        compressor = _gzip_compressor()
+        process, finish = compressor.compress, compressor.flush
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if not chunk:
+                continue
+            out = process(chunk) + flush()
+            if out:
+                yield out
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def compress_response(response):
+    """
+    Hook after_request: kompres response jika client mendukung dan layak.
+
+    Response biasa hanya dikompres jika ukurannya >= COMPRESSION_MIN_SIZE;
+    response streaming (ukuran tidak diketahui) selalu dikompres per chunk.
+    """
+    if not Config.COMPRESSION_ENABLED:
+        return response
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return response
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < Config.COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(compress_bytes(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    """Pasang kompresi response pada aplikasi Flask"""
+    app.after_request(compress_response)
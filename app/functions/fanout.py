@@ -0,0 +1,112 @@
+"""
+Request-scoped fan-out for independent Odoo calls
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from config import Config
+from app.models.odoo_connection import odoo
+
+# Worker dibatasi sebesar pool koneksi Odoo agar tidak menunggu checkout
+_executor = ThreadPoolExecutor(max_workers=Config.ODOO_POOL_SIZE, thread_name_prefix='odoo-fanout')
+_local = threading.local()
+
+
+class FanOutTimeout(Exception):
+    """Sebagian call fan-out belum selesai dalam batas waktu"""
+
+
+def _run_in_worker(fn, args, kwargs):
+    _local.in_worker = True
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _local.in_worker = False
+
+
+class FanOut:
+    """
+    Kumpulan call independen dalam satu request yang dijalankan paralel.
+
+    Handler mendaftarkan call lewat `execute_kw()` / `call()` lalu memanggil
+    `gather()` untuk mengambil semua hasil sesuai urutan pendaftaran. Latensi
+    total menjadi kira-kira latensi call terlama, bukan jumlah semuanya.
+
+    Jika dipakai dari dalam worker fan-out (nested), call dijalankan langsung
+    di thread tersebut supaya pool tidak saling menunggu (deadlock).
+
+    Contoh:
+        with FanOut() as fan:
+            fan.execute_kw('sale.order', 'search_read', [domain], {...})
+            fan.execute_kw('sale.order', 'search_count', [domain])
+            quotes, total = fan.gather()
+    """
+
+    def __init__(self, client=None, timeout=None):
+        self.client = client or odoo
+        self.timeout = Config.ODOO_FANOUT_TIMEOUT if timeout is None else timeout
+        self._futures = []
+
+    def call(self, fn, *args, **kwargs):
+        """Daftarkan callable; fn None menghasilkan None tanpa memakai worker"""
+        if fn is None or getattr(_local, 'in_worker', False):
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs) if fn is not None else None)
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = _executor.submit(_run_in_worker, fn, args, kwargs)
+        self._futures.append(future)
+        return future
+
+    def execute_kw(self, model, method, args=None, kwargs=None):
+        """Daftarkan satu `execute_kw` Odoo"""
+        return self.call(self.client.execute_kw, model, method, args, kwargs)
+
+    def gather(self):
+        """
+        Tunggu semua call dan kembalikan hasilnya (urutan sama dengan pendaftaran).
+
+        Raises:
+            FanOutTimeout: jika belum selesai setelah `timeout` detik
+            Exception: error pertama (sesuai urutan pendaftaran) dari call
+        """
+        futures, self._futures = self._futures, []
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        for future in futures:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                future.exception(timeout=remaining)
+            except FutureTimeoutError:
+                self._cancel(futures)
+                raise FanOutTimeout(f'Odoo calls did not finish within {self.timeout}s')
+        return [future.result() for future in futures]
+
+    def _cancel(self, futures):
+        # Call yang sudah berjalan tetap selesai; yang masih antre dibatalkan
+        for future in futures:
+            future.cancel()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cancel(self._futures)
+        self._futures = []
+        return False
+
+
+def run_concurrently(*calls, timeout=None):
+    """
+    Jalankan beberapa callable tanpa argumen secara paralel.
+
+    Callable yang bernilai None dilewati (hasilnya None).
+
+    Returns:
+        list: Hasil tiap callable, urutan sama dengan argumen
+    """
+    with FanOut(timeout=timeout) as fan:
+        for call in calls:
+            fan.call(call)
+        return fan.gather()
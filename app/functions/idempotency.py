@@ -0,0 +1,208 @@
+"""
+Idempotency-Key support for POST endpoints that create records in Odoo
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response
+from config import Config
+from app.functions.odoo_functions import ordered_jsonify
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+class _Flight:
+    """Eksekusi pertama yang sedang berjalan untuk sebuah key"""
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def add_done_callback(self, callback):
+        """Panggil `callback()` saat eksekusi selesai (langsung jika sudah selesai)"""
+        with self._lock:
+            if not self.event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def done(self):
+        with self._lock:
+            self.event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+class IdempotencyStore:
+    """
+    Penyimpanan response per Idempotency-Key (LRU in-memory dengan TTL).
+
+    Key di-scope per endpoint dan disertai fingerprint (hash body request):
+    key yang sama dengan body berbeda ditolak. Hanya response final (2xx/4xx)
+    yang disimpan; response 5xx tidak disimpan supaya client bisa mencoba
+    lagi. Request duplikat yang datang saat eksekusi pertama masih berjalan
+    menunggu hasilnya alih-alih ikut memanggil Odoo.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = float(ttl)
+        self.max_entries = max(1, int(max_entries))
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.replays = 0
+        self.waits = 0
+
+    def begin(self, key, fingerprint):
+        """
+        Daftarkan eksekusi untuk `key`.
+
+        Returns:
+            tuple: ('replay', (body, status)) jika response sudah tersimpan,
+                ('mismatch', None) jika key dipakai untuk body lain,
+                ('wait', flight) jika eksekusi lain sedang berjalan,
+                ('run', flight) jika pemanggil harus menjalankan request
+                lalu memanggil `finish()`
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is not None:
+                if entry[1] != fingerprint:
+                    return 'mismatch', None
+                self._data.move_to_end(key)
+                self.replays += 1
+                return 'replay', entry[2]
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                if flight.fingerprint != fingerprint:
+                    return 'mismatch', None
+                self.waits += 1
+                return 'wait', flight
+
+            flight = _Flight(fingerprint)
+            self._inflight[key] = flight
+            return 'run', flight
+
+    def finish(self, key, flight, body=None, status=None):
+        """Simpan hasil eksekusi (body None = gagal, tidak disimpan) dan bangunkan yang menunggu"""
+        with self._lock:
+            if body is not None and status < 500:
+                self._data[key] = (time.monotonic() + self.ttl, flight.fingerprint, (body, status))
+                self._data.move_to_end(key)
+                while len(self._data) > self.max_entries:
+                    self._data.popitem(last=False)
+            self._inflight.pop(key, None)
+        flight.done()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'in_flight': len(self._inflight),
+                'replays': self.replays,
+                'waits': self.waits,
+                'ttl': self.ttl
+            }
+
+
+idempotency_store = IdempotencyStore(Config.IDEMPOTENCY_TTL, Config.IDEMPOTENCY_MAX_ENTRIES)
+
+
+def fingerprint(body):
+    """
+    Hash body request. Body JSON dinormalisasi dulu (urutan key, spasi)
+    supaya retry dari client lain dengan isi yang sama tetap cocok.
+    """
+    body = body or b''
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(',', ':')).encode('utf-8')
+    except ValueError:
+        pass
+    return hashlib.sha256(body).hexdigest()
+
+
+def validate_key(key):
+    """Pesan error jika Idempotency-Key tidak valid, None jika valid"""
+    if not key.strip() or len(key) > MAX_KEY_LENGTH:
+        return f'{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters'
+    return None
+
+
+def mismatch_response():
+    return {
+        'success': False,
+        'error': f'{IDEMPOTENCY_HEADER} was already used with a different request body'
+    }, 422
+
+
+def in_progress_response():
+    return {
+        'success': False,
+        'error': f'A request with this {IDEMPOTENCY_HEADER} is still being processed'
+    }, 409
+
+
+def idempotent(scope):
+    """
+    Decorator route POST: dukung header Idempotency-Key.
+
+    Tanpa header, route berjalan seperti biasa. Dengan header, response
+    pertama disimpan dan request ulang dengan key yang sama mendapat
+    response itu lagi (header `Idempotent-Replayed: true`) tanpa menyentuh
+    Odoo. View harus mengembalikan response JSON.
+
+    Args:
+        scope: Nama endpoint; key yang sama di endpoint berbeda tidak bentrok
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if key is None:
+                return f(*args, **kwargs)
+            error = validate_key(key)
+            if error:
+                return ordered_jsonify({'success': False, 'error': error}), 400
+
+            store_key = (scope, key)
+            body_hash = fingerprint(request.get_data())
+            deadline = time.monotonic() + Config.IDEMPOTENCY_WAIT_TIMEOUT
+            while True:
+                state, value = idempotency_store.begin(store_key, body_hash)
+                if state == 'replay':
+                    response = make_response(ordered_jsonify(value[0]), value[1])
+                    response.headers[REPLAYED_HEADER] = 'true'
+                    return response
+                if state == 'mismatch':
+                    body, status = mismatch_response()
+                    return ordered_jsonify(body), status
+                if state == 'run':
+                    break
+                # Eksekusi pertama masih berjalan: tunggu, lalu cek ulang
+                # (jika eksekusi pertama gagal, request ini yang menjalankan)
+                if not value.event.wait(max(0.0, deadline - time.monotonic())):
+                    body, status = in_progress_response()
+                    return ordered_jsonify(body), status
+
+            result = None
+            try:
+                response = make_response(f(*args, **kwargs))
+                if response.is_json:
+                    result = (response.get_json(), response.status_code)
+                return response
+            finally:
+                idempotency_store.finish(store_key, value, *(result or ()))
+        return decorated_function
+    return decorator
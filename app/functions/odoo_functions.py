@@ -1,108 +1,121 @@
 """
 Odoo helper functions for data retrieval
 """
-from flask import Response
-import json
+from flask import Response, request, stream_with_context, has_request_context
 from collections import OrderedDict
+from app.functions.serializers import dumps
+
+def wants_pretty():
+    """True jika client meminta output JSON yang di-indent (?pretty=1)"""
+    if not has_request_context():
+        return False
+    return str(request.args.get('pretty', '')).strip().lower() in ('1', 'true', 'yes')
 
 def ordered_jsonify(data):
-    """Custom jsonify that preserves field order"""
+    """Custom jsonify that preserves field order (compact, ?pretty=1 untuk indent)"""
     return Response(
-        json.dumps(data, ensure_ascii=False, indent=2),
+        dumps(data, pretty=wants_pretty()),
         mimetype='application/json'
     )
 
-def get_states(models, ODOO_DB, uid, ODOO_API_KEY):
+def conditional_jsonify(data, etag, last_modified=None):
     """
-    Fungsi untuk mengambil semua data state dari model res.country.state
-    
-    Args:
-        models: Odoo XML-RPC models object
-        ODOO_DB: Database name
-        uid: User ID
-        ODOO_API_KEY: API Key
-    
-    Returns:
-        list: Semua data state dengan field id dan name
+    ordered_jsonify dengan header ETag/Last-Modified.
+
+    Jika If-None-Match (atau If-Modified-Since) dari client masih cocok,
+    balas 304 tanpa body dan tanpa serialisasi data.
     """
-    # Ambil semua ID state
-    state_ids = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY, 
-        'res.country.state', 
-        'search', 
-        [[]]  # Domain kosong = semua records
-    )
-    
-    if not state_ids:
-        return []
-    
-    # Ambil data state dengan field terbatas
-    states = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY,
-        'res.country.state',
-        'read',
-        [state_ids],
-        {'fields': ['id', 'name', 'country_id']}
-    )
-    
-    # Sederhanakan struktur response
-    simplified_states = []
-    for state in states:
-        simplified_state = {
-            'id': state.get('id'),
-            'name': state.get('name'),
-            'country': state.get('country_id')[1] if state.get('country_id') else None
-        }
-        simplified_states.append(simplified_state)
-    
-    return simplified_states
-
-def get_countries(models, ODOO_DB, uid, ODOO_API_KEY):
+    not_modified = False
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(etag)
+    elif last_modified is not None and request.if_modified_since:
+        not_modified = last_modified <= request.if_modified_since
+
+    response = Response(status=304) if not_modified else ordered_jsonify(data)
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def lookup_response(result):
     """
-    Fungsi untuk mengambil semua data country dari model res.country
-    
-    Args:
-        models: Odoo XML-RPC models object
-        ODOO_DB: Database name
-        uid: User ID
-        ODOO_API_KEY: API Key
-    
-    Returns:
-        list: Semua data country dengan field id dan name
+    Response untuk hasil lookup `(body, status, validators)`.
+
+    `validators` = (etag, last_modified) untuk conditional_jsonify, atau None
+    untuk response biasa (mis. error validasi).
     """
-    # Ambil semua ID country
-    country_ids = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY, 
-        'res.country', 
-        'search', 
-        [[]]  # Domain kosong = semua records
-    )
-    
-    if not country_ids:
-        return []
-    
-    # Ambil data country dengan field terbatas
-    countries = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY,
-        'res.country',
-        'read',
-        [country_ids],
-        {'fields': ['id', 'name', 'code']}
-    )
-    
-    # Sederhanakan struktur response
-    simplified_countries = []
-    for country in countries:
-        simplified_country = {
-            'id': country.get('id'),
-            'name': country.get('name'),
-            'code': country.get('code')
-        }
-        simplified_countries.append(simplified_country)
-    
-    return simplified_countries
+    body, status, validators = result
+    if validators is None:
+        return ordered_jsonify(body), status
+    return conditional_jsonify(body, *validators)
 
+def wants_ndjson():
+    """True jika client meminta streaming NDJSON (?format=ndjson atau Accept)"""
+    if request.args.get('format') == 'ndjson':
+        return True
+    best = request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson'])
+    return best == 'application/x-ndjson'
 
+def ndjson_response(batches):
+    """
+    Streaming response NDJSON: satu record JSON per baris.
+
+    `batches` berisi list record; setiap batch dikirim segera sebagai satu
+    chunk (juga satu blok saat dikompres, lihat compress_stream).
+
+    Jika terjadi error di tengah stream (status 200 sudah terkirim), baris
+    terakhir berisi objek error agar client tahu dump tidak lengkap.
+    """
+    def generate():
+        try:
+            for records in batches:
+                yield b''.join([dumps(record) + b'\n' for record in records])
+        except Exception as e:
+            yield dumps({'success': False, 'error': str(e)}) + b'\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def iter_search_read(odoo, model, domain, fields, batch_size, start_after=0):
+    """
+    Generator batch `search_read` dengan keyset pada id (urutan id asc).
+
+    Args:
+        odoo: Pooled Odoo client (OdooClient)
+        model: Nama model Odoo
+        domain: Domain filter dasar
+        fields: Field yang dibaca (id selalu disertakan)
+        batch_size: Jumlah record per round trip
+        start_after: Mulai dari id > start_after (untuk melanjutkan export)
+
+    Yields:
+        list: Satu batch record hasil search_read
+    """
+    read_fields = fields if 'id' in fields else ['id'] + list(fields)
+    last_id = start_after or 0
+    while True:
+        batch = odoo.execute_kw(
+            model, 'search_read',
+            [list(domain) + [['id', '>', last_id]]],
+            {'fields': read_fields, 'limit': batch_size, 'order': 'id asc'}
+        )
+        if not batch:
+            return
+        last_id = batch[-1]['id']
+        yield batch
+        if len(batch) < batch_size:
+            return
 
+def chunked(items, size):
+    """Pecah list menjadi potongan berukuran `size` (untuk create/write/search batch)"""
+    size = max(1, int(size))
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
+def partner_key(name, email):
+    """Key dedupe contact: name dan email dinormalisasi (trim, case-insensitive)"""
+    return (str(name or '').strip().lower(), str(email or '').strip().lower())
 
+def email_domain(emails):
+    """Domain OR untuk mencari res.partner berdasarkan email (case-insensitive)"""
+    emails = sorted(emails)
+    return ['|'] * (len(emails) - 1) + [['email', '=ilike', email] for email in emails]
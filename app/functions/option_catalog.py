@@ -0,0 +1,249 @@
+"""
+In-memory dropdown catalogs for sale.order options (commodity, UoM, transportation method)
+"""
+import hashlib
+import json
+import threading
+import time
+import xmlrpc.client
+from datetime import datetime, timezone
+from config import Config
+from app.models.odoo_connection import odoo
+from app.models.odoo_client import OdooRPCError
+from app.functions.schema_cache import get_fields_meta, get_sale_order_fields_meta, get_sale_order_field_map
+
+# Field selection transportation di sale.order dan model studio opsinya
+TRANSPORT_FIELD = 'x_studio_transportation_method'
+TRANSPORT_MODEL = 'x_transportation'
+
+
+def _fold(value):
+    return str(value).casefold()
+
+
+class OptionSnapshot:
+    """
+    Satu versi katalog yang immutable: model relation hasil deteksi, list
+    option untuk dropdown (urutan dari Odoo) dan map ID -> factor.
+    """
+
+    def __init__(self, model, options, factors):
+        self.model = model
+        self.options = options
+        self.factors = factors
+        payload = json.dumps([model, options], sort_keys=True, default=str)
+        self.etag = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.loaded_at = time.monotonic()
+
+    def factor(self, record_id):
+        """(True, factor) jika ID ada di katalog, (False, None) jika tidak"""
+        if record_id in self.factors:
+            return True, self.factors[record_id]
+        return False, None
+
+
+class OptionCatalog:
+    """
+    Katalog option satu field many2one sale.order (mis. commodity, UoM).
+
+    Field di sale.order dideteksi lewat get_sale_order_field_map(), lalu
+    seluruh record model relation-nya dibaca dengan satu search_read.
+    Snapshot dipakai bersama oleh semua request sampai umurnya melewati
+    `ttl`; reload dilakukan oleh satu thread, request lain tetap dilayani
+    snapshot lama. Jika reload gagal, snapshot lama tetap dipakai.
+
+    Args:
+        field_key: Key di get_sale_order_field_map() ('commodity', 'uom')
+        with_factor: Baca juga field `factor` (UoM) ke option dan map factor
+    """
+
+    def __init__(self, client, field_key, with_factor=False, ttl=600):
+        self.client = client
+        self.field_key = field_key
+        self.with_factor = with_factor
+        self.ttl = ttl
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.last_error = None
+
+    def _read_params(self, model):
+        """Field yang dibaca dan order (hanya name yang stored, bukan computed)"""
+        try:
+            model_fields = get_fields_meta(model, ['store', 'type'])
+        except Exception:
+            return ['id'], None
+        fields_to_read = ['id']
+        for field in ('name', 'display_name') + (('factor',) if self.with_factor else ()):
+            if field in model_fields:
+                fields_to_read.append(field)
+        order_by = None
+        if 'name' in model_fields and model_fields['name'].get('store', True):
+            order_by = 'name'
+        # Jangan pakai display_name untuk order karena biasanya computed
+        if not order_by and 'id' in model_fields:
+            order_by = 'id'
+        return fields_to_read, order_by
+
+    def _load(self):
+        field = get_sale_order_field_map().get(self.field_key)
+        model = get_sale_order_fields_meta().get(field, {}).get('relation') if field else None
+        if not model:
+            return OptionSnapshot(None, [], {})
+
+        fields_to_read, order_by = self._read_params(model)
+        search_params = {'fields': fields_to_read}
+        if order_by:
+            search_params['order'] = order_by
+        records = self.client.execute_kw(model, 'search_read', [[]], search_params)
+
+        options = []
+        factors = {}
+        for rec in records:
+            option = {'id': rec.get('id'), 'name': rec.get('display_name') or rec.get('name') or ''}
+            if self.with_factor:
+                option['factor'] = rec.get('factor')
+                if 'factor' in fields_to_read:
+                    factors[rec.get('id')] = rec.get('factor')
+            options.append(option)
+        return OptionSnapshot(model, options, factors)
+
+    def refresh(self):
+        """Muat ulang dari Odoo; pertahankan snapshot lama jika isinya sama"""
+        snapshot = self._load()
+        with self._lock:
+            if self._snapshot is None or self._snapshot.etag != snapshot.etag:
+                self._snapshot = snapshot
+            else:
+                self._snapshot.loaded_at = snapshot.loaded_at
+            self.last_error = None
+            return self._snapshot
+
+    def snapshot(self):
+        """
+        Snapshot aktif. Load pertama sinkron; snapshot yang kedaluwarsa
+        di-reload oleh satu request, request lain memakai snapshot lama.
+        """
+        current = self._snapshot
+        if current is not None and time.monotonic() - current.loaded_at < self.ttl:
+            return current
+        if current is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                return self._snapshot
+        if not self._lock.acquire(blocking=False):
+            return current
+        try:
+            # Tandai segar dulu supaya request lain tidak ikut reload
+            current.loaded_at = time.monotonic()
+        finally:
+            self._lock.release()
+        try:
+            return self.refresh()
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"{self.field_key} catalog refresh failed: {e}")
+            return current
+
+    def model(self):
+        """Model relation pada snapshot aktif (None jika belum dimuat)"""
+        current = self._snapshot
+        return current.model if current else None
+
+    def models(self):
+        """Model yang perubahannya (via /cache/invalidate) membuang katalog ini"""
+        return {'sale.order', self.model()} - {None}
+
+    def invalidate(self):
+        """Buang snapshot; akses berikutnya akan memuat ulang dari Odoo"""
+        with self._lock:
+            self._snapshot = None
+
+    def stats(self):
+        current = self._snapshot
+        return {
+            'loaded': current is not None,
+            'model': current.model if current else None,
+            'options': len(current.options) if current else 0,
+            'etag': current.etag if current else None,
+            'last_error': self.last_error
+        }
+
+
+class TransportSnapshot(OptionSnapshot):
+    """
+    Snapshot transportation method: option lookup plus map case-folded
+    key/label -> key untuk normalisasi input.
+    """
+
+    def __init__(self, model, options, keys):
+        super().__init__(model, options, {})
+        self.keys = keys
+        # Map ikut di-hash: label selection bisa berubah walau opsi lookup sama
+        payload = json.dumps([model, options, keys], sort_keys=True, default=str)
+        self.etag = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def normalize(self, value):
+        """Key selection untuk key/label (tanpa beda huruf besar/kecil); nilai asli jika tidak dikenal"""
+        return self.keys.get(_fold(value), value)
+
+
+class TransportCatalog(OptionCatalog):
+    """
+    Registry transportation method: sumber tunggal untuk lookup
+    /lookups/transportation-methods dan normalisasi input quote.
+
+    Opsi lookup diambil dari model studio x_transportation jika ada isinya,
+    selain itu dari selection field di sale.order. Map normalisasi dibangun
+    dari selection (key yang disimpan Odoo); jika selection kosong, dari
+    nama record x_transportation. Untuk label yang dipakai beberapa opsi,
+    opsi pertama yang menang.
+    """
+
+    def __init__(self, client, ttl=600):
+        super().__init__(client, 'transportation', ttl=ttl)
+
+    def models(self):
+        return {'sale.order', TRANSPORT_MODEL}
+
+    def _load(self):
+        try:
+            records = self.client.execute_kw(
+                TRANSPORT_MODEL, 'search_read',
+                [[]], {'fields': ['id', 'name', 'display_name']}
+            )
+        except (xmlrpc.client.Fault, OdooRPCError):
+            # Ditolak Odoo (model studio tidak ada/tidak bisa diakses): pakai
+            # selection sale.order. Error transport (timeout, circuit open,
+            # pool habis) diteruskan supaya snapshot lama tetap dipakai.
+            records = []
+        try:
+            selection = get_sale_order_fields_meta().get(TRANSPORT_FIELD, {}).get('selection', [])
+        except Exception:
+            if not records:
+                raise
+            selection = []
+        selection = [item for item in selection if isinstance(item, (list, tuple)) and len(item) == 2]
+
+        keys = {}
+        for key, label in selection:
+            keys.setdefault(_fold(key), key)
+            keys.setdefault(_fold(label), key)
+
+        if records:
+            options = []
+            for rec in records:
+                label = rec.get('display_name') or rec.get('name') or ''
+                value = rec.get('name') or label
+                options.append({'value': value, 'id': rec.get('id')})
+                if not selection:
+                    keys.setdefault(_fold(value), value)
+                    keys.setdefault(_fold(label), value)
+            return TransportSnapshot(TRANSPORT_MODEL, options, keys)
+        return TransportSnapshot('sale.order', [{'value': key} for key, _ in selection], keys)
+
+
+commodity_catalog = OptionCatalog(odoo, 'commodity', ttl=Config.OPTION_CATALOG_TTL)
+uom_catalog = OptionCatalog(odoo, 'uom', with_factor=True, ttl=Config.OPTION_CATALOG_TTL)
+transport_catalog = TransportCatalog(odoo, ttl=Config.OPTION_CATALOG_TTL)
@@ -0,0 +1,134 @@
+"""
+Query parameter parsing for paginated list endpoints
+"""
+import base64
+import json
+from datetime import datetime
+from config import Config
+
+
+def parse_int_arg(args, name, default=None, minimum=0, maximum=None):
+    """
+    Ambil query param integer dengan validasi batas.
+
+    Raises:
+        ValueError: jika nilai bukan integer atau di luar batas
+    """
+    raw = args.get(name)
+    if raw is None or raw == '':
+        return default
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f'Query param {name} must be an integer')
+    if value < minimum:
+        raise ValueError(f'Query param {name} must be >= {minimum}')
+    if maximum is not None and value > maximum:
+        raise ValueError(f'Query param {name} must be <= {maximum}')
+    return value
+
+
+def parse_pagination(args):
+    """
+    Parse `limit`, `offset` dan `after_id` (keyset cursor berdasarkan id).
+
+    Returns:
+        tuple: (limit, offset, after_id)
+    """
+    limit = parse_int_arg(args, 'limit', Config.DEFAULT_PAGE_SIZE, minimum=1, maximum=Config.MAX_PAGE_SIZE)
+    offset = parse_int_arg(args, 'offset', 0)
+    after_id = parse_int_arg(args, 'after_id')
+    return limit, offset, after_id
+
+
+def parse_fields_arg(args, allowed):
+    """
+    Parse projection `fields=a,b,c` terhadap daftar field yang diizinkan.
+
+    Returns:
+        list | None: field yang diminta (urutan mengikuti `allowed`), None jika tidak ada
+    """
+    raw = args.get('fields')
+    if not raw:
+        return None
+    requested = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f'Unknown fields: {unknown}. Allowed: {list(allowed)}')
+    return [f for f in allowed if f in requested]
+
+
+def parse_bool_arg(args, name):
+    """True untuk nilai 1/true/yes (case-insensitive)"""
+    return str(args.get(name, '')).strip().lower() in ('1', 'true', 'yes')
+
+
+def parse_date_arg(args, name, end_of_day=False):
+    """
+    Parse query param tanggal (YYYY-MM-DD atau YYYY-MM-DD HH:MM:SS) ke format Odoo.
+
+    Untuk tanggal tanpa jam, `end_of_day=True` menghasilkan 23:59:59 agar
+    batas atas bersifat inklusif.
+    """
+    raw = args.get(name)
+    if not raw:
+        return None
+    raw = raw.strip()
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            parsed = datetime.strptime(raw, fmt)
+        except ValueError:
+            continue
+        if fmt == '%Y-%m-%d' and end_of_day:
+            parsed = parsed.replace(hour=23, minute=59, second=59)
+        return parsed.strftime('%Y-%m-%d %H:%M:%S')
+    raise ValueError(f'Query param {name} must be a date (YYYY-MM-DD)')
+
+
+def parse_order_arg(args, allowed, default):
+    """
+    Parse `order=<field> [asc|desc]` terhadap field yang diizinkan.
+
+    Returns:
+        tuple: (field, direction)
+    """
+    raw = (args.get('order') or default).strip()
+    parts = raw.split()
+    field = parts[0]
+    direction = parts[1].lower() if len(parts) > 1 else 'asc'
+    if field not in allowed or direction not in ('asc', 'desc') or len(parts) > 2:
+        raise ValueError(f'Query param order must be "<field> [asc|desc]" with field in {list(allowed)}')
+    return field, direction
+
+
+def order_clause(field, direction):
+    """Klausa order Odoo dengan id sebagai tie-breaker (urutan deterministik)"""
+    if field == 'id':
+        return f'id {direction}'
+    return f'{field} {direction}, id {direction}'
+
+
+def keyset_domain(field, direction, last_value, last_id):
+    """Domain Odoo untuk mengambil record setelah (last_value, last_id)"""
+    op = '>' if direction == 'asc' else '<'
+    if field == 'id':
+        return [['id', op, last_id]]
+    return ['|', [field, op, last_value], '&', [field, '=', last_value], ['id', op, last_id]]
+
+
+def encode_cursor(payload):
+    """Encode state cursor menjadi token opaque (base64url JSON)"""
+    raw = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Kebalikan encode_cursor; ValueError jika token rusak"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(payload, dict):
+        raise ValueError('Invalid cursor')
+    return payload
@@ -0,0 +1,173 @@
+"""
+In-memory res.partner index for contact dedupe (normalized name + email)
+"""
+import threading
+import time
+from config import Config
+from app.models.odoo_connection import odoo
+from app.functions.odoo_functions import iter_search_read, partner_key
+
+PARTNER_INDEX_FIELDS = ['id', 'name', 'email', 'active', 'write_date']
+
+
+class PartnerIndex:
+    """
+    Index partner_key(name, email) -> ID res.partner di memori.
+
+    Index dimuat di thread background (request tidak menunggu warm-up) lalu
+    dijaga tetap segar dengan polling `write_date >= watermark` tiap
+    `refresh_interval` detik; partner yang diarsipkan atau berganti
+    name/email ikut diperbarui. Reload penuh tiap `full_reload_interval`
+    membersihkan sisa partner yang dihapus.
+
+    `lookup()` mengembalikan None selama index belum siap atau key tidak
+    ada, sehingga pemanggil tetap fallback ke query `=ilike` ke Odoo.
+    Polling tidak melihat partner yang dihapus: pemanggil yang call-nya pada
+    ID dari index gagal memanggil `forget()` lalu fallback ke query yang sama.
+    Jika beberapa partner punya key sama, yang ID-nya terkecil dipakai.
+    """
+
+    def __init__(self, client, refresh_interval=60, full_reload_interval=21600, batch_size=2000):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.batch_size = batch_size
+        self._by_key = {}
+        self._key_by_id = {}
+        self._lock = threading.Lock()
+        self._ready = False
+        self._watermark = None
+        self._loaded_at = None
+        self._worker = None
+        self.hits = 0
+        self.misses = 0
+        self.last_error = None
+
+    def _put(self, partner_id, key):
+        """Pasang/geser mapping satu partner (dipanggil dengan lock)"""
+        old_key = self._key_by_id.pop(partner_id, None)
+        if old_key is not None:
+            ids = self._by_key.get(old_key)
+            if ids is not None:
+                ids.discard(partner_id)
+                if not ids:
+                    del self._by_key[old_key]
+        if key is not None:
+            self._key_by_id[partner_id] = key
+            self._by_key.setdefault(key, set()).add(partner_id)
+
+    def _apply(self, record):
+        email = record.get('email')
+        key = partner_key(record.get('name'), email) if email and record.get('active', True) else None
+        self._put(record['id'], key)
+
+    def _advance_watermark(self, records):
+        for record in records:
+            write_date = record.get('write_date')
+            if write_date and (self._watermark is None or write_date > self._watermark):
+                self._watermark = write_date
+
+    def reload(self):
+        """Bangun ulang index dari seluruh partner aktif yang punya email"""
+        by_key, key_by_id, watermark = {}, {}, None
+        for batch in iter_search_read(self.client, 'res.partner', [['email', '!=', False]],
+                                      PARTNER_INDEX_FIELDS, self.batch_size):
+            for record in batch:
+                key = partner_key(record.get('name'), record.get('email'))
+                key_by_id[record['id']] = key
+                by_key.setdefault(key, set()).add(record['id'])
+                if record.get('write_date') and (watermark is None or record['write_date'] > watermark):
+                    watermark = record['write_date']
+        with self._lock:
+            self._by_key, self._key_by_id = by_key, key_by_id
+            self._watermark = watermark
+            self._loaded_at = time.monotonic()
+            self._ready = True
+            self.last_error = None
+
+    def refresh(self):
+        """Terapkan perubahan sejak watermark (termasuk partner yang diarsipkan)"""
+        if self._watermark is None:
+            return self.reload()
+        records = self.client.execute_kw(
+            'res.partner', 'search_read',
+            [[['write_date', '>=', self._watermark], ['active', 'in', [True, False]]]],
+            {'fields': PARTNER_INDEX_FIELDS, 'order': 'write_date asc, id asc'}
+        )
+        with self._lock:
+            for record in records:
+                self._apply(record)
+            self._advance_watermark(records)
+            self.last_error = None
+
+    def lookup(self, name, email):
+        """ID partner untuk name + email, atau None (index belum siap / tidak ada)"""
+        self._ensure_worker()
+        key = partner_key(name, email)
+        with self._lock:
+            ids = self._by_key.get(key) if self._ready else None
+            partner_id = min(ids) if ids else None
+        if partner_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return partner_id
+
+    def remember(self, partner_id, name, email):
+        """Catat partner yang baru ditemukan/dibuat request ini tanpa menunggu polling"""
+        if not partner_id or not email:
+            return
+        with self._lock:
+            self._put(partner_id, partner_key(name, email))
+
+    def forget(self, partner_id):
+        """Buang partner yang ternyata sudah dihapus di Odoo (call pada ID-nya gagal)"""
+        with self._lock:
+            self._put(partner_id, None)
+
+    def invalidate(self):
+        """Paksa reload penuh pada siklus worker berikutnya"""
+        with self._lock:
+            self._watermark = None
+            self._loaded_at = None
+
+    def _ensure_worker(self):
+        if self._worker is not None or not Config.PARTNER_INDEX_ENABLED:
+            return
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._run, name='partner-index-refresh', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            try:
+                stale = self._loaded_at is None or time.monotonic() - self._loaded_at >= self.full_reload_interval
+                if stale:
+                    self.reload()
+                else:
+                    self.refresh()
+            except Exception as e:
+                # Index lama tetap dipakai; miss tetap fallback ke Odoo
+                self.last_error = str(e)
+                print(f"Partner index refresh failed: {e}")
+            time.sleep(self.refresh_interval)
+
+    def stats(self):
+        return {
+            'ready': self._ready,
+            'partners': len(self._key_by_id),
+            'watermark': self._watermark,
+            'hits': self.hits,
+            'misses': self.misses,
+            'last_error': self.last_error
+        }
+
+
+partner_index = PartnerIndex(
+    odoo,
+    refresh_interval=Config.PARTNER_INDEX_REFRESH_INTERVAL,
+    full_reload_interval=Config.PARTNER_INDEX_FULL_RELOAD_INTERVAL,
+    batch_size=Config.PARTNER_INDEX_BATCH_SIZE
+)
@@ -0,0 +1,290 @@
+"""
+In-memory pickup origin/destination catalog partitioned by transportation method
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from config import Config
+from app.models.odoo_connection import odoo
+from app.functions.schema_cache import get_fields_meta, get_pickup_fields_meta, parse_domain
+
+PICKUP_TYPES = ('origin', 'destination')
+
+# Field yang dipakai validasi create quote (transportation yang diizinkan)
+PICKUP_TRANSPORT_FIELD = 'x_studio_transportation_method'
+
+
+def _pick_field(fields_meta, candidates):
+    for cand in candidates:
+        if cand in fields_meta:
+            return cand
+    return None
+
+
+def pickup_field_names(fields_meta):
+    """Deteksi field alamat, country, kode pickup dan transportation pada model pickup"""
+    return {
+        'address': _pick_field(fields_meta, ['x_name', 'x_studio_pickup_address', 'x_studio_address', 'x_studio_address_pickup', 'address', 'name']),
+        'country': _pick_field(fields_meta, ['x_studio_country', 'country_id', 'x_studio_country_id']),
+        'pickup_code': _pick_field(fields_meta, ['x_studio_pickup_code']),
+        'transport': _pick_field(fields_meta, ['x_studio_transportation_method', 'transportation_method', 'x_transportation_method', 'x_transportation'])
+    }
+
+
+def normalize_pickup_record(record, pickup_type, names):
+    """Bentuk record pickup untuk response lookup (nama field API, country_name)"""
+    rec = {'id': record['id']}
+    for key in ('address', 'country', 'pickup_code'):
+        if names[key]:
+            rec[names[key]] = record.get(names[key])
+
+    # Normalisasi alamat
+    address_field = names['address']
+    if address_field and address_field in rec:
+        field_name = 'pickup_origin_address' if pickup_type == 'origin' else 'pickup_destination_address'
+        rec[field_name] = rec.pop(address_field)
+
+    # Normalisasi country
+    country_field = names['country']
+    if country_field and country_field in rec:
+        rec['country'] = rec.pop(country_field)
+
+    # Tambahkan pickup_code jika ada
+    pickup_code_field = names['pickup_code']
+    if pickup_code_field and pickup_code_field in rec:
+        rec['pickup_code'] = rec.pop(pickup_code_field)
+
+        # Tambahkan country_name
+        if isinstance(rec.get('country'), list) and len(rec['country']) == 2:
+            rec['country_name'] = rec['country'][1]
+        else:
+            rec['country_name'] = None
+    else:
+        rec['country'] = None
+        rec['country_name'] = None
+    return rec
+
+
+def _transport_key(value):
+    """Nilai yang dicocokkan dengan ?transportation= (selection key, atau nama many2one)"""
+    if isinstance(value, list):
+        return value[1] if len(value) > 1 else None
+    return value or None
+
+
+class PickupSnapshot:
+    """
+    Satu versi katalog pickup yang immutable.
+
+    Per pickup type (origin/destination) disimpan list lookup per nilai
+    transportation (urutan default model Odoo) dan record validasi per ID
+    untuk record yang memenuhi domain field pickup di sale.order.
+    """
+
+    def __init__(self, sides):
+        self.sides = sides
+        self.listings = {}
+        self.pickups = {}
+        for pickup_type, side in sides.items():
+            by_transport = {}
+            valid = {}
+            if side is not None:
+                names = side['names']
+                for record in side['records']:
+                    if record['id'] not in side['ids']:
+                        continue
+                    public = normalize_pickup_record(record, pickup_type, names)
+                    if names['transport']:
+                        key = _transport_key(record.get(names['transport']))
+                        if key is not None:
+                            by_transport.setdefault(key, []).append(public)
+                    else:
+                        # Model tanpa field transportation: semua pickup berlaku
+                        by_transport.setdefault(None, []).append(public)
+                    check = {'id': record['id']}
+                    if side['has_transport_field']:
+                        check[PICKUP_TRANSPORT_FIELD] = record.get(PICKUP_TRANSPORT_FIELD, False)
+                    valid[record['id']] = check
+            self.listings[pickup_type] = by_transport
+            self.pickups[pickup_type] = valid
+
+        payload = json.dumps({
+            pickup_type: side and dict(side, ids=sorted(side['ids']))
+            for pickup_type, side in sides.items()
+        }, sort_keys=True, default=str)
+        self.etag = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.loaded_at = time.time()
+
+    def records(self, pickup_type, transportation):
+        """List pickup untuk dropdown (jangan dimodifikasi pemanggil)"""
+        side = self.sides.get(pickup_type)
+        if not transportation or side is None:
+            return []
+        by_transport = self.listings[pickup_type]
+        if side['names']['transport'] is None:
+            return by_transport.get(None, [])
+        return by_transport.get(transportation, [])
+
+    def pickup(self, pickup_type, pickup_id):
+        """Record validasi ({id, x_studio_transportation_method}) atau None jika tidak ada di katalog"""
+        return self.pickups.get(pickup_type, {}).get(pickup_id)
+
+    def model(self, pickup_type):
+        side = self.sides.get(pickup_type)
+        return side['model'] if side else None
+
+
+class PickupCatalog:
+    """
+    Katalog pickup (x_pickup) di memori untuk lookup dan validasi create quote.
+
+    Seluruh record pickup dimuat sekali (satu search_read per model + satu
+    search per domain origin/destination), lalu dibagi per transportation.
+    Thread background mengecek perubahan tiap `check_interval` detik (jumlah
+    record + write_date terbaru) dan memuat ulang jika berubah atau jika
+    umur katalog melewati `ttl`. Snapshot baru hanya menggantikan yang lama
+    jika isinya berubah, sehingga ETag tetap stabil.
+    """
+
+    def __init__(self, client, ttl=3600, check_interval=60):
+        self.client = client
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self._refresher = None
+        self.last_error = None
+
+    def _model_signature(self, model):
+        count = self.client.execute_kw(model, 'search_count', [[]])
+        latest = self.client.execute_kw(
+            model, 'search_read', [[]],
+            {'fields': ['write_date'], 'order': 'write_date desc', 'limit': 1}
+        )
+        return [model, count, latest[0].get('write_date') if latest else None]
+
+    def _signature_of(self, models):
+        return [self._model_signature(model) for model in sorted(models)]
+
+    def _load(self):
+        pickup_meta = get_pickup_fields_meta()
+        # Signature diambil sebelum membaca record: perubahan selama load
+        # tetap terdeteksi pada pengecekan berikutnya
+        models = {pickup_meta.get(t, {}).get('relation') for t in PICKUP_TYPES} - {None}
+        signature = self._signature_of(models)
+        loaded = {}
+        sides = {}
+        for pickup_type in PICKUP_TYPES:
+            meta = pickup_meta.get(pickup_type, {})
+            model = meta.get('relation')
+            if not model:
+                sides[pickup_type] = None
+                continue
+            if model not in loaded:
+                fields_meta = get_fields_meta(model, ['type', 'string'])
+                names = pickup_field_names(fields_meta)
+                read_fields = ['id']
+                for field in list(names.values()) + [PICKUP_TRANSPORT_FIELD]:
+                    if field and field in fields_meta and field not in read_fields:
+                        read_fields.append(field)
+                records = self.client.execute_kw(model, 'search_read', [[]], {'fields': read_fields})
+                loaded[model] = (names, PICKUP_TRANSPORT_FIELD in fields_meta, records)
+            names, has_transport_field, records = loaded[model]
+            domain = parse_domain(meta.get('domain', []))
+            if domain:
+                ids = set(self.client.execute_kw(model, 'search', [domain]))
+            else:
+                ids = {record['id'] for record in records}
+            sides[pickup_type] = {
+                'model': model,
+                'names': names,
+                'has_transport_field': has_transport_field,
+                'records': records,
+                'ids': ids
+            }
+        return PickupSnapshot(sides), signature
+
+    def refresh(self):
+        """Muat ulang dari Odoo; pertahankan snapshot lama jika isinya sama"""
+        snapshot, signature = self._load()
+        with self._lock:
+            if self._snapshot is None or self._snapshot.etag != snapshot.etag:
+                self._snapshot = snapshot
+            else:
+                self._snapshot.loaded_at = snapshot.loaded_at
+            self._signature = signature
+            self.last_error = None
+            return self._snapshot
+
+    def snapshot(self):
+        """Snapshot aktif; load pertama dilakukan sinkron oleh satu thread"""
+        current = self._snapshot
+        if current is not None:
+            return current
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot, self._signature = self._load()
+            self._start_refresher()
+            return self._snapshot
+
+    def models(self):
+        """Model pickup pada snapshot aktif"""
+        current = self._snapshot
+        if current is None:
+            return set()
+        return {current.model(pickup_type) for pickup_type in PICKUP_TYPES} - {None}
+
+    def invalidate(self):
+        """Buang snapshot; akses berikutnya akan memuat ulang dari Odoo"""
+        with self._lock:
+            self._snapshot = None
+            self._signature = None
+
+    def _changed(self):
+        """True jika jumlah record atau write_date terbaru model pickup berubah"""
+        signature = self._signature
+        if signature is None:
+            return False
+        return self._signature_of(model for model, _, _ in signature) != signature
+
+    def _start_refresher(self):
+        if self._refresher is not None or not self.check_interval:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop,
+            name='pickup-catalog-refresh',
+            daemon=True
+        )
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.check_interval)
+            current = self._snapshot
+            if current is None:
+                continue
+            try:
+                if time.time() - current.loaded_at >= self.ttl or self._changed():
+                    self.refresh()
+            except Exception as e:
+                # Tetap layani snapshot lama jika Odoo sedang bermasalah
+                self.last_error = str(e)
+                print(f"Pickup catalog refresh failed: {e}")
+
+    def stats(self):
+        current = self._snapshot
+        return {
+            'loaded': current is not None,
+            'etag': current.etag if current else None,
+            'pickups': {
+                pickup_type: len(current.pickups.get(pickup_type, {})) for pickup_type in PICKUP_TYPES
+            } if current else {},
+            'last_error': self.last_error
+        }
+
+
+pickup_catalog = PickupCatalog(odoo, Config.PICKUP_CATALOG_TTL, Config.PICKUP_CATALOG_CHECK_INTERVAL)
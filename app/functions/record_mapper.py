@@ -0,0 +1,179 @@
+"""
+Prebuilt record mappers: Odoo record -> API response dict in one pass
+"""
+import keyword
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+def many2one_id(value):
+    """[id, name] -> id; nilai lain dikembalikan apa adanya"""
+    return value[0] if isinstance(value, list) and len(value) >= 1 else value
+
+
+def many2one_name(value):
+    """[id, name] -> name (fallback id); nilai lain dikembalikan apa adanya"""
+    if isinstance(value, list):
+        return value[1] if len(value) >= 2 else (value[0] if value else None)
+    return value
+
+
+def many2one_id_or_none(value):
+    """Seperti many2one_id, tapi kosong (False/None) menjadi None"""
+    if not value:
+        return None
+    return value[0] if isinstance(value, list) else value
+
+
+def many2one_name_or_none(value):
+    """Nama dari [id, name]; kosong (False/None) menjadi None"""
+    if not value:
+        return None
+    return value[1] if isinstance(value, list) else value
+
+
+def _is_attribute(name):
+    return isinstance(name, str) and name.isidentifier() and not keyword.iskeyword(name) and not name.startswith('__')
+
+
+class _RowBase:
+    """Base row compact: akses gaya dict (`row['id']`) untuk kode yang sudah ada"""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+@lru_cache(maxsize=128)
+def _row_type(keys):
+    """Dataclass ber-__slots__ untuk satu skema output (dibagi oleh mapper dengan key sama)"""
+    namespace = {'__slots__': keys, '__annotations__': dict.fromkeys(keys, object), '__module__': __name__}
+    return dataclass(type('MappedRow', (_RowBase,), namespace))
+
+
+class RecordMapper:
+    """
+    Pemetaan record Odoo ke dict response yang disusun sekali.
+
+    `fields` berisi (key output, field sumber, converter) dalam urutan
+    output. Converter boleh None (nilai disalin), callable, atau nama
+    parameter (str) yang diberikan saat pemanggilan, untuk converter yang
+    bergantung pada data per request (mis. map partner). Per record hanya
+    satu loop atas daftar (field sumber, converter) yang sudah disiapkan,
+    tanpa rename/del per record. Field sumber yang tidak ada di record
+    dibaca sebagai None.
+
+    Dengan `compact=True`, output berupa instance `row_type` (dataclass
+    ber-__slots__ dengan urutan field yang sama) alih-alih dict: jauh lebih
+    kecil per record dan diserialisasi langsung oleh serializers.dumps
+    sebagai objek JSON (tanpa dict per record hanya dengan orjson; json
+    stdlib membuat dict sementara per row saat encode). Untuk listing besar; key harus identifier Python
+    (jika tidak, mapper tetap menghasilkan dict).
+    """
+
+    def __init__(self, fields, compact=False):
+        self.fields = tuple(fields)
+        keys = self.keys()
+        self.row_type = _row_type(keys) if compact and all(_is_attribute(key) for key in keys) else None
+
+    def keys(self):
+        return tuple(key for key, _, _ in self.fields)
+
+    def _plan(self, context):
+        """(field sumber, converter) per key output; converter parameter diambil dari context"""
+        return tuple(
+            (source, context[convert] if isinstance(convert, str) else convert)
+            for _, source, convert in self.fields
+        )
+
+    def __call__(self, record, **context):
+        return self.map_all([record], **context)[0]
+
+    def map_all(self, records, **context):
+        """Petakan list record (hasil list baru, record sumber tidak diubah)"""
+        plan, keys, row_type = self._plan(context), self.keys(), self.row_type
+        rows = []
+        for record in records:
+            get = record.get
+            values = [get(source) if convert is None else convert(get(source)) for source, convert in plan]
+            rows.append(row_type(*values) if row_type is not None else dict(zip(keys, values)))
+        return rows
+
+
+# Field sale.order yang di-rename ke key API; field dari
+# get_sale_order_field_map() ditambahkan saat mapper dibuat (lihat quote_mapper)
+QUOTE_RENAMES = (
+    ('transportation_method', 'x_studio_transportation_method', None),
+    ('pickup_origin', 'origin', None),
+    ('pickup_destination', 'destination', None),
+    ('terms_condition', 'x_studio_terms_condition', None),
+    ('commodity', 'commodity', many2one_id),
+    ('uom', 'uom', many2one_name),
+    ('qty', 'qty', None),
+    ('kgs_chg', 'kgs_chg', None),
+    ('kgs_wt', 'kgs_wt', None),
+    ('ratio', 'ratio', None),
+)
+
+# Key output contact -> (field res.partner sumber, converter)
+CONTACT_MAPPINGS = {
+    'business_type': ('x_studio_your_business', None),
+    'country_id': ('country_id', many2one_id_or_none),
+    'state_id': ('state_id', many2one_id_or_none),
+    'country_name': ('country_id', many2one_name_or_none),
+    'state_name': ('state_id', many2one_name_or_none),
+}
+
+
+def quote_mapper(read_fields, so_field_map, origin_field_name, dest_field_name, customer=False, compact=False):
+    """
+    Mapper sale.order -> quote API untuk `read_fields` (dicache per kombinasi).
+
+    Urutan output: field yang tidak di-rename (urutan read), `customer`
+    (jika `customer=True`, menggantikan partner_id; converter `customer`
+    diberikan saat pemanggilan), lalu field yang di-rename (QUOTE_RENAMES).
+    Jika beberapa key memakai field sumber yang sama, key pertama yang dapat.
+    `compact`: lihat RecordMapper.
+    """
+    return _quote_mapper(
+        tuple(read_fields), tuple(sorted(so_field_map.items())),
+        origin_field_name, dest_field_name, customer, compact
+    )
+
+
+@lru_cache(maxsize=64)
+def _quote_mapper(read_fields, so_field_items, origin_field_name, dest_field_name, customer, compact):
+    sources = dict(so_field_items, origin=origin_field_name, destination=dest_field_name)
+    renames = []
+    consumed = set()
+    for key, source, convert in QUOTE_RENAMES:
+        field = sources.get(source, source)
+        if field in read_fields and field not in consumed:
+            consumed.add(field)
+            renames.append((key, field, convert))
+    if customer:
+        consumed.add('partner_id')
+    fields = [(field, field, None) for field in dict.fromkeys(read_fields) if field not in consumed]
+    if customer:
+        fields.append(('customer', 'partner_id', 'customer'))
+    return RecordMapper(fields + renames, compact=compact)
+
+
+@lru_cache(maxsize=64)
+def contact_mapper(output_fields, compact=False):
+    """
+    Mapper res.partner -> contact API untuk tuple key output (urutan output).
+
+    Key di CONTACT_MAPPINGS diturunkan dari field many2one/studio; key lain
+    disalin dari field dengan nama yang sama. `compact`: lihat RecordMapper.
+    """
+    return RecordMapper(
+        ((key,) + CONTACT_MAPPINGS.get(key, (key, None)) for key in output_fields),
+        compact=compact
+    )
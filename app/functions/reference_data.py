@@ -0,0 +1,149 @@
+"""
+In-memory reference data (countries and states) with background refresh
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from config import Config
+from app.models.odoo_connection import odoo
+
+
+class ReferenceSnapshot:
+    """Satu versi data referensi yang immutable, lengkap dengan index-nya"""
+
+    def __init__(self, countries, states):
+        self.countries = countries
+        self.states = states
+        self.country_by_id = {country['id']: country for country in countries}
+        self.state_by_id = {state['id']: state for state in states}
+
+        # Bentuk response /states dan index country_id -> list state
+        self.public_states = []
+        self.states_by_country = {}
+        for state in states:
+            public = self.public_state(state)
+            self.public_states.append(public)
+            self.states_by_country.setdefault(state['country_id'], []).append(public)
+
+        payload = json.dumps([countries, states], sort_keys=True, default=str)
+        self.etag = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.loaded_at = time.time()
+
+    @staticmethod
+    def public_state(state):
+        """Bentuk state yang dikirim ke client (id, name, country)"""
+        return {
+            'id': state['id'],
+            'name': state['name'],
+            'country': state['country_name']
+        }
+
+
+class ReferenceDataStore:
+    """
+    Store res.country dan res.country.state di memori.
+
+    Data dimuat sekali (lazy, saat pertama diakses) lalu di-refresh oleh
+    thread background tiap `refresh_interval` detik. Snapshot baru hanya
+    menggantikan yang lama jika isinya berubah, sehingga ETag/Last-Modified
+    tetap stabil selama data Odoo tidak berubah.
+    """
+
+    def __init__(self, client, refresh_interval=3600):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._refresher = None
+        self.last_error = None
+
+    def _load(self):
+        # Tanpa `order`: urutan default model (country per nama, state per
+        # country lalu code) seperti dropdown sebelumnya; index per country
+        # dibangun dengan urutan yang sama
+        countries = self.client.execute_kw(
+            'res.country', 'search_read',
+            [[]], {'fields': ['id', 'name', 'code']}
+        )
+        states = self.client.execute_kw(
+            'res.country.state', 'search_read',
+            [[]], {'fields': ['id', 'name', 'code', 'country_id']}
+        )
+        country_list = [
+            {'id': c.get('id'), 'name': c.get('name'), 'code': c.get('code')}
+            for c in countries
+        ]
+        state_list = []
+        for s in states:
+            country = s.get('country_id')
+            state_list.append({
+                'id': s.get('id'),
+                'name': s.get('name'),
+                'code': s.get('code'),
+                'country_id': country[0] if country else None,
+                'country_name': country[1] if country else None
+            })
+        return ReferenceSnapshot(country_list, state_list)
+
+    def refresh(self):
+        """Muat ulang dari Odoo; pertahankan snapshot lama jika isinya sama"""
+        snapshot = self._load()
+        with self._lock:
+            if self._snapshot is None or self._snapshot.etag != snapshot.etag:
+                self._snapshot = snapshot
+            else:
+                self._snapshot.loaded_at = snapshot.loaded_at
+            self.last_error = None
+            return self._snapshot
+
+    def snapshot(self):
+        """Snapshot aktif; load pertama dilakukan sinkron oleh satu thread"""
+        current = self._snapshot
+        if current is not None:
+            return current
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._load()
+            self._start_refresher()
+            return self._snapshot
+
+    def invalidate(self):
+        """Buang snapshot; akses berikutnya akan memuat ulang dari Odoo"""
+        with self._lock:
+            self._snapshot = None
+
+    def _start_refresher(self):
+        if self._refresher is not None or not self.refresh_interval:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop,
+            name='reference-data-refresh',
+            daemon=True
+        )
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                # Tetap layani snapshot lama jika Odoo sedang bermasalah
+                self.last_error = str(e)
+                print(f"Reference data refresh failed: {e}")
+
+    def stats(self):
+        current = self._snapshot
+        return {
+            'loaded': current is not None,
+            'etag': current.etag if current else None,
+            'countries': len(current.countries) if current else 0,
+            'states': len(current.states) if current else 0,
+            'last_error': self.last_error
+        }
+
+
+reference_data = ReferenceDataStore(odoo, Config.REFERENCE_DATA_REFRESH_INTERVAL)
@@ -0,0 +1,112 @@
+"""
+Odoo RPC flows shared by the sync (WSGI) and async (ASGI) request paths
+"""
+import asyncio
+from collections import namedtuple
+from app.functions.fanout import FanOut, FanOutTimeout
+
+_NO_DEFAULT = object()
+
+
+class Call(namedtuple('Call', ['model', 'method', 'args', 'kwargs', 'default'])):
+    """Satu `execute_kw` yang di-yield oleh flow; `default` dipakai jika call gagal"""
+
+
+def call(model, method, args=None, kwargs=None, default=_NO_DEFAULT):
+    """
+    Buat Call untuk di-yield dari flow.
+
+    Flow adalah generator yang meng-yield satu Call (hasilnya dikirim balik
+    lewat `send`) atau list Call (dijalankan paralel, hasilnya list dengan
+    urutan sama). Error call tanpa `default` dilempar ke dalam flow.
+    """
+    return Call(model, method, args if args is not None else [], kwargs if kwargs is not None else {}, default)
+
+
+def _resolve(calls, outcomes):
+    """Terapkan default pada call yang gagal; raise error pertama yang tersisa"""
+    results = []
+    for item, (ok, value) in zip(calls, outcomes):
+        if not ok:
+            if item.default is _NO_DEFAULT:
+                raise value
+            value = item.default
+        results.append(value)
+    return results
+
+
+def _run_sync_step(step, client):
+    batch = isinstance(step, list)
+    calls = step if batch else [step]
+    outcomes = []
+    if len(calls) == 1:
+        try:
+            outcomes.append((True, client.execute_kw(*calls[0][:4])))
+        except Exception as e:
+            outcomes.append((False, e))
+    else:
+        with FanOut(client) as fan:
+            futures = [fan.execute_kw(*item[:4]) for item in calls]
+            try:
+                fan.gather()
+            except FanOutTimeout:
+                raise
+            except Exception:
+                # Error per call ditangani di _resolve (default atau raise)
+                pass
+            for future in futures:
+                error = future.exception()
+                outcomes.append((False, error) if error is not None else (True, future.result()))
+    results = _resolve(calls, outcomes)
+    return results if batch else results[0]
+
+
+async def _run_async_step(step, client):
+    batch = isinstance(step, list)
+    calls = step if batch else [step]
+    values = await asyncio.gather(
+        *[client.execute_kw(*item[:4]) for item in calls],
+        return_exceptions=True
+    )
+    outcomes = [(not isinstance(value, Exception), value) for value in values]
+    results = _resolve(calls, outcomes)
+    return results if batch else results[0]
+
+
+def _advance(flow, send, error):
+    try:
+        return False, flow.throw(error) if error is not None else flow.send(send)
+    except StopIteration as stop:
+        return True, stop.value
+
+
+def run_sync(flow, client):
+    """Jalankan flow dengan client sync (pooled XML-RPC); batch lewat FanOut"""
+    send, error = None, None
+    while True:
+        done, step = _advance(flow, send, error)
+        if done:
+            return step
+        try:
+            send, error = _run_sync_step(step, client), None
+        except Exception as e:
+            send, error = None, e
+
+
+async def run_async(flow, client):
+    """
+    Jalankan flow dengan client async; batch lewat asyncio.gather.
+
+    Kode di antara call (validasi, metadata dari cache yang sesekali perlu
+    di-load secara sync) dijalankan di thread executor agar event loop tidak
+    pernah terblokir; RPC sendiri di-await di event loop.
+    """
+    send, error = None, None
+    while True:
+        done, step = await asyncio.to_thread(_advance, flow, send, error)
+        if done:
+            return step
+        try:
+            send, error = await _run_async_step(step, client), None
+        except Exception as e:
+            send, error = None, e
@@ -0,0 +1,182 @@
+"""
+Cached Odoo model metadata (fields_get)
+"""
+import ast
+from config import Config
+from app.functions.cache import TTLCache
+from app.models.odoo_connection import odoo
+
+# Satu set atribut untuk semua kebutuhan metadata sale.order (field map,
+# pickup meta, selection transportation) supaya cukup satu fields_get per TTL
+SALE_ORDER_META_ATTRIBUTES = ['string', 'type', 'relation', 'domain', 'selection']
+
+schema_cache = TTLCache(Config.SCHEMA_CACHE_TTL)
+
+
+def get_fields_meta(model, attributes=None):
+    """
+    Ambil hasil `fields_get` untuk sebuah model dari cache.
+
+    Key cache adalah (model, atribut yang diminta). Hasil dipakai bersama
+    oleh banyak request, jadi jangan dimodifikasi oleh pemanggil.
+
+    Args:
+        model: Nama model Odoo (mis. 'sale.order')
+        attributes: List atribut field; None = semua atribut
+
+    Returns:
+        dict: {field_name: {atribut: nilai}}
+    """
+    attrs = tuple(sorted(attributes)) if attributes else ()
+    kwargs = {'attributes': list(attrs)} if attrs else {}
+
+    def load():
+        return odoo.execute_kw(model, 'fields_get', [], kwargs) or {}
+
+    return schema_cache.get_or_load((model, attrs), load)
+
+
+def get_sale_order_fields_meta():
+    """Metadata sale.order dengan atribut gabungan (lihat SALE_ORDER_META_ATTRIBUTES)"""
+    return get_fields_meta('sale.order', SALE_ORDER_META_ATTRIBUTES)
+
+
+def invalidate_fields_meta(model=None):
+    """Hapus cache metadata untuk satu model, atau semua jika model None"""
+    if model is None:
+        return schema_cache.invalidate()
+    return schema_cache.invalidate(lambda key: key[0] == model)
+
+
+def safe_lower(value):
+    """Label/nilai untuk pencocokan: string, trim, casefold ('' jika gagal)"""
+    try:
+        return str(value or '').strip().casefold()
+    except Exception:
+        return ''
+
+
+def parse_domain(val):
+    """
+    Parse domain value from fields_get (could be list/tuple/string).
+    Returns list.
+    """
+    if isinstance(val, (list, tuple)):
+        return list(val)
+    if isinstance(val, str):
+        try:
+            parsed = ast.literal_eval(val)
+            if isinstance(parsed, (list, tuple)):
+                return list(parsed)
+        except Exception:
+            pass
+    return []
+
+
+def get_sale_order_field_map():
+    """
+    Deteksi nama teknis field di sale.order berdasarkan label (string).
+    Mengembalikan dict:
+      {
+        'commodity': <field_name>,
+        'uom': <field_name>,
+        'qty': <field_name>,
+        'kgs_chg': <field_name>,
+        'kgs_wt': <field_name>,
+        'ratio': <field_name>,
+      }
+    Dengan fallback ke nama yang selama ini digunakan jika tidak ditemukan.
+    """
+    # Default fallback (nama teknis historis)
+    field_map = {
+        'commodity': 'x_studio_commodity',
+        'uom': 'x_studio_many2one_field_1ef_1j58pa43n',
+        'qty': 'x_studio_qty',
+        'kgs_chg': 'x_studio_kgs_chg_1',
+        'kgs_wt': 'x_studio_kgs_wt',
+        'ratio': 'x_studio_ratio',
+    }
+    try:
+        fields_meta = get_sale_order_fields_meta()
+        # Kandidat label (lowercase) untuk tiap field
+        label_candidates = {
+            'commodity': ['commodity', 'description of goods', 'commodity code'],
+            'uom': ['unit of measure', 'uom', 'uom type'],
+            'qty': ['qty', 'quantity', 'pcs'],
+            'kgs_chg': ['kgs chg', 'chargeable weight', 'chg wt', 'chg'],
+            'kgs_wt': ['kgs wt', 'actual weight', 'weight'],
+            'ratio': ['ratio', 'dim factor', 'volumetric ratio'],
+        }
+        # Pemetaan berdasarkan label string
+        for fname, meta in (fields_meta or {}).items():
+            label = safe_lower(meta.get('string'))
+            if not label:
+                continue
+            # Coba cocokkan
+            for key, candidates in label_candidates.items():
+                if any(lbl in label for lbl in candidates):
+                    # Validasi tipe dasar wajar (tidak ketat agar fleksibel)
+                    field_map[key] = fname
+        return field_map
+    except Exception:
+        # Jika gagal, pakai fallback
+        return field_map
+
+
+def get_pickup_fields_meta():
+    """
+    Dapatkan metadata field pickup origin/destination (field name, relation model, domain).
+    Note: Origin dan destination sekarang many2one ke model yang sama (x_pickup),
+    tapi mungkin punya domain berbeda untuk membedakan origin vs destination.
+    Menggunakan label untuk deteksi dinamis; fallback ke nama historis.
+    """
+    defaults = {
+        'origin': {
+            'field': 'x_studio_pickup_origin',
+            'relation': None,
+            'domain': []
+        },
+        'destination': {
+            'field': 'x_studio_pickup_destination',
+            'relation': None,
+            'domain': []
+        }
+    }
+    try:
+        fields_meta = get_sale_order_fields_meta()
+
+        def match_field(candidates, default_key):
+            for fname, meta in (fields_meta or {}).items():
+                label = safe_lower(meta.get('string'))
+                if not label:
+                    continue
+                for cand in candidates:
+                    if cand in label:
+                        relation = meta.get('relation')
+                        domain = parse_domain(meta.get('domain', []))
+                        return {
+                            'field': fname,
+                            'relation': relation,
+                            'domain': domain
+                        }
+            return defaults[default_key]
+
+        origin_meta = match_field(['pickup origin', 'origin'], 'origin')
+        dest_meta = match_field(['pickup destination', 'destination'], 'destination')
+
+        # Pastikan domain berbentuk list
+        origin_meta['domain'] = parse_domain(origin_meta.get('domain', []))
+        dest_meta['domain'] = parse_domain(dest_meta.get('domain', []))
+
+        # Jika relation tidak ditemukan, fallback ke defaults
+        if not origin_meta.get('relation'):
+            origin_meta['relation'] = defaults['origin']['relation']
+        if not dest_meta.get('relation'):
+            dest_meta['relation'] = defaults['destination']['relation']
+
+        return {
+            'origin': origin_meta,
+            'destination': dest_meta
+        }
+    except Exception:
+        return defaults
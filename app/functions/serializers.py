@@ -0,0 +1,77 @@
+"""
+JSON serializer backends for API responses
+"""
+import json
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # orjson opsional, fallback ke stdlib
+    orjson = None
+
+
+def _default(value):
+    """
+    Dataclass (mis. row compact dari record_mapper) → dict untuk json stdlib.
+
+    json stdlib hanya bisa menulis objek dari dict, jadi tanpa orjson tiap row
+    compact tetap menjadi dict sementara saat di-encode (dibuang setelah row
+    itu ditulis). Penghematan memori listing tetap ada, tapi encode tanpa
+    dict per record hanya terjadi dengan orjson.
+    """
+    fields = getattr(value, '__dataclass_fields__', None)
+    if fields is None:
+        raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+    return {name: getattr(value, name) for name in fields}
+
+
+def _stdlib_dumps(data, pretty=False):
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=2, default=_default).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def _orjson_dumps(data, pretty=False):
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    try:
+        return orjson.dumps(data, option=option)
+    except TypeError:
+        # Tipe yang tidak didukung orjson (mis. int > 64 bit) → stdlib
+        return _stdlib_dumps(data, pretty)
+
+
+# Backend yang tersedia; urutan menentukan pilihan untuk mode 'auto'
+SERIALIZERS = {}
+if orjson is not None:
+    SERIALIZERS['orjson'] = _orjson_dumps
+SERIALIZERS['stdlib'] = _stdlib_dumps
+
+
+def get_serializer(name=None):
+    """
+    Pilih fungsi serializer berdasarkan nama (Config.JSON_SERIALIZER).
+
+    'auto' memakai backend tercepat yang ter-install. Nama yang tidak
+    tersedia (mis. 'orjson' tanpa package-nya) jatuh ke stdlib.
+    """
+    name = (name or Config.JSON_SERIALIZER).lower()
+    if name == 'auto':
+        return next(iter(SERIALIZERS.values()))
+    return SERIALIZERS.get(name, _stdlib_dumps)
+
+
+_dumps = get_serializer()
+
+
+def dumps(data, pretty=False):
+    """Serialize ke bytes UTF-8 dengan urutan key dipertahankan (compact default)"""
+    return _dumps(data, pretty)
+
+
+def loads(data):
+    """Parse JSON (bytes/str) dengan backend tercepat yang ter-install"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,271 @@
+"""
+Incremental write_date sync of Odoo models into the local mirror
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from config import Config
+from app.models.odoo_connection import odoo
+from app.models.odoo_mirror import OdooMirror, MirrorMiss, MIRROR_METHODS, MIRROR_FIELD_TYPES, query_fields
+from app.functions.odoo_functions import chunked, iter_search_read
+from app.functions.schema_cache import get_fields_meta
+from app.functions.pagination import parse_int_arg
+
+ODOO_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Field yang selalu di-mirror (jika ada di model) selain field yang diminta request
+SYNC_SEED_FIELDS = ('id', 'write_date', 'active', 'display_name')
+
+
+class SyncEngine:
+    """
+    Sinkronisasi incremental model Odoo ke OdooMirror di thread background.
+
+    Model dan field yang di-mirror mengikuti kebutuhan: query yang tidak bisa
+    dijawab mirror mendaftarkan model/field-nya lewat `want()`, lalu siklus
+    berikutnya memuatnya. Tiap `interval` detik, per model:
+
+    - polling `search_read` dengan `write_date >= watermark - overlap`
+      (urutan write_date, id; dipotong per `batch_size` dengan keyset);
+      overlap menangkap transaksi panjang yang commit terlambat;
+    - tiap `reconcile_interval` detik, (id, write_date) di Odoo dibandingkan
+      dengan mirror: ID yang hilang (dihapus) dibuang, ID yang belum ada atau
+      write_date-nya berbeda (update yang terlewat polling) dibaca ulang.
+
+    Record yang diarsipkan tetap di-mirror; evaluator mirror menyembunyikannya
+    seperti active_test Odoo.
+
+    Satu engine per proses: tiap worker mem-polling Odoo sendiri dan menulis
+    file mirror sendiri (lihat OdooMirror), dan `invalidate()` hanya berlaku
+    untuk worker yang menerimanya.
+    """
+
+    def __init__(self, client, mirror, interval=10, reconcile_interval=3600, batch_size=2000,
+                 overlap=60, models=None):
+        self.client = client
+        self.mirror = mirror
+        self.interval = interval
+        self.reconcile_interval = reconcile_interval
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.models = set(models) if models else None
+        self._wanted = {}
+        self._default_orders = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = {}
+
+    def want(self, model, fields=()):
+        """Daftarkan model (dan field) yang perlu di-mirror"""
+        if self.models is not None and model not in self.models:
+            return
+        with self._lock:
+            wanted = self._wanted.get(model)
+            new = wanted is None or not set(fields) <= wanted
+            if new:
+                self._wanted[model] = (wanted or set()) | set(fields)
+        if new:
+            self._wake.set()
+        self._ensure_worker()
+
+    def invalidate(self, model=None):
+        """Buang mirror (satu model atau semua); siklus berikutnya sync ulang penuh"""
+        if not Config.SYNC_ENABLED:
+            return
+        self.mirror.reset(model)
+        with self._lock:
+            if model is None:
+                self._default_orders.clear()
+            else:
+                self._default_orders.pop(model, None)
+        self._wake.set()
+
+    def _default_order(self, model):
+        """
+        `_order` model dari ir.model (Odoo 16+), untuk search tanpa order.
+        None jika tidak tersedia: query seperti itu tetap dijawab Odoo.
+        """
+        if model not in self._default_orders:
+            try:
+                rows = self.client.execute_kw(
+                    'ir.model', 'search_read',
+                    [[['model', '=', model]]], {'fields': ['order']}
+                )
+                self._default_orders[model] = (rows[0].get('order') or None) if rows else None
+            except Exception:
+                self._default_orders[model] = None
+        return self._default_orders[model]
+
+    def _since(self, watermark):
+        if not watermark:
+            return None
+        try:
+            moment = datetime.strptime(watermark, ODOO_DATETIME_FORMAT)
+        except ValueError:
+            return watermark
+        return (moment - timedelta(seconds=self.overlap)).strftime(ODOO_DATETIME_FORMAT)
+
+    def sync_model(self, model):
+        """Satu siklus sync untuk `model` (polling perubahan + rekonsiliasi jika jatuh tempo)"""
+        meta = get_fields_meta(model, ['type', 'store'])
+        if 'write_date' not in meta:
+            raise ValueError(f'{model} has no write_date and cannot be mirrored')
+        with self._lock:
+            wanted = set(self._wanted.get(model, ()))
+        types = {
+            field: meta[field]['type']
+            for field in sorted(wanted | set(SYNC_SEED_FIELDS))
+            if field in meta and meta[field].get('type') in MIRROR_FIELD_TYPES
+        }
+        table = self.mirror.configure(model, types, self._default_order(model))
+        base = [['active', 'in', [True, False]]] if 'active' in types else []
+
+        started = time.time()
+        self._poll(model, base, list(types), self._since(table.watermark))
+        self.mirror.mark(model, synced_at=started)
+
+        if table.reconciled_at is None or started - table.reconciled_at >= self.reconcile_interval:
+            self._reconcile(model, base, list(types))
+            self.mirror.mark(model, reconciled_at=started)
+
+    def _poll(self, model, base, fields, since):
+        last = None
+        while True:
+            domain = list(base)
+            if last is not None:
+                domain.extend(['|', ['write_date', '>', last[0]],
+                               '&', ['write_date', '=', last[0]], ['id', '>', last[1]]])
+            elif since is not None:
+                domain.append(['write_date', '>=', since])
+            batch = self.client.execute_kw(
+                model, 'search_read', [domain],
+                {'fields': fields, 'limit': self.batch_size, 'order': 'write_date asc, id asc'}
+            )
+            self.mirror.upsert(model, batch)
+            if len(batch) < self.batch_size or not batch[-1].get('write_date'):
+                return
+            last = (batch[-1]['write_date'], batch[-1]['id'])
+
+    def _reconcile(self, model, base, fields):
+        odoo_dates = {}
+        for batch in iter_search_read(self.client, model, base, ['id', 'write_date'], self.batch_size):
+            odoo_dates.update((record['id'], record.get('write_date')) for record in batch)
+        local_dates = self.mirror.write_dates(model)
+        self.mirror.delete(model, sorted(set(local_dates) - set(odoo_dates)))
+        stale = [
+            record_id for record_id, write_date in sorted(odoo_dates.items())
+            if record_id not in local_dates or local_dates[record_id] != write_date
+        ]
+        for ids in chunked(stale, self.batch_size):
+            records = self.client.execute_kw(model, 'read', [ids], {'fields': fields})
+            self.mirror.upsert(model, records, advance=False)
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._run, name='odoo-mirror-sync', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            with self._lock:
+                models = list(self._wanted)
+            for model in models:
+                try:
+                    self.sync_model(model)
+                    self.errors.pop(model, None)
+                except Exception as e:
+                    # Mirror lama tetap ada; begitu melewati batas staleness, request dijawab Odoo
+                    self.errors[model] = str(e)
+                    print(f"Mirror sync of {model} failed: {e}")
+            self._wake.wait(self.interval)
+
+    def stats(self):
+        return {
+            'enabled': Config.SYNC_ENABLED,
+            'db_path': self.mirror.db_path,
+            'hits': self.hits,
+            'misses': self.misses,
+            'models': self.mirror.stats(),
+            'errors': dict(self.errors)
+        }
+
+
+sync_engine = SyncEngine(
+    odoo,
+    OdooMirror(Config.SYNC_DB_PATH),
+    interval=Config.SYNC_INTERVAL,
+    reconcile_interval=Config.SYNC_RECONCILE_INTERVAL,
+    batch_size=Config.SYNC_BATCH_SIZE,
+    overlap=Config.SYNC_WATERMARK_OVERLAP,
+    models=[m.strip() for m in Config.SYNC_MODELS.split(',') if m.strip()]
+)
+
+
+class MirrorClient:
+    """
+    Client read-only untuk flow listing/lookup: call read-only dijawab dari
+    mirror jika datanya tidak lebih tua dari `max_staleness` detik, selain
+    itu (dan untuk method lain) diteruskan ke client Odoo.
+    """
+
+    def __init__(self, client, engine, max_staleness):
+        self.client = client
+        self.engine = engine
+        self.max_staleness = max_staleness
+
+    def _from_mirror(self, model, method, args, kwargs):
+        try:
+            result = self.engine.mirror.execute(model, method, args, kwargs, self.max_staleness)
+        except MirrorMiss as miss:
+            self.engine.misses += 1
+            self.engine.want(model, miss.fields | query_fields(args, kwargs))
+            raise
+        self.engine.hits += 1
+        return result
+
+    def execute_kw(self, model, method, args=None, kwargs=None):
+        if method in MIRROR_METHODS:
+            try:
+                return self._from_mirror(model, method, args, kwargs)
+            except MirrorMiss:
+                pass
+        return self.client.execute_kw(model, method, args, kwargs)
+
+
+class AsyncMirrorClient(MirrorClient):
+    """MirrorClient untuk AsyncOdooClient; evaluasi mirror berjalan di thread executor"""
+
+    async def execute_kw(self, model, method, args=None, kwargs=None):
+        if method in MIRROR_METHODS:
+            try:
+                return await asyncio.to_thread(self._from_mirror, model, method, args, kwargs)
+            except MirrorMiss:
+                pass
+        return await self.client.execute_kw(model, method, args, kwargs)
+
+
+def read_client(client, args):
+    """
+    Client untuk endpoint baca: MirrorClient jika SYNC_ENABLED, selain itu `client`.
+
+    Query param `max_staleness` (detik) menimpa SYNC_MAX_STALENESS;
+    `max_staleness=0` memaksa data langsung dari Odoo.
+
+    Raises:
+        ValueError: jika max_staleness bukan integer >= 0
+    """
+    max_staleness = parse_int_arg(args, 'max_staleness', Config.SYNC_MAX_STALENESS)
+    if not Config.SYNC_ENABLED or not max_staleness:
+        return client
+    if asyncio.iscoroutinefunction(client.execute_kw):
+        return AsyncMirrorClient(client, sync_engine, max_staleness)
+    return MirrorClient(client, sync_engine, max_staleness)
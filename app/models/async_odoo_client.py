@@ -0,0 +1,125 @@
+"""
+Asyncio Odoo JSON-RPC client with a pooled HTTP connection
+"""
+import asyncio
+import itertools
+from app.functions.serializers import loads
+from app.models.odoo_client import (
+    OdooAuthError, jsonrpc_payload, jsonrpc_result,
+    cached_uid, store_uid, is_access_denied
+)
+from app.models.circuit_breaker import CircuitBreaker, RetryPolicy, OdooHTTPError, parse_retry_after
+
+try:
+    import httpx
+except ImportError:  # httpx hanya dibutuhkan untuk mode async (asgi.py)
+    httpx = None
+
+
+class AsyncOdooClient:
+    """
+    Client Odoo non-blocking lewat endpoint `/jsonrpc`.
+
+    Satu `httpx.AsyncClient` dipakai bersama oleh semua request di event
+    loop; koneksi keep-alive dibatasi `pool_size`. Request yang menunggu
+    koneksi tidak memakan thread, sehingga ratusan request bisa menunggu
+    Odoo bersamaan dalam satu proses.
+
+    uid diambil dari cache yang sama dengan OdooClient (per url, db,
+    username); autentikasi dilakukan lazy dan diulang hanya saat AccessDenied.
+    Circuit breaker dan retry method idempotent sama dengan OdooClient.
+    """
+
+    def __init__(self, url, db, username, api_key, pool_size=100, timeout=60.0,
+                 breaker=None, retry=None):
+        if httpx is None:
+            raise RuntimeError('Async mode requires httpx (pip install httpx)')
+        self.url = url.rstrip('/')
+        self.db = db
+        self.username = username
+        self.api_key = api_key
+        self.pool_size = max(1, int(pool_size))
+        self._ids = itertools.count(1)
+        self._auth_lock = asyncio.Lock()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.retry = retry if retry is not None else RetryPolicy()
+        self._client = httpx.AsyncClient(
+            base_url=self.url,
+            timeout=httpx.Timeout(timeout, pool=None),
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        )
+
+    async def call(self, service, method, *args):
+        """Panggil `service.method(*args)` di Odoo lewat JSON-RPC"""
+        try:
+            response = await self._client.post('/jsonrpc', json=jsonrpc_payload(service, method, args, next(self._ids)))
+        except httpx.TimeoutException as e:
+            # Samakan dengan error socket client sync (lihat circuit_breaker.is_transient)
+            raise TimeoutError(str(e) or 'Odoo call timed out') from e
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e) or type(e).__name__) from e
+        if response.status_code != 200:
+            raise OdooHTTPError(response.status_code, parse_retry_after(response.headers.get('Retry-After')))
+        return jsonrpc_result(loads(response.content))
+
+    @property
+    def auth_key(self):
+        return (self.url, self.db, self.username)
+
+    async def authenticate(self, stale_uid=None):
+        """Autentikasi single-flight; uid disimpan di cache bersama"""
+        async with self._auth_lock:
+            uid = cached_uid(self.auth_key)
+            if uid and uid != stale_uid:
+                return uid
+            uid = await self.call('common', 'authenticate', self.db, self.username, self.api_key, {})
+            if not uid:
+                raise OdooAuthError('Authentication failed. Please check your credentials.')
+            store_uid(self.auth_key, uid)
+            return uid
+
+    async def execute_kw(self, model, method, args=None, kwargs=None):
+        """Panggil `execute_kw` Odoo tanpa memblokir event loop"""
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.before_call()
+            try:
+                result = await self._authenticated_execute_kw(model, method, args, kwargs)
+            except (OdooAuthError, asyncio.CancelledError):
+                self.breaker.release()
+                raise
+            except Exception as e:
+                self.breaker.record_failure(e)
+                if not self.retry.should_retry(method, e, attempt):
+                    raise
+                delay = self.retry.delay(e, attempt)
+            else:
+                self.breaker.record_success()
+                return result
+            await asyncio.sleep(delay)
+
+    async def _authenticated_execute_kw(self, model, method, args, kwargs):
+        uid = cached_uid(self.auth_key) or await self.authenticate()
+        try:
+            return await self._execute_kw(uid, model, method, args, kwargs)
+        except Exception as e:
+            if not is_access_denied(e):
+                raise
+        uid = await self.authenticate(stale_uid=uid)
+        return await self._execute_kw(uid, model, method, args, kwargs)
+
+    async def _execute_kw(self, uid, model, method, args, kwargs):
+        return await self.call(
+            'object', 'execute_kw',
+            self.db, uid, self.api_key,
+            model, method,
+            args if args is not None else [],
+            kwargs if kwargs is not None else {}
+        )
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    def stats(self):
+        return {'pool_size': self.pool_size, 'circuit_breaker': self.breaker.stats()}
@@ -0,0 +1,190 @@
+"""
+Circuit breaker and retry policy for Odoo RPC calls
+"""
+import http.client
+import random
+import socket
+import threading
+import time
+import xmlrpc.client
+
+# Method Odoo yang hanya membaca data: aman diulang jika gagal di tengah jalan.
+# create/write/unlink dan method lain TIDAK pernah diulang otomatis, karena
+# Odoo mungkin sudah memprosesnya sebelum koneksi terputus.
+IDEMPOTENT_METHODS = frozenset(('read', 'search', 'search_read', 'fields_get', 'search_count'))
+
+# Status HTTP yang berarti Odoo sedang sibuk/terbatas, bukan error aplikasi
+RETRYABLE_STATUS = frozenset((429, 502, 503, 504))
+
+
+class CircuitOpenError(Exception):
+    """Circuit breaker terbuka: call Odoo ditolak tanpa round trip"""
+
+
+class OdooHTTPError(Exception):
+    """Odoo membalas dengan status HTTP selain 200"""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f'Odoo HTTP {status}')
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    """Nilai header Retry-After (detik) atau None jika tidak ada/tidak valid"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_transient(error):
+    """
+    True jika error berasal dari transport (timeout, koneksi putus, Odoo
+    overload), bukan dari logika Odoo. Hanya error ini yang dihitung oleh
+    circuit breaker dan boleh di-retry.
+    """
+    if isinstance(error, xmlrpc.client.ProtocolError):
+        return error.errcode in RETRYABLE_STATUS
+    if isinstance(error, OdooHTTPError):
+        return error.status in RETRYABLE_STATUS
+    if isinstance(error, xmlrpc.client.Fault):
+        return False
+    return isinstance(error, (socket.timeout, OSError, http.client.HTTPException))
+
+
+def retry_after(error):
+    """Jeda yang diminta Odoo (header Retry-After pada 429/503), jika ada"""
+    if isinstance(error, xmlrpc.client.ProtocolError):
+        return parse_retry_after((error.headers or {}).get('Retry-After'))
+    return getattr(error, 'retry_after', None)
+
+
+class RetryPolicy:
+    """
+    Retry dengan exponential backoff + full jitter untuk method idempotent.
+
+    Jeda setelah percobaan ke-n gagal = acak(0, min(max_delay, base_delay * 2**(n-1))); jika
+    Odoo mengirim Retry-After, nilai itu dipakai (tetap dibatasi max_delay).
+    """
+
+    def __init__(self, attempts=3, base_delay=0.5, max_delay=5.0):
+        self.attempts = max(1, int(attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, method, error, attempt):
+        """attempt = nomor percobaan yang baru gagal (mulai 1)"""
+        return attempt < self.attempts and method in IDEMPOTENT_METHODS and is_transient(error)
+
+    def delay(self, error, attempt):
+        requested = retry_after(error)
+        if requested is not None:
+            return min(self.max_delay, requested)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker tiga status untuk satu upstream Odoo.
+
+    - closed: call berjalan normal; `failure_threshold` kegagalan transport
+      berturut-turut membuka circuit.
+    - open: call langsung ditolak (CircuitOpenError) selama `reset_timeout`
+      detik, sehingga thread worker tidak menunggu Odoo yang sedang down.
+    - half_open: setelah jeda, satu call percobaan dilewatkan; sukses
+      menutup circuit, gagal membukanya lagi.
+
+    Error aplikasi Odoo (Fault, validasi) tidak dihitung sebagai kegagalan.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self.last_error = None
+        self.rejected = 0
+        self.times_opened = 0
+
+    def _refresh(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def before_call(self):
+        """Panggil sebelum RPC; raise CircuitOpenError jika call harus ditolak"""
+        with self._lock:
+            self._refresh()
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejected += 1
+            if self._state == self.OPEN:
+                wait = self.reset_timeout - (time.monotonic() - self._opened_at)
+                message = f'Odoo circuit breaker is open, retry in {wait:.1f}s: {self.last_error}'
+            else:
+                message = f'Odoo circuit breaker is half-open, trial call in progress: {self.last_error}'
+        raise CircuitOpenError(message)
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release(self):
+        """Call batal sebelum mencapai Odoo; bebaskan slot percobaan half-open"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self, error):
+        """Catat hasil call yang gagal; hanya error transport yang dihitung"""
+        with self._lock:
+            if not is_transient(error):
+                # Odoo menjawab (walau error) → upstream sehat
+                self._state = self.CLOSED
+                self._failures = 0
+                self._trial_in_flight = False
+                return
+            self._failures += 1
+            self.last_error = str(error) or type(error).__name__
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def stats(self):
+        """Ringkasan status breaker (untuk health check)"""
+        with self._lock:
+            self._refresh()
+            retry_in = None
+            if self._state == self.OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1)
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'retry_in': retry_in,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+                'last_error': self.last_error
+            }
@@ -0,0 +1,378 @@
+"""
+Pooled, thread-safe Odoo client (XML-RPC or JSON-RPC transport)
+"""
+import http.client
+import itertools
+import json
+import queue
+import threading
+import time
+import xmlrpc.client
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from app.functions.serializers import loads
+from app.models.circuit_breaker import CircuitBreaker, RetryPolicy, OdooHTTPError, parse_retry_after
+
+TRANSPORTS = ('xmlrpc', 'jsonrpc')
+
+
+class OdooPoolTimeout(Exception):
+    """Tidak ada koneksi Odoo yang tersedia dalam batas waktu checkout"""
+
+
+class OdooAuthError(Exception):
+    """Autentikasi Odoo gagal atau sedang dalam jeda retry"""
+
+
+class OdooRPCError(Exception):
+    """Error yang dikembalikan Odoo lewat JSON-RPC (`name` = kelas exception Odoo)"""
+
+    def __init__(self, message, name=None):
+        super().__init__(message)
+        self.name = name
+
+
+def jsonrpc_payload(service, method, args, request_id):
+    """Body request `/jsonrpc` untuk `service.method(*args)`"""
+    return {
+        'jsonrpc': '2.0',
+        'method': 'call',
+        'params': {'service': service, 'method': method, 'args': list(args)},
+        'id': request_id
+    }
+
+
+def jsonrpc_result(payload):
+    """Ambil `result` dari response `/jsonrpc`; error Odoo menjadi OdooRPCError"""
+    error = payload.get('error')
+    if error:
+        data = error.get('data') or {}
+        raise OdooRPCError(data.get('message') or error.get('message') or str(error), data.get('name'))
+    return payload.get('result')
+
+
+class JsonRpcConnection:
+    """
+    Satu koneksi HTTP(S) keep-alive ke endpoint `/jsonrpc` Odoo.
+
+    Antarmukanya sama dengan ServerProxy XML-RPC untuk `execute_kw`, jadi
+    bisa dipakai bergantian di pool. Tidak thread-safe (satu per slot pool).
+    """
+
+    def __init__(self, url, timeout=None):
+        parts = urlsplit(url)
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self._host = parts.netloc
+        self._timeout = timeout
+        self._path = parts.path.rstrip('/') + '/jsonrpc'
+        self._conn = None
+        self._ids = itertools.count(1)
+
+    def _post(self, body):
+        # Coba ulang sekali jika koneksi keep-alive sudah ditutup server
+        # (perilaku yang sama dengan xmlrpc.client.Transport)
+        for attempt in (0, 1):
+            if self._conn is None:
+                if self._timeout is None:
+                    self._conn = self._connection_class(self._host)
+                else:
+                    self._conn = self._connection_class(self._host, timeout=self._timeout)
+            try:
+                self._conn.request('POST', self._path, body, {'Content-Type': 'application/json'})
+                response = self._conn.getresponse()
+                return response.status, response.getheader('Retry-After'), response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.close()
+                if attempt:
+                    raise
+            except Exception:
+                self.close()
+                raise
+
+    def call(self, service, method, *args):
+        """Panggil `service.method(*args)` di Odoo"""
+        body = json.dumps(jsonrpc_payload(service, method, args, next(self._ids))).encode('utf-8')
+        status, retry_after, data = self._post(body)
+        if status != 200:
+            raise OdooHTTPError(status, parse_retry_after(retry_after))
+        return jsonrpc_result(loads(data))
+
+    def execute_kw(self, *args):
+        return self.call('object', 'execute_kw', *args)
+
+    def authenticate(self, db, username, password, user_agent_env):
+        return self.call('common', 'authenticate', db, username, password, user_agent_env)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# uid per (url, db, username), dipakai bersama oleh client sync dan async
+_uid_cache = {}
+
+# Kode fault XML-RPC Odoo untuk AccessDenied (kredensial/sesi ditolak)
+XMLRPC_ACCESS_DENIED = 3
+
+
+def cached_uid(key):
+    return _uid_cache.get(key)
+
+
+def store_uid(key, uid):
+    _uid_cache[key] = uid
+
+
+def is_access_denied(error):
+    """True jika error Odoo berarti kredensial ditolak (perlu autentikasi ulang)"""
+    if isinstance(error, xmlrpc.client.Fault):
+        return error.faultCode == XMLRPC_ACCESS_DENIED or 'AccessDenied' in str(error.faultString)
+    if isinstance(error, OdooRPCError):
+        return error.name == 'odoo.exceptions.AccessDenied'
+    return False
+
+
+class _TimeoutMixin:
+    """Transport XML-RPC dengan socket timeout per call (default stdlib: tanpa batas)"""
+
+    def __init__(self, timeout=None, **kwargs):
+        super().__init__(**kwargs)
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        conn = super().make_connection(host)
+        if self.timeout is not None:
+            conn.timeout = self.timeout
+        return conn
+
+
+class TimeoutTransport(_TimeoutMixin, xmlrpc.client.Transport):
+    pass
+
+
+class SafeTimeoutTransport(_TimeoutMixin, xmlrpc.client.SafeTransport):
+    pass
+
+
+def xmlrpc_proxy(url, service, timeout=None):
+    """ServerProxy `/xmlrpc/2/<service>` dengan transport keep-alive ber-timeout"""
+    if url.startswith('https'):
+        transport = SafeTimeoutTransport(timeout=timeout)
+    else:
+        transport = TimeoutTransport(timeout=timeout)
+    return xmlrpc.client.ServerProxy('{}/xmlrpc/2/{}'.format(url, service), transport=transport)
+
+
+def authenticate(url, db, username, api_key, transport='xmlrpc', timeout=None):
+    """Autentikasi ke Odoo dengan transport yang dipilih; kembalikan uid (False jika gagal)"""
+    if transport == 'jsonrpc':
+        connection = JsonRpcConnection(url.rstrip('/'), timeout=timeout)
+        try:
+            return connection.authenticate(db, username, api_key, {})
+        finally:
+            connection.close()
+    return xmlrpc_proxy(url.rstrip('/'), 'common', timeout).authenticate(db, username, api_key, {})
+
+
+class OdooClient:
+    """
+    Client Odoo dengan pool koneksi XML-RPC yang dibatasi jumlahnya.
+
+    `xmlrpc.client.ServerProxy` tidak thread-safe, jadi setiap thread
+    melakukan checkout satu proxy (dengan transport keep-alive miliknya
+    sendiri) selama pemanggilan berlangsung, lalu mengembalikannya ke pool.
+    Kredensial (db, username, api key) disimpan di client sehingga call site
+    cukup menyebut model, method dan argumen.
+
+    Autentikasi dilakukan lazy saat call pertama (bukan saat import), uid
+    di-cache per (url, db, username) dan hanya diminta ulang jika Odoo
+    membalas AccessDenied. Setelah autentikasi gagal, percobaan berikutnya
+    ditahan `auth_retry_interval` detik agar endpoint auth tidak dibanjiri.
+
+    `transport` memilih protokol: 'xmlrpc' (`/xmlrpc/2/object`) atau
+    'jsonrpc' (`/jsonrpc`, payload lebih kecil dan decode lebih cepat).
+    Semantik `execute_kw` sama untuk keduanya.
+
+    Setiap call dibatasi `call_timeout` detik. Kegagalan transport dihitung
+    oleh `breaker` (CircuitBreaker) yang menolak call secara cepat saat Odoo
+    down; method idempotent (read/search/...) di-retry sesuai `retry`
+    (RetryPolicy), sedangkan create/write tidak pernah diulang otomatis.
+    """
+
+    def __init__(self, url, db, username, api_key, pool_size=8, checkout_timeout=30.0,
+                 transport='xmlrpc', auth_retry_interval=10.0, call_timeout=None,
+                 breaker=None, retry=None):
+        if transport not in TRANSPORTS:
+            raise ValueError(f'Unknown Odoo transport {transport!r}, expected one of {TRANSPORTS}')
+        self.url = url.rstrip('/')
+        self.transport = transport
+        self.db = db
+        self.username = username
+        self.api_key = api_key
+        self.pool_size = max(1, int(pool_size))
+        self.checkout_timeout = checkout_timeout
+        self.auth_retry_interval = auth_retry_interval
+        self.call_timeout = call_timeout
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.retry = retry if retry is not None else RetryPolicy()
+
+        self._pool = queue.LifoQueue(maxsize=self.pool_size)
+        self._created = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self._auth_lock = threading.Lock()
+        self._auth_failed_at = None
+        self.last_auth_error = None
+
+    @property
+    def auth_key(self):
+        return (self.url, self.db, self.username)
+
+    @property
+    def uid(self):
+        """uid Odoo; autentikasi dilakukan saat pertama dibutuhkan"""
+        return cached_uid(self.auth_key) or self.authenticate()
+
+    def authenticate(self, stale_uid=None):
+        """
+        Autentikasi ke Odoo (single-flight) dan simpan uid di cache.
+
+        Args:
+            stale_uid: uid yang baru ditolak Odoo; jika thread lain sudah
+                menggantinya, uid baru itu dipakai tanpa autentikasi ulang
+
+        Raises:
+            OdooAuthError: kredensial ditolak, atau masih dalam jeda retry
+        """
+        with self._auth_lock:
+            uid = cached_uid(self.auth_key)
+            if uid and uid != stale_uid:
+                return uid
+            if self._auth_failed_at is not None:
+                wait = self.auth_retry_interval - (time.monotonic() - self._auth_failed_at)
+                if wait > 0:
+                    raise OdooAuthError(f'Odoo authentication failed, retry in {wait:.1f}s: {self.last_auth_error}')
+            try:
+                uid = authenticate(self.url, self.db, self.username, self.api_key, self.transport, self.call_timeout)
+                if not uid:
+                    raise OdooAuthError('Authentication failed. Please check your credentials.')
+            except Exception as e:
+                self._auth_failed_at = time.monotonic()
+                self.last_auth_error = str(e)
+                raise
+            self._auth_failed_at = None
+            self.last_auth_error = None
+            store_uid(self.auth_key, uid)
+            print(f"Authentication successful. User ID: {uid}")
+            return uid
+
+    def _new_proxy(self):
+        if self.transport == 'jsonrpc':
+            return JsonRpcConnection(self.url, timeout=self.call_timeout)
+        # Transport menyimpan koneksi HTTP(S) dan memakainya ulang (keep-alive)
+        return xmlrpc_proxy(self.url, 'object', self.call_timeout)
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Buat proxy baru selama pool belum penuh
+        with self._lock:
+            can_create = self._created < self.pool_size
+            if can_create:
+                self._created += 1
+        if can_create:
+            return self._new_proxy()
+
+        try:
+            return self._pool.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise OdooPoolTimeout(
+                f'No Odoo connection available after {self.checkout_timeout}s '
+                f'(pool size {self.pool_size})'
+            )
+
+    @contextmanager
+    def checkout(self):
+        """Pinjam satu proxy untuk thread ini; re-entrant di thread yang sama"""
+        held = getattr(self._local, 'proxy', None)
+        if held is not None:
+            yield held
+            return
+
+        proxy = self._acquire()
+        self._local.proxy = proxy
+        try:
+            yield proxy
+        finally:
+            self._local.proxy = None
+            self._pool.put(proxy)
+
+    def execute_kw(self, model, method, args=None, kwargs=None):
+        """
+        Panggil `execute_kw` Odoo lewat koneksi dari pool.
+
+        Raises:
+            CircuitOpenError: Odoo dianggap down, call ditolak tanpa round trip
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.before_call()
+            try:
+                result = self._authenticated_execute_kw(model, method, args, kwargs)
+            except (OdooPoolTimeout, OdooAuthError):
+                # Tidak sampai ke Odoo (pool penuh / jeda auth): bukan sinyal kesehatan upstream
+                self.breaker.release()
+                raise
+            except Exception as e:
+                self.breaker.record_failure(e)
+                if not self.retry.should_retry(method, e, attempt):
+                    raise
+                delay = self.retry.delay(e, attempt)
+            else:
+                self.breaker.record_success()
+                return result
+            time.sleep(delay)
+
+    def _authenticated_execute_kw(self, model, method, args, kwargs):
+        uid = self.uid
+        try:
+            return self._execute_kw(uid, model, method, args, kwargs)
+        except Exception as e:
+            if not is_access_denied(e):
+                raise
+        # AccessDenied: call belum dijalankan Odoo, aman diulang setelah re-auth
+        uid = self.authenticate(stale_uid=uid)
+        return self._execute_kw(uid, model, method, args, kwargs)
+
+    def _execute_kw(self, uid, model, method, args, kwargs):
+        with self.checkout() as proxy:
+            return proxy.execute_kw(
+                self.db, uid, self.api_key,
+                model, method,
+                args if args is not None else [],
+                kwargs if kwargs is not None else {}
+            )
+
+    def auth_status(self):
+        """Status autentikasi tanpa memicu round trip (untuk health check)"""
+        uid = cached_uid(self.auth_key)
+        return {
+            'authenticated': bool(uid),
+            'user_id': uid or None,
+            'last_error': self.last_auth_error
+        }
+
+    def stats(self):
+        """Ringkasan kondisi pool (untuk health check)"""
+        return {
+            'transport': self.transport,
+            'pool_size': self.pool_size,
+            'connections_open': self._created,
+            'connections_idle': self._pool.qsize()
+        }
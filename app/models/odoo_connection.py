@@ -1,36 +1,26 @@
 """
 Odoo connection and authentication
 """
-import xmlrpc.client
 from config import Config
+from app.models.odoo_client import OdooClient
+from app.models.circuit_breaker import CircuitBreaker, RetryPolicy
 
 # Configuration
 ODOO_URL = Config.ODOO_URL
 ODOO_DB = Config.ODOO_DB
 ODOO_USERNAME = Config.ODOO_USERNAME
 ODOO_API_KEY = Config.ODOO_API_KEY
-
-# Initialize Odoo connection
-common = xmlrpc.client.ServerProxy('{}/xmlrpc/2/common'.format(ODOO_URL))
-models = xmlrpc.client.ServerProxy('{}/xmlrpc/2/object'.format(ODOO_URL))
-
-# Authenticate
-uid = common.authenticate(ODOO_DB, ODOO_USERNAME, ODOO_API_KEY, {})
-
-if not uid:
-    print("Authentication failed. Please check your credentials.")
-    exit()
-
-print(f"Authentication successful. User ID: {uid}")
-
-
-
-
-
-
-
-
-
-
-
-
+ODOO_TRANSPORT = Config.ODOO_TRANSPORT
+
+# Pooled client (thread-safe) untuk semua pemanggilan execute_kw.
+# Tidak ada round trip saat import: autentikasi dilakukan saat call pertama.
+odoo = OdooClient(
+    ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_API_KEY,
+    pool_size=Config.ODOO_POOL_SIZE,
+    checkout_timeout=Config.ODOO_POOL_TIMEOUT,
+    transport=ODOO_TRANSPORT,
+    auth_retry_interval=Config.ODOO_AUTH_RETRY_INTERVAL,
+    call_timeout=Config.ODOO_CALL_TIMEOUT,
+    breaker=CircuitBreaker(Config.ODOO_BREAKER_THRESHOLD, Config.ODOO_BREAKER_RESET_TIMEOUT),
+    retry=RetryPolicy(Config.ODOO_RETRY_ATTEMPTS, Config.ODOO_RETRY_BACKOFF, Config.ODOO_RETRY_BACKOFF_MAX)
+)
@@ -0,0 +1,552 @@
+"""
+Local SQLite mirror of Odoo records with an in-memory domain evaluator
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa flock, file mirror per PID
+    fcntl = None
+
+# Method read-only yang bisa dijawab dari mirror
+MIRROR_METHODS = frozenset(('search_read', 'search_count', 'search', 'read'))
+
+# Tipe field yang bisa di-mirror: nilai skalar atau many2one ([id, name])
+MIRROR_FIELD_TYPES = frozenset((
+    'char', 'text', 'selection', 'integer', 'float', 'monetary',
+    'boolean', 'date', 'datetime', 'many2one'
+))
+
+_STRING_TYPES = frozenset(('char', 'text', 'selection', 'date', 'datetime'))
+# String yang urutannya mengikuti collation Postgres (tidak ditiru di mirror);
+# date/datetime Odoo berformat ISO sehingga urutan string = urutan waktu
+_COLLATED_TYPES = frozenset(('char', 'text', 'selection'))
+_NUMERIC_TYPES = frozenset(('integer', 'float', 'monetary'))
+_LIKE_OPERATORS = frozenset(('like', 'ilike', 'not like', 'not ilike', '=like', '=ilike'))
+_COMPARE_OPERATORS = {
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b
+}
+
+
+class MirrorMiss(Exception):
+    """Query tidak bisa dijawab dari mirror; pemanggil fallback ke Odoo"""
+
+    def __init__(self, reason, fields=()):
+        super().__init__(reason)
+        # Field yang belum di-mirror tapi dibutuhkan query ini
+        self.fields = frozenset(fields)
+
+
+def _getter(field, ftype):
+    """Nilai field untuk evaluasi domain; NULL/False Odoo menjadi None"""
+    if ftype == 'many2one':
+        return lambda record: record[field][0] if record.get(field) else None
+    if ftype == 'boolean':
+        return lambda record: bool(record.get(field))
+    # Identitas (bukan ==): 0 dan 0.0 adalah nilai, bukan NULL
+    return lambda record: None if record.get(field) is None or record.get(field) is False else record.get(field)
+
+
+def _check_value(field, ftype, value):
+    """Tolak nilai yang perbandingannya tidak bisa ditiru dengan pasti"""
+    if ftype == 'many2one' or field == 'id':
+        ok = isinstance(value, int) and not isinstance(value, bool)
+    elif ftype in _NUMERIC_TYPES:
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif ftype in _STRING_TYPES:
+        ok = isinstance(value, str)
+    else:
+        ok = isinstance(value, bool)
+    if not ok:
+        raise MirrorMiss(f'Unsupported value {value!r} for {field}')
+
+
+def _like_regex(pattern, operator):
+    """Terjemahkan operator like Odoo menjadi regex (fullmatch)"""
+    if not operator.startswith('='):
+        pattern = f'%{pattern}%'
+    regex = ''.join('.*' if c == '%' else '.' if c == '_' else re.escape(c) for c in pattern)
+    return re.compile(regex, re.S | (re.I if 'ilike' in operator else 0))
+
+
+def _compile_leaf(leaf, types, used):
+    try:
+        field, operator, value = leaf
+    except (TypeError, ValueError):
+        raise MirrorMiss(f'Invalid domain term {leaf!r}')
+    if not isinstance(field, str) or '.' in field or not isinstance(operator, str):
+        raise MirrorMiss(f'Unsupported domain term {leaf!r}')
+    used.add(field)
+    ftype = 'integer' if field == 'id' else types.get(field)
+    if ftype is None:
+        raise MirrorMiss(f'Field {field} is not mirrored', [field])
+    operator = operator.lower()
+    get = _getter(field, ftype)
+
+    if operator in ('=', '!='):
+        if ftype == 'boolean':
+            expected = bool(value)
+            match = lambda record: get(record) == expected
+        elif value is False or value is None:
+            if ftype in _NUMERIC_TYPES and field != 'id':
+                # Odoo membaca integer/float NULL sebagai 0; "= False" tidak bisa ditiru
+                raise MirrorMiss(f'Unsupported comparison of {field} with False')
+            match = lambda record: get(record) is None
+        else:
+            _check_value(field, ftype, value)
+            match = lambda record: get(record) == value
+        if operator == '=':
+            return match
+        # Seperti Odoo: "!=" nilai non-False juga mencocokkan NULL
+        return lambda record: not match(record)
+
+    if operator in _COMPARE_OPERATORS:
+        if ftype in _COLLATED_TYPES:
+            raise MirrorMiss(f'Unsupported {operator} on {field} (database collation)')
+        _check_value(field, ftype, value)
+        compare = _COMPARE_OPERATORS[operator]
+        return lambda record: get(record) is not None and compare(get(record), value)
+
+    if operator in ('in', 'not in'):
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        if ftype == 'boolean':
+            allowed = {bool(v) for v in values}
+            match = lambda record: get(record) in allowed
+        else:
+            with_null = any(v is False or v is None for v in values)
+            allowed = set()
+            for v in values:
+                if v is not False and v is not None:
+                    _check_value(field, ftype, v)
+                    allowed.add(v)
+            match = lambda record: (get(record) is None and with_null) or get(record) in allowed
+        return match if operator == 'in' else (lambda record: not match(record))
+
+    if operator in _LIKE_OPERATORS:
+        if ftype not in _STRING_TYPES or not isinstance(value, str):
+            raise MirrorMiss(f'Unsupported {operator} on {field}')
+        regex = _like_regex(value, operator.replace('not ', ''))
+        if operator.startswith('not '):
+            return lambda record: get(record) is None or not regex.fullmatch(get(record))
+        return lambda record: get(record) is not None and regex.fullmatch(get(record)) is not None
+
+    raise MirrorMiss(f'Unsupported operator {operator}')
+
+
+def compile_domain(domain, types):
+    """
+    Ubah domain Odoo (notasi prefix, AND implisit) menjadi predicate Python.
+
+    Returns:
+        tuple: (predicate(record) -> bool, set field yang dipakai domain)
+
+    Raises:
+        MirrorMiss: jika domain memakai field/operator yang tidak didukung
+    """
+    if not isinstance(domain, (list, tuple)):
+        raise MirrorMiss('Invalid domain')
+    used = set()
+    terms = list(domain)
+    position = 0
+
+    def parse():
+        nonlocal position
+        if position >= len(terms):
+            raise MirrorMiss('Invalid domain')
+        term = terms[position]
+        position += 1
+        if term == '!':
+            inner = parse()
+            return lambda record: not inner(record)
+        if term in ('&', '|'):
+            left, right = parse(), parse()
+            if term == '&':
+                return lambda record: left(record) and right(record)
+            return lambda record: left(record) or right(record)
+        if term in ((1, '=', 1), [1, '=', 1]):
+            return lambda record: True
+        if term in ((0, '=', 1), [0, '=', 1]):
+            return lambda record: False
+        return _compile_leaf(term, types, used)
+
+    predicates = []
+    while position < len(terms):
+        predicates.append(parse())
+    return (lambda record: all(predicate(record) for predicate in predicates)), used
+
+
+def parse_order(order, types):
+    """Parse klausa order Odoo ('a desc, id') menjadi [(field, descending)]"""
+    result = []
+    for part in order.split(','):
+        tokens = part.split()
+        if not tokens:
+            continue
+        if len(tokens) > 2 or (len(tokens) == 2 and tokens[1].lower() not in ('asc', 'desc')):
+            raise MirrorMiss(f'Unsupported order {order!r}')
+        field = tokens[0]
+        ftype = 'integer' if field == 'id' else types.get(field)
+        if ftype is None:
+            raise MirrorMiss(f'Field {field} is not mirrored', [field])
+        if ftype == 'many2one':
+            # Odoo mengurutkan many2one berdasarkan _order model relasinya
+            raise MirrorMiss(f'Unsupported order on many2one {field}')
+        if ftype in _COLLATED_TYPES:
+            # Urutan string mengikuti collation Postgres: serahkan ke Odoo supaya
+            # halaman (dan cursor keyset) sama dengan query langsung ke Odoo
+            raise MirrorMiss(f'Unsupported order on string field {field}')
+        result.append((field, len(tokens) == 2 and tokens[1].lower() == 'desc'))
+    return result
+
+
+def sort_records(records, order, types):
+    """Urutkan seperti Postgres: NULL di akhir untuk asc, di awal untuk desc"""
+    for field, descending in reversed(order):
+        ftype = 'integer' if field == 'id' else types[field]
+        get = _getter(field, ftype)
+
+        def key(record, get=get):
+            value = get(record)
+            return (value is None, value)
+        # sort() stabil (juga dengan reverse=True), jadi urutan kunci sebelumnya terjaga
+        records.sort(key=key, reverse=descending)
+    return records
+
+
+def query_fields(args, kwargs):
+    """Field yang dipakai sebuah call (fields, domain, order), best-effort"""
+    args = list(args or [])
+    kwargs = kwargs or {}
+    fields = set()
+    for value in [kwargs.get('fields')] + args[1:2]:
+        if isinstance(value, (list, tuple)):
+            fields.update(f for f in value if isinstance(f, str))
+    domain = args[0] if args else kwargs.get('domain')
+    if isinstance(domain, (list, tuple)):
+        for term in domain:
+            if isinstance(term, (list, tuple)) and len(term) == 3 and isinstance(term[0], str) and '.' not in term[0]:
+                fields.add(term[0])
+    order = kwargs.get('order')
+    if isinstance(order, str):
+        fields.update(part.split()[0] for part in order.split(',') if part.split())
+    return fields
+
+
+def _copy_value(value):
+    return list(value) if isinstance(value, list) else value
+
+
+def claim_db_path(path):
+    """
+    File SQLite milik proses ini, untuk deployment multi-worker (mis. gunicorn).
+
+    Proses pertama memakai `path`, proses berikutnya `path.1`, `path.2`, dst.
+    Slot dikunci dengan flock selama proses hidup sehingga dua proses tidak
+    pernah menulis file yang sama; worker yang di-restart memakai slot yang
+    bebas beserta isinya (sync tetap incremental).
+
+    Returns:
+        tuple: (path file, file lock yang harus tetap terbuka atau None)
+    """
+    if path == ':memory:':
+        return path, None
+    if fcntl is None:
+        return f'{path}.{os.getpid()}', None
+    slot = 0
+    while True:
+        candidate = path if slot == 0 else f'{path}.{slot}'
+        lock = open(f'{candidate}.lock', 'a')
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return candidate, lock
+        except OSError:
+            lock.close()
+            slot += 1
+
+
+class MirrorTable:
+    """State satu model di mirror (record di memori + metadata sync)"""
+
+    def __init__(self, model, types, default_order=None):
+        self.model = model
+        self.types = dict(types)
+        self.default_order = default_order
+        self.records = {}
+        self.watermark = None
+        self.synced_at = None
+        self.reconciled_at = None
+
+
+class OdooMirror:
+    """
+    Mirror lokal record Odoo per model.
+
+    Record disimpan di SQLite (bertahan saat restart, sehingga sync
+    berikutnya cukup incremental) dan dimuat ke memori untuk menjawab query.
+    `execute()` meniru `search_read`/`search_count`/`search`/`read` Odoo
+    untuk domain, field dan order yang didukung; selain itu, atau jika data
+    lebih tua dari batas staleness, raise MirrorMiss.
+
+    Hanya thread sync yang menulis; request hanya membaca. Tiap proses
+    memakai file SQLite sendiri (lihat claim_db_path), diklaim saat DB
+    pertama dipakai, yaitu setelah fork worker.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db_path = None
+        self._db_path_lock = None
+        self._conn = None
+        self._db_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._tables = {}
+
+    def _db(self):
+        if self._conn is None:
+            self.db_path, self._db_path_lock = claim_db_path(self.path)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS mirror_models ('
+                'model TEXT PRIMARY KEY, types TEXT NOT NULL, default_order TEXT, '
+                'watermark TEXT, synced_at REAL, reconciled_at REAL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS mirror_records ('
+                'model TEXT NOT NULL, id INTEGER NOT NULL, data TEXT NOT NULL, '
+                'PRIMARY KEY (model, id))'
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _save_state(self, conn, table):
+        conn.execute(
+            'INSERT OR REPLACE INTO mirror_models '
+            '(model, types, default_order, watermark, synced_at, reconciled_at) VALUES (?, ?, ?, ?, ?, ?)',
+            (table.model, json.dumps(table.types, sort_keys=True), table.default_order,
+             table.watermark, table.synced_at, table.reconciled_at)
+        )
+
+    def table(self, model):
+        return self._tables.get(model)
+
+    def configure(self, model, types, default_order=None):
+        """
+        Siapkan tabel model dengan set field `types` ({field: tipe}).
+
+        Saat pertama dipanggil, isi dari SQLite dimuat ke memori. Jika set
+        field berubah, record lama dibuang dan model di-sync ulang penuh.
+        """
+        table = self._tables.get(model)
+        if table is not None and table.types == types:
+            if table.default_order != default_order:
+                table.default_order = default_order
+            return table
+
+        with self._db_lock:
+            conn = self._db()
+            fresh = MirrorTable(model, types, default_order)
+            row = conn.execute(
+                'SELECT types, watermark, synced_at, reconciled_at FROM mirror_models WHERE model = ?', (model,)
+            ).fetchone()
+            if row is not None and json.loads(row[0]) == types:
+                fresh.watermark, fresh.synced_at, fresh.reconciled_at = row[1], row[2], row[3]
+                for record_id, data in conn.execute('SELECT id, data FROM mirror_records WHERE model = ?', (model,)):
+                    fresh.records[record_id] = json.loads(data)
+            else:
+                conn.execute('DELETE FROM mirror_records WHERE model = ?', (model,))
+            self._save_state(conn, fresh)
+            conn.commit()
+        with self._lock:
+            self._tables[model] = fresh
+        return fresh
+
+    def upsert(self, model, records, advance=True):
+        """Simpan/ganti record; `advance` menggeser watermark ke write_date terbaru"""
+        table = self._tables[model]
+        if not records:
+            return
+        rows = [(model, record['id'], json.dumps(record)) for record in records]
+        with self._db_lock:
+            conn = self._db()
+            conn.executemany('INSERT OR REPLACE INTO mirror_records (model, id, data) VALUES (?, ?, ?)', rows)
+            with self._lock:
+                for record in records:
+                    table.records[record['id']] = record
+                    write_date = record.get('write_date')
+                    if advance and write_date and (table.watermark is None or write_date > table.watermark):
+                        table.watermark = write_date
+            self._save_state(conn, table)
+            conn.commit()
+
+    def delete(self, model, ids):
+        table = self._tables[model]
+        if not ids:
+            return
+        with self._db_lock:
+            conn = self._db()
+            conn.executemany('DELETE FROM mirror_records WHERE model = ? AND id = ?', [(model, i) for i in ids])
+            conn.commit()
+            with self._lock:
+                for record_id in ids:
+                    table.records.pop(record_id, None)
+
+    def write_dates(self, model):
+        """{id: write_date} record yang ada di mirror (untuk rekonsiliasi)"""
+        with self._lock:
+            return {record_id: record.get('write_date') for record_id, record in self._tables[model].records.items()}
+
+    def mark(self, model, synced_at=None, reconciled_at=None):
+        """Catat waktu sync/rekonsiliasi terakhir yang berhasil"""
+        table = self._tables[model]
+        with self._db_lock:
+            if synced_at is not None:
+                table.synced_at = synced_at
+            if reconciled_at is not None:
+                table.reconciled_at = reconciled_at
+            conn = self._db()
+            self._save_state(conn, table)
+            conn.commit()
+
+    def reset(self, model=None):
+        """Buang isi mirror (satu model atau semua); sync berikutnya memuat ulang penuh"""
+        with self._db_lock:
+            conn = self._db()
+            if model is None:
+                conn.execute('DELETE FROM mirror_records')
+                conn.execute('DELETE FROM mirror_models')
+            else:
+                conn.execute('DELETE FROM mirror_records WHERE model = ?', (model,))
+                conn.execute('DELETE FROM mirror_models WHERE model = ?', (model,))
+            conn.commit()
+            with self._lock:
+                if model is None:
+                    self._tables.clear()
+                else:
+                    self._tables.pop(model, None)
+
+    def age(self, model):
+        """Umur data (detik sejak sync terakhir yang berhasil) atau None"""
+        table = self._tables.get(model)
+        if table is None or table.synced_at is None:
+            return None
+        return max(0.0, time.time() - table.synced_at)
+
+    def execute(self, model, method, args, kwargs, max_staleness):
+        """
+        Jawab satu call execute_kw read-only dari mirror.
+
+        Raises:
+            MirrorMiss: model belum di-mirror, data terlalu lama, atau query
+                memakai field/operator/opsi yang tidak bisa ditiru
+        """
+        if method not in MIRROR_METHODS:
+            raise MirrorMiss(f'Method {method} is not served from the mirror')
+        table = self._tables.get(model)
+        age = self.age(model)
+        if table is None or age is None:
+            raise MirrorMiss(f'{model} is not mirrored yet')
+        if age > max_staleness:
+            raise MirrorMiss(f'{model} mirror is {age:.0f}s old')
+
+        args = list(args or [])
+        kwargs = dict(kwargs or {})
+        if kwargs.pop('context', None):
+            raise MirrorMiss('Context is not supported')
+        if method == 'read':
+            return self._read(table, args, kwargs)
+
+        names = {
+            'search_read': ('domain', 'fields', 'offset', 'limit', 'order'),
+            'search': ('domain', 'offset', 'limit', 'order'),
+            'search_count': ('domain', 'limit')
+        }[method]
+        if len(args) > len(names) or set(kwargs) - set(names):
+            raise MirrorMiss('Unsupported arguments')
+        params = dict(zip(names, args))
+        for name, value in kwargs.items():
+            if name in params:
+                raise MirrorMiss('Unsupported arguments')
+            params[name] = value
+
+        fields = params.get('fields')
+        if method == 'search_read':
+            if not fields:
+                raise MirrorMiss('search_read without fields is not served from the mirror')
+            missing = [f for f in fields if f != 'id' and f not in table.types]
+            if missing:
+                raise MirrorMiss(f'Fields {missing} are not mirrored', missing)
+
+        predicate, used = compile_domain(params.get('domain') or [], table.types)
+        if 'active' in table.types and 'active' not in used:
+            # active_test Odoo: record yang diarsipkan disembunyikan kecuali domain menyebut active
+            base = predicate
+            predicate = lambda record: bool(record.get('active')) and base(record)
+
+        order = None
+        if method != 'search_count':
+            order_clause = params.get('order') or table.default_order
+            if not order_clause:
+                raise MirrorMiss(f'Default order of {model} is unknown')
+            order = parse_order(order_clause, table.types)
+
+        with self._lock:
+            snapshot = list(table.records.values())
+        try:
+            matched = [record for record in snapshot if predicate(record)]
+        except TypeError as e:
+            raise MirrorMiss(f'Unsupported comparison: {e}')
+        if method == 'search_count':
+            limit = params.get('limit')
+            return min(len(matched), limit) if limit else len(matched)
+
+        sort_records(matched, order, table.types)
+        offset = params.get('offset') or 0
+        limit = params.get('limit')
+        matched = matched[offset:offset + limit] if limit else matched[offset:]
+        if method == 'search':
+            return [record['id'] for record in matched]
+        read_fields = ['id'] + [f for f in fields if f != 'id']
+        return [{f: _copy_value(record.get(f)) for f in read_fields} for record in matched]
+
+    def _read(self, table, args, kwargs):
+        if not args or len(args) > 2 or set(kwargs) - {'fields'}:
+            raise MirrorMiss('Unsupported arguments')
+        ids = args[0]
+        ids = [ids] if isinstance(ids, int) else list(ids)
+        fields = args[1] if len(args) > 1 else kwargs.get('fields')
+        if not fields:
+            raise MirrorMiss('read without fields is not served from the mirror')
+        missing = [f for f in fields if f != 'id' and f not in table.types]
+        if missing:
+            raise MirrorMiss(f'Fields {missing} are not mirrored', missing)
+        with self._lock:
+            records = [table.records.get(record_id) for record_id in ids]
+        if any(record is None for record in records):
+            # Bisa jadi record baru yang belum ter-sync: tanyakan Odoo
+            raise MirrorMiss('Some ids are not in the mirror')
+        read_fields = ['id'] + [f for f in fields if f != 'id']
+        return [{f: _copy_value(record.get(f)) for f in read_fields} for record in records]
+
+    def stats(self):
+        with self._lock:
+            tables = list(self._tables.values())
+        return {
+            table.model: {
+                'records': len(table.records),
+                'fields': len(table.types),
+                'watermark': table.watermark,
+                'age': None if table.synced_at is None else round(max(0.0, time.time() - table.synced_at), 1),
+                'reconciled_at': table.reconciled_at
+            }
+            for table in tables
+        }
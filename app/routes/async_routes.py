@@ -0,0 +1,332 @@
+"""
+Async (ASGI) request path with non-blocking Odoo RPC
+"""
+import asyncio
+import json
+import time
+from werkzeug.datastructures import MIMEAccept, MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_accept_header, parse_etags, parse_date, quote_etag, http_date
+from werkzeug.routing import Map, Rule
+from urllib.parse import parse_qsl
+from config import Config
+from app.functions.serializers import dumps
+from app.functions.compression import compress_bytes, available_encodings
+from app.functions.rpc_flow import run_async
+from app.functions.sync_engine import read_client
+from app.functions.idempotency import (
+    idempotency_store, fingerprint, validate_key, mismatch_response, in_progress_response,
+    IDEMPOTENCY_HEADER, REPLAYED_HEADER
+)
+from app.functions.option_catalog import commodity_catalog, uom_catalog, transport_catalog
+from app.functions.pagination import parse_int_arg
+from app.routes.quote_routes import (
+    create_quote_flow, bulk_quote_flow, quote_list_flow, pickup_lookup, option_lookup
+)
+from app.routes.contact_routes import (
+    contact_list_flow, create_contact_flow, contact_detail_flow, bulk_contact_flow,
+    states_lookup, countries_lookup, country_states_lookup
+)
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # asgiref hanya dibutuhkan untuk mode async (asgi.py)
+    WsgiToAsgi = None
+
+
+def _wants_ndjson(args, headers):
+    if args.get('format') == 'ndjson':
+        return True
+    accept = parse_accept_header(headers.get('accept'), MIMEAccept)
+    return accept.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+
+
+async def _wait_flight(flight, timeout):
+    """Tunggu eksekusi idempotent lain selesai tanpa memblokir event loop"""
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+
+    def wake():
+        loop.call_soon_threadsafe(lambda: done.done() or done.set_result(True))
+    flight.add_done_callback(wake)
+    try:
+        return await asyncio.wait_for(done, max(0.0, timeout))
+    except asyncio.TimeoutError:
+        return False
+
+
+async def _idempotent(scope, headers, body, run):
+    """Versi async decorator `idempotent` (lihat app/functions/idempotency.py)"""
+    key = headers.get(IDEMPOTENCY_HEADER.lower())
+    if key is None:
+        return await run()
+    error = validate_key(key)
+    if error:
+        return {'success': False, 'error': error}, 400
+
+    store_key = (scope, key)
+    body_hash = fingerprint(body)
+    deadline = time.monotonic() + Config.IDEMPOTENCY_WAIT_TIMEOUT
+    while True:
+        state, value = idempotency_store.begin(store_key, body_hash)
+        if state == 'replay':
+            return value[0], value[1], [(REPLAYED_HEADER.lower().encode('ascii'), b'true')]
+        if state == 'mismatch':
+            return mismatch_response()
+        if state == 'run':
+            break
+        if not await _wait_flight(value, deadline - time.monotonic()):
+            return in_progress_response()
+
+    result = None
+    try:
+        result = await run()
+        return result
+    finally:
+        idempotency_store.finish(store_key, value, *(result or ()))
+
+
+def _json_body(body):
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+async def create_quote(client, args, headers, body):
+    data = _json_body(body)
+    return await _idempotent('quote_create', headers, body, lambda: run_async(create_quote_flow(data), client))
+
+
+async def create_quotes_bulk(client, args, headers, body):
+    data = _json_body(body)
+    return await _idempotent('quote_bulk', headers, body, lambda: run_async(bulk_quote_flow(data), client))
+
+
+async def get_all_quotes(client, args, headers, body):
+    if _wants_ndjson(args, headers):
+        return None
+    try:
+        client = read_client(client, args)
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}, 400
+    return await run_async(quote_list_flow(args), client)
+
+
+async def get_all_contacts(client, args, headers, body):
+    if _wants_ndjson(args, headers):
+        return None
+    try:
+        client = read_client(client, args)
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}, 400
+    return await run_async(contact_list_flow(args), client)
+
+
+async def create_contact(client, args, headers, body):
+    data = _json_body(body)
+    return await _idempotent('contact_create', headers, body, lambda: run_async(create_contact_flow(data), client))
+
+
+async def upsert_contacts_bulk(client, args, headers, body):
+    try:
+        chunk_size = parse_int_arg(args, 'chunk_size', minimum=1, maximum=Config.BULK_CONTACT_MAX_CHUNK_SIZE)
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}, 400
+    data = _json_body(body)
+    return await _idempotent('contact_bulk', headers, body, lambda: run_async(bulk_contact_flow(data, chunk_size), client))
+
+
+async def get_contact_by_id(client, args, headers, body, contact_id):
+    return await run_async(contact_detail_flow(contact_id), client)
+
+
+def _conditional(headers, result):
+    """Versi async conditional_jsonify: 304 tanpa body jika ETag/Last-Modified client masih cocok"""
+    body, status, validators = result
+    if validators is None:
+        return body, status
+    etag, last_modified = validators
+    extra_headers = [(b'etag', quote_etag(etag, weak=True).encode('latin-1')), (b'cache-control', b'no-cache')]
+    if last_modified is not None:
+        extra_headers.append((b'last-modified', http_date(last_modified).encode('latin-1')))
+
+    not_modified = False
+    if_none_match = parse_etags(headers.get('if-none-match'))
+    if if_none_match:
+        not_modified = if_none_match.contains_weak(etag)
+    elif last_modified is not None and headers.get('if-modified-since'):
+        since = parse_date(headers['if-modified-since'])
+        not_modified = since is not None and last_modified <= since
+    if not_modified:
+        return None, 304, extra_headers
+    return body, status, extra_headers
+
+
+def _lookup(build, *build_args):
+    """
+    Handler lookup dari katalog/reference data di memori. Snapshot yang perlu
+    (re)load dari Odoo memakai client sync, jadi dijalankan di thread executor.
+    """
+    async def handler(client, args, headers, body, **values):
+        result = await asyncio.to_thread(build, *build_args, *values.values())
+        return _conditional(headers, result)
+    return handler
+
+
+async def get_pickup_lookup(client, args, headers, body, pickup_type):
+    return _conditional(headers, await asyncio.to_thread(pickup_lookup, pickup_type, args))
+
+
+# Endpoint yang dilayani native async; lainnya diteruskan ke app Flask (WSGI):
+# export streaming (NDJSON, /quotes/export) yang memakai iterator sync,
+# /quotes/test-fields dan endpoint sistem (/, /health, /cache/invalidate).
+# Handler mengembalikan (body, status[, header tambahan]), atau None untuk meneruskan ke Flask.
+ASYNC_HANDLERS = {
+    'create_quote': create_quote,
+    'create_quotes_bulk': create_quotes_bulk,
+    'get_all_quotes': get_all_quotes,
+    'get_all_contacts': get_all_contacts,
+    'create_contact': create_contact,
+    'upsert_contacts_bulk': upsert_contacts_bulk,
+    'get_contact_by_id': get_contact_by_id,
+    'get_all_states': _lookup(states_lookup),
+    'get_all_countries': _lookup(countries_lookup),
+    'get_states_by_country': _lookup(country_states_lookup),
+    'get_pickup_lookup': get_pickup_lookup,
+    'get_transportation_methods': _lookup(option_lookup, transport_catalog, 'transportation methods'),
+    'get_commodities': _lookup(option_lookup, commodity_catalog, 'commodities'),
+    'get_uoms': _lookup(option_lookup, uom_catalog, 'UOMs'),
+}
+
+url_map = Map([
+    Rule('/quote/create', endpoint='create_quote', methods=['POST']),
+    Rule('/quotes/bulk', endpoint='create_quotes_bulk', methods=['POST']),
+    Rule('/quotes', endpoint='get_all_quotes', methods=['GET']),
+    Rule('/contacts', endpoint='get_all_contacts', methods=['GET']),
+    Rule('/contacts/create', endpoint='create_contact', methods=['POST']),
+    Rule('/contacts/bulk', endpoint='upsert_contacts_bulk', methods=['POST']),
+    Rule('/contacts/<int:contact_id>', endpoint='get_contact_by_id', methods=['GET']),
+    Rule('/states', endpoint='get_all_states', methods=['GET']),
+    Rule('/countries', endpoint='get_all_countries', methods=['GET']),
+    Rule('/states/country/<int:country_id>', endpoint='get_states_by_country', methods=['GET']),
+    Rule('/lookups/pickup-origins', endpoint='get_pickup_lookup', defaults={'pickup_type': 'origin'}, methods=['GET']),
+    Rule('/lookups/pickup-destinations', endpoint='get_pickup_lookup', defaults={'pickup_type': 'destination'}, methods=['GET']),
+    Rule('/lookups/transportation-methods', endpoint='get_transportation_methods', methods=['GET']),
+    Rule('/lookups/commodities', endpoint='get_commodities', methods=['GET']),
+    Rule('/lookups/uoms', endpoint='get_uoms', methods=['GET']),
+])
+
+
+class AsyncApp:
+    """
+    Aplikasi ASGI: endpoint di `url_map` dijalankan sebagai coroutine dengan
+    `AsyncOdooClient`, sisanya diteruskan ke app Flask lewat WsgiToAsgi.
+
+    Request async yang sedang menunggu Odoo tidak menahan thread, sehingga
+    jumlah request bersamaan dibatasi pool HTTP async, bukan jumlah worker.
+    """
+
+    def __init__(self, wsgi_app, client_factory):
+        if WsgiToAsgi is None:
+            raise RuntimeError('Async mode requires asgiref (pip install asgiref)')
+        self.wsgi = WsgiToAsgi(wsgi_app)
+        self.client_factory = client_factory
+        self.client = None
+
+    def _client(self):
+        if self.client is None:
+            self.client = self.client_factory()
+        return self.client
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            return await self.wsgi(scope, receive, send)
+
+        try:
+            endpoint, values = url_map.bind('', path_info=scope['path']).match(method=scope['method'])
+        except HTTPException:
+            return await self.wsgi(scope, receive, send)
+
+        args = MultiDict(parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True))
+        headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope.get('headers', [])}
+        if scope['method'] == 'POST':
+            body = await self._read_body(receive)
+        else:
+            body = b''
+
+        try:
+            result = await ASYNC_HANDLERS[endpoint](self._client(), args, headers, body, **values)
+        except Exception as e:
+            result = {
+                'success': False,
+                'error': str(e),
+                'message': 'An error occurred while processing the request'
+            }, 500
+        if result is None:
+            return await self.wsgi(scope, _replay(body, receive), send)
+        await self._respond(send, args, headers, *result)
+
+    async def _read_body(self, receive):
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    async def _respond(self, send, args, headers, body, status, extra_headers=()):
+        if status == 304:
+            # Not Modified: hanya header validator, tanpa body
+            response_headers = [(b'vary', b'Accept-Encoding')]
+            response_headers.extend(extra_headers)
+            await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        pretty = str(args.get('pretty', '')).strip().lower() in ('1', 'true', 'yes')
+        payload = dumps(body, pretty=pretty)
+        response_headers = [(b'content-type', b'application/json'), (b'vary', b'Accept-Encoding')]
+        response_headers.extend(extra_headers)
+
+        # Kompresi mengikuti aturan hook Flask (lihat app/functions/compression.py)
+        if Config.COMPRESSION_ENABLED and len(payload) >= Config.COMPRESSION_MIN_SIZE:
+            accept = parse_accept_header(headers.get('accept-encoding'))
+            encoding = accept.best_match(available_encodings())
+            if encoding is not None:
+                payload = compress_bytes(payload, encoding)
+                response_headers.append((b'content-encoding', encoding.encode('ascii')))
+
+        response_headers.append((b'content-length', str(len(payload)).encode('ascii')))
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': payload})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._client()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.client is not None:
+                    await self.client.aclose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def _replay(body, receive):
+    """Kirim ulang body yang sudah dibaca ke app WSGI"""
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        return await receive()
+    return replay
+
+
+def create_asgi_app(wsgi_app, client_factory):
+    return AsyncApp(wsgi_app, client_factory)
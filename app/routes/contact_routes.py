@@ -2,14 +2,32 @@
 Contact related routes
 """
 from flask import Blueprint, request
-from app.functions.odoo_functions import ordered_jsonify
-from app.models.odoo_connection import models, ODOO_DB, uid, ODOO_API_KEY
-from app.functions.odoo_functions import get_states, get_countries
+from app.functions.odoo_functions import (
+    ordered_jsonify, lookup_response, wants_ndjson, ndjson_response, iter_search_read,
+    chunked, partner_key, email_domain
+)
+from config import Config
+from app.models.odoo_connection import odoo
+from app.functions.reference_data import reference_data
+from app.functions.idempotency import idempotent
+from app.functions.sync_engine import read_client
+from app.functions.rpc_flow import call, run_sync
+from app.functions.record_mapper import contact_mapper
+from app.functions.pagination import parse_pagination, parse_fields_arg, parse_bool_arg, parse_int_arg
 from functools import wraps
+import json
 
 # Create blueprint
 contact_bp = Blueprint('contacts', __name__)
 
+# Field res.partner yang dibaca untuk response contact
+CONTACT_FIELDS = ['id', 'name', 'email', 'phone', 'x_studio_your_business', 'country_id', 'state_id']
+# Field turunan di response -> field Odoo sumbernya
+CONTACT_DERIVED_FIELDS = {'country_name': 'country_id', 'state_name': 'state_id'}
+CONTACT_OUTPUT_FIELDS = CONTACT_FIELDS + list(CONTACT_DERIVED_FIELDS)
+
+VALID_BUSINESS_TYPES = ["I am a business", "I am a freight forwarder"]
+
 def handle_odoo_errors(f):
     """Decorator to handle Odoo API errors"""
     @wraps(f)
@@ -24,216 +42,266 @@ def handle_odoo_errors(f):
             }), 500
     return decorated_function
 
-@contact_bp.route('/states', methods=['GET'])
-@handle_odoo_errors
-def get_all_states():
-    """Get all states for dropdown selection"""
-    states = get_states(models, ODOO_DB, uid, ODOO_API_KEY)
+def states_lookup():
+    """
+    Lookup /states dari reference data di memori.
+
+    Returns:
+        tuple: (body response, status HTTP, (etag, last_modified))
+    """
+    snapshot = reference_data.snapshot()
+    states = snapshot.public_states
     
-    return ordered_jsonify({
+    return {
         'success': True,
         'data': states,
         'count': len(states)
-    })
+    }, 200, (f'{snapshot.etag}-states', snapshot.last_modified)
 
-@contact_bp.route('/countries', methods=['GET'])
-@handle_odoo_errors
-def get_all_countries():
-    """Get all countries for dropdown selection"""
-    countries = get_countries(models, ODOO_DB, uid, ODOO_API_KEY)
+def countries_lookup():
+    """Lookup /countries dari reference data di memori (lihat states_lookup)"""
+    snapshot = reference_data.snapshot()
+    countries = snapshot.countries
     
-    return ordered_jsonify({
+    return {
         'success': True,
         'data': countries,
         'count': len(countries)
-    })
+    }, 200, (f'{snapshot.etag}-countries', snapshot.last_modified)
+
+def country_states_lookup(country_id):
+    """Lookup /states/country/<id> (lihat states_lookup; 404 tanpa validator cache)"""
+    snapshot = reference_data.snapshot()
 
-@contact_bp.route('/states/country/<int:country_id>', methods=['GET'])
-@handle_odoo_errors
-def get_states_by_country(country_id):
-    """Get all states for a specific country"""
     # Validasi country_id terlebih dahulu
-    country_exists = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY,
-        'res.country',
-        'search',
-        [[['id', '=', country_id]]]
-    )
-    
-    if not country_exists:
-        return ordered_jsonify({
+    if country_id not in snapshot.country_by_id:
+        return {
             'success': False,
             'error': 'Country not found'
-        }), 404
+        }, 404, None
     
-    # Ambil states berdasarkan country_id
-    state_ids = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY, 
-        'res.country.state', 
-        'search', 
-        [[['country_id', '=', country_id]]]
-    )
+    # Ambil states dari index yang sudah dihitung saat load
+    states = snapshot.states_by_country.get(country_id, [])
+    validators = (f'{snapshot.etag}-country-{country_id}', snapshot.last_modified)
     
-    if not state_ids:
-        return ordered_jsonify({
+    if not states:
+        return {
             'success': True,
             'data': [],
             'count': 0,
             'message': f'No states found for country ID {country_id}'
-        })
-    
-    # Ambil data states
-    states = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY,
-        'res.country.state',
-        'read',
-        [state_ids],
-        {'fields': ['id', 'name', 'country_id']}
-    )
-    
-    # Sederhanakan struktur response
-    simplified_states = []
-    for state in states:
-        simplified_state = {
-            'id': state.get('id'),
-            'name': state.get('name'),
-            'country': state.get('country_id')[1] if state.get('country_id') else None
-        }
-        simplified_states.append(simplified_state)
+        }, 200, validators
     
-    return ordered_jsonify({
+    return {
         'success': True,
-        'data': simplified_states,
-        'count': len(simplified_states)
-    })
+        'data': states,
+        'count': len(states)
+    }, 200, validators
+
+@contact_bp.route('/states', methods=['GET'])
+@handle_odoo_errors
+def get_all_states():
+    """Get all states for dropdown selection"""
+    return lookup_response(states_lookup())
+
+@contact_bp.route('/countries', methods=['GET'])
+@handle_odoo_errors
+def get_all_countries():
+    """Get all countries for dropdown selection"""
+    return lookup_response(countries_lookup())
+
+@contact_bp.route('/states/country/<int:country_id>', methods=['GET'])
+@handle_odoo_errors
+def get_states_by_country(country_id):
+    """Get all states for a specific country"""
+    return lookup_response(country_states_lookup(country_id))
+
+def _normalize_contacts(contacts, output_fields=None):
+    """Normalisasi country/state contact dan terapkan projection `fields` (list row compact)"""
+    # Projection diterapkan saat pemetaan (urutan field tetap, id selalu ada)
+    if output_fields:
+        keys = ('id',) + tuple(f for f in output_fields if f != 'id')
+    else:
+        keys = tuple(CONTACT_OUTPUT_FIELDS)
+    return contact_mapper(keys, compact=True).map_all(contacts)
 
 @contact_bp.route('/contacts', methods=['GET'])
 @handle_odoo_errors
 def get_all_contacts():
-    """Get all contacts"""
-    # Ambil semua ID contact
-    contact_ids = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY, 
-        'res.partner', 
-        'search', 
-        [[]]  # Domain kosong = semua records
-    )
-    
-    if not contact_ids:
+    """Get contacts (paginated).
+
+    Query params:
+        limit, offset: paging biasa (limit default/maks dari Config)
+        after_id: keyset cursor, ambil contact dengan id > after_id
+        fields: projection, mis. fields=name,email,country_name
+        total: 1 untuk menyertakan total record (search_count)
+        max_staleness: umur maks data mirror (detik) jika SYNC_ENABLED; 0 = langsung dari Odoo
+        format=ndjson (atau Accept: application/x-ndjson): stream semua contact
+    """
+    # Mode export: stream semua contact per batch sebagai NDJSON
+    if wants_ndjson():
+        try:
+            _, _, after_id = parse_pagination(request.args)
+            output_fields = parse_fields_arg(request.args, CONTACT_OUTPUT_FIELDS)
+        except ValueError as e:
+            return ordered_jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        read_fields = _contact_read_fields(output_fields)
+
+        def batches():
+            for batch in iter_search_read(odoo, 'res.partner', [], read_fields, Config.EXPORT_BATCH_SIZE, after_id):
+                yield _normalize_contacts(batch, output_fields)
+        return ndjson_response(batches())
+
+    try:
+        client = read_client(odoo, request.args)
+    except ValueError as e:
         return ordered_jsonify({
-            'success': True,
-            'data': [],
-            'count': 0
-        })
-    
-    # Ambil data contact dengan field yang diperlukan
-    contacts = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY,
+            'success': False,
+            'error': str(e)
+        }), 400
+    body, status = run_sync(contact_list_flow(request.args), client)
+    return ordered_jsonify(body), status
+
+def _contact_read_fields(output_fields):
+    """Terjemahkan projection ke field Odoo (id selalu dibaca untuk cursor)"""
+    if not output_fields:
+        return list(CONTACT_FIELDS)
+    read_fields = ['id']
+    for field in output_fields:
+        source = CONTACT_DERIVED_FIELDS.get(field, field)
+        if source not in read_fields:
+            read_fields.append(source)
+    return read_fields
+
+def contact_list_flow(args):
+    """
+    Flow satu halaman GET /contacts (lihat rpc_flow).
+
+    Returns:
+        tuple: (body response, status HTTP)
+    """
+    try:
+        limit, offset, after_id = parse_pagination(args)
+        output_fields = parse_fields_arg(args, CONTACT_OUTPUT_FIELDS)
+    except ValueError as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }, 400
+    read_fields = _contact_read_fields(output_fields)
+
+    domain = []
+    if after_id is not None:
+        domain.append(['id', '>', after_id])
+
+    # Satu search_read dengan limit/offset/order di sisi Odoo;
+    # total seluruh contact (tidak terpengaruh cursor/offset) dihitung paralel
+    batch = [call(
         'res.partner',
-        'read',
-        [contact_ids],
-        {'fields': ['id', 'name', 'email', 'phone', 'x_studio_your_business', 'country_id', 'state_id']}
-    )
+        'search_read',
+        [domain],
+        {'fields': read_fields, 'limit': limit, 'offset': offset, 'order': 'id asc'}
+    )]
+    if parse_bool_arg(args, 'total'):
+        batch.append(call('res.partner', 'search_count', [[]]))
+    contacts, *total = yield batch
     
-    # Tambahkan informasi country dan state yang lebih detail
-    for contact in contacts:
-        # Tambahkan country_name jika ada country_id (ambil langsung dari database)
-        if contact.get('country_id') and contact['country_id'] != False:
-            contact['country_name'] = contact['country_id'][1] if isinstance(contact['country_id'], list) else contact['country_id']
-        else:
-            contact['country_name'] = None
-            
-        # Tambahkan state_name jika ada state_id
-        if contact.get('state_id') and contact['state_id'] != False:
-            contact['state_name'] = contact['state_id'][1] if isinstance(contact['state_id'], list) else contact['state_id']
-        else:
-            contact['state_name'] = None
-            
-        # Ubah country_id menjadi integer saja (ambil ID dari array)
-        if contact.get('country_id') and contact['country_id'] != False:
-            if isinstance(contact['country_id'], list):
-                contact['country_id'] = contact['country_id'][0]  # Ambil ID saja
-            # Jika sudah integer, biarkan saja
-        else:
-            contact['country_id'] = None
-            
-        # Ubah state_id menjadi integer saja (ambil ID dari array)
-        if contact.get('state_id') and contact['state_id'] != False:
-            if isinstance(contact['state_id'], list):
-                contact['state_id'] = contact['state_id'][0]  # Ambil ID saja
-            # Jika sudah integer, biarkan saja
-        else:
-            contact['state_id'] = None
+    next_after_id = contacts[-1]['id'] if len(contacts) == limit else None
+    contacts = _normalize_contacts(contacts, output_fields)
     
-    return ordered_jsonify({
+    response = {
         'success': True,
         'data': contacts,
-        'count': len(contacts)
-    })
+        'count': len(contacts),
+        'limit': limit,
+        'offset': offset,
+        'next_after_id': next_after_id
+    }
+    if total:
+        response['total'] = total[0]
+    
+    return response, 200
 
 @contact_bp.route('/contacts/create', methods=['POST'])
 @handle_odoo_errors
+@idempotent('contact_create')
 def create_contact():
     """Create new contact with specified fields"""
     try:
         # Ambil data dari request body
         data = request.get_json()
-        
+    except Exception as e:
+        return ordered_jsonify({
+            'success': False,
+            'error': 'Failed to create contact',
+            'details': str(e)
+        }), 500
+    body, status = run_sync(create_contact_flow(data), odoo)
+    return ordered_jsonify(body), status
+
+def create_contact_flow(data):
+    """
+    Flow pembuatan contact (POST /contacts/create, lihat rpc_flow).
+
+    Returns:
+        tuple: (body response, status HTTP)
+    """
+    try:
         if not data:
-            return ordered_jsonify({
+            return {
                 'success': False,
                 'error': 'No data provided'
-            }), 400
+            }, 400
         
         # Validasi field wajib
         required_fields = ['name']
         for field in required_fields:
             if field not in data:
-                return ordered_jsonify({
+                return {
                     'success': False,
                     'error': f'Field {field} is required'
-                }), 400
+                }, 400
         
         # Validasi business type
-        valid_business_types = ["I am a business", "I am a freight forwarder"]
-        if 'x_studio_your_business' in data and data['x_studio_your_business'] not in valid_business_types:
-            return ordered_jsonify({
+        if 'x_studio_your_business' in data and data['x_studio_your_business'] not in VALID_BUSINESS_TYPES:
+            return {
                 'success': False,
-                'error': f'x_studio_your_business must be one of: {valid_business_types}'
-            }), 400
+                'error': f'x_studio_your_business must be one of: {VALID_BUSINESS_TYPES}'
+            }, 400
         
         # Validasi state_id jika ada dan ambil country_id dari state
         country_id_from_state = None
         if 'state_id' in data and data['state_id']:
             # Cek apakah state_id ada di database dan ambil country_id-nya
-            state_data = models.execute_kw(
-                ODOO_DB, uid, ODOO_API_KEY,
+            state_data = yield call(
                 'res.country.state',
                 'read',
                 [data['state_id']],
                 {'fields': ['id', 'country_id']}
             )
             if not state_data:
-                return ordered_jsonify({
+                return {
                     'success': False,
                     'error': 'Invalid state_id'
-                }), 400
+                }, 400
             country_id_from_state = state_data[0]['country_id'][0] if state_data[0]['country_id'] else None
         
         # Validasi country_id jika ada (opsional, karena bisa diisi otomatis dari state)
         if 'country_id' in data and data['country_id']:
             # Cek apakah country_id ada di database
-            country_exists = models.execute_kw(
-                ODOO_DB, uid, ODOO_API_KEY,
+            country_exists = yield call(
                 'res.country',
                 'search',
                 [[['id', '=', data['country_id']]]]
             )
             if not country_exists:
-                return ordered_jsonify({
+                return {
                     'success': False,
                     'error': 'Invalid country_id'
-                }), 400
+                }, 400
         
         # Tentukan country_id yang akan digunakan
         # Prioritas: country_id dari request > country_id dari state > False
@@ -250,121 +318,287 @@ def create_contact():
         }
         
         # Buat contact baru di Odoo
-        new_contact_id = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
+        new_contact_id = yield call(
             'res.partner',
             'create',
             [contact_data]
         )
         
         # Ambil data contact yang baru dibuat
-        new_contact = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
+        new_contact = yield call(
             'res.partner',
             'read',
             [new_contact_id],
-            {'fields': ['id', 'name', 'email', 'phone', 'x_studio_your_business', 'country_id', 'state_id']}
+            {'fields': CONTACT_FIELDS}
         )
         
         # Tambahkan informasi country dan state yang lebih detail
-        contact = new_contact[0]
-        if contact.get('country_id') and contact['country_id'] != False:
-            contact['country_name'] = contact['country_id'][1] if isinstance(contact['country_id'], list) else contact['country_id']
-        else:
-            contact['country_name'] = None
-            
-        if contact.get('state_id') and contact['state_id'] != False:
-            contact['state_name'] = contact['state_id'][1] if isinstance(contact['state_id'], list) else contact['state_id']
-        else:
-            contact['state_name'] = None
-            
-        # Ubah country_id menjadi integer saja (ambil ID dari array)
-        if contact.get('country_id') and contact['country_id'] != False:
-            if isinstance(contact['country_id'], list):
-                contact['country_id'] = contact['country_id'][0]  # Ambil ID saja
-            # Jika sudah integer, biarkan saja
-        else:
-            contact['country_id'] = None
-            
-        # Ubah state_id menjadi integer saja (ambil ID dari array)
-        if contact.get('state_id') and contact['state_id'] != False:
-            if isinstance(contact['state_id'], list):
-                contact['state_id'] = contact['state_id'][0]  # Ambil ID saja
-            # Jika sudah integer, biarkan saja
-        else:
-            contact['state_id'] = None
+        contact = contact_mapper(tuple(CONTACT_OUTPUT_FIELDS))(new_contact[0])
         
         # Siapkan response message
         message = 'Contact created successfully'
         if country_id_from_state and not data.get('country_id'):
             message += f'. Country automatically set to {contact["country_name"]} based on selected state'
         
-        return ordered_jsonify({
+        return {
             'success': True,
-            'data': new_contact[0],
+            'data': contact,
             'message': message
-        }), 201
+        }, 201
         
     except Exception as e:
-        return ordered_jsonify({
+        return {
             'success': False,
             'error': 'Failed to create contact',
             'details': str(e)
-        }), 500
+        }, 500
+
+# Field yang dibandingkan saat upsert contact (write hanya jika berbeda)
+CONTACT_UPSERT_FIELDS = ['email', 'phone', 'x_studio_your_business', 'country_id', 'state_id']
+
+def _many2one_id(value):
+    return value[0] if isinstance(value, (list, tuple)) and value else (value or False)
+
+def bulk_contact_flow(items, chunk_size=None):
+    """
+    Flow upsert banyak contact sekaligus (POST /contacts/bulk).
+
+    - state/country divalidasi dari reference data di memori; ID yang tidak
+      ada di snapshot dicek sekali untuk seluruh batch
+    - Contact yang sudah ada dicocokkan berdasarkan name + email
+      (dinormalisasi) lewat search_read per potongan email, paralel
+    - Contact baru dibuat dengan `create` multi-record per `chunk_size`;
+      contact yang cocok hanya di-write jika ada field yang berubah, dan
+      write dengan vals yang sama digabung menjadi satu call
+
+    Item tanpa email tidak bisa dicocokkan dan selalu dibuat baru. Item
+    duplikat (name + email sama) di dalam request memakai contact yang sama;
+    perubahannya digabung per contact (nilai item terakhir menang).
+    Kegagalan satu potongan create/write hanya menandai item di potongan itu.
+
+    Returns:
+        tuple: (body response, status HTTP) — 200 jika semua berhasil, 207
+            jika sebagian, 400 jika tidak ada yang valid
+    """
+    if isinstance(items, dict):
+        items = items.get('contacts')
+    if not isinstance(items, list) or not items:
+        return {
+            'success': False,
+            'error': 'Body must be a non-empty array of contacts (or {"contacts": [...]})'
+        }, 400
+    if len(items) > Config.BULK_CONTACT_MAX_ITEMS:
+        return {
+            'success': False,
+            'error': f'At most {Config.BULK_CONTACT_MAX_ITEMS} contacts per request'
+        }, 400
+    chunk_size = chunk_size or Config.BULK_CONTACT_CHUNK_SIZE
+
+    results = [None] * len(items)
+
+    def fail(index, error):
+        results[index] = {'index': index, 'success': False, 'error': error}
+
+    # Validasi lokal
+    pending = []
+    for index, data in enumerate(items):
+        if not isinstance(data, dict) or not data.get('name'):
+            fail(index, 'Field name is required')
+            continue
+        if 'x_studio_your_business' in data and data['x_studio_your_business'] not in VALID_BUSINESS_TYPES:
+            fail(index, f'x_studio_your_business must be one of: {VALID_BUSINESS_TYPES}')
+            continue
+        try:
+            state_id = int(data['state_id']) if data.get('state_id') else None
+            country_id = int(data['country_id']) if data.get('country_id') else None
+        except (TypeError, ValueError):
+            fail(index, 'Invalid state_id or country_id')
+            continue
+        pending.append({'index': index, 'data': data, 'state_id': state_id, 'country_id': country_id})
+
+    # 1. Lookup paralel: state/country di luar reference data + kandidat partner per email
+    snapshot = reference_data.snapshot()
+    states = {state_id: state.get('country_id') for state_id, state in snapshot.state_by_id.items()}
+    known_countries = set(snapshot.country_by_id)
+    missing_states = sorted({item['state_id'] for item in pending if item['state_id'] and item['state_id'] not in states})
+    missing_countries = sorted({item['country_id'] for item in pending if item['country_id'] and item['country_id'] not in known_countries})
+    emails = sorted({partner_key(None, item['data'].get('email'))[1] for item in pending if item['data'].get('email')})
+
+    lookups = []
+    if missing_states:
+        lookups.append(call('res.country.state', 'search_read', [[['id', 'in', missing_states]]], {'fields': ['id', 'country_id']}))
+    if missing_countries:
+        lookups.append(call('res.country', 'search', [[['id', 'in', missing_countries]]]))
+    partner_fields = ['id', 'name'] + CONTACT_UPSERT_FIELDS
+    for email_chunk in chunked(emails, chunk_size):
+        lookups.append(call('res.partner', 'search_read', [email_domain(email_chunk)], {'fields': partner_fields, 'order': 'id'}))
+    found = list((yield lookups)) if lookups else []
+
+    if missing_states:
+        for record in found.pop(0):
+            states[record['id']] = _many2one_id(record.get('country_id')) or None
+    if missing_countries:
+        known_countries.update(found.pop(0))
+    existing = {}
+    for partners in found:
+        for partner in partners:
+            existing.setdefault(partner_key(partner.get('name'), partner.get('email')), partner)
+
+    # 2. Tentukan create / write per contact. Item yang menunjuk partner yang sama
+    # digabung dulu per partner (nilai item terakhir menang) agar Odoo tidak
+    # menerima write paralel yang saling bertentangan ke satu record
+    to_create = []
+    create_slots = {}
+    targets = {}
+    for item in pending:
+        data = item['data']
+        if item['state_id'] and item['state_id'] not in states:
+            fail(item['index'], 'Invalid state_id')
+            continue
+        if item['country_id'] and item['country_id'] not in known_countries:
+            fail(item['index'], 'Invalid country_id')
+            continue
+        # Prioritas: country_id dari request > country_id dari state
+        country_id = item['country_id'] or (states.get(item['state_id']) if item['state_id'] else None)
+        key = partner_key(data['name'], data.get('email'))
+        partner = existing.get(key) if data.get('email') else None
+
+        if partner is None:
+            slot_key = key if data.get('email') else ('no-email', item['index'])
+            if slot_key not in create_slots:
+                create_slots[slot_key] = len(to_create)
+                to_create.append({
+                    'vals': {
+                        'name': data['name'],
+                        'email': data.get('email', False),
+                        'phone': data.get('phone', False),
+                        'x_studio_your_business': data.get('x_studio_your_business', False),
+                        'country_id': country_id or False,
+                        'state_id': item['state_id'] or False
+                    },
+                    'indexes': []
+                })
+            to_create[create_slots[slot_key]]['indexes'].append(item['index'])
+            continue
+
+        target = targets.setdefault(partner['id'], {'partner': partner, 'vals': {}, 'indexes': []})
+        for field in ('email', 'phone', 'x_studio_your_business'):
+            if field in data:
+                target['vals'][field] = data[field]
+        if item['state_id']:
+            target['vals']['state_id'] = item['state_id']
+        if country_id:
+            target['vals']['country_id'] = country_id
+        target['indexes'].append(item['index'])
+
+    # Partner dengan perubahan yang sama digabung dalam satu write (ID partner -> index item)
+    writes = {}
+    for partner_id, target in targets.items():
+        partner = target['partner']
+        # Hanya field yang dikirim dan berbeda dari nilai di Odoo
+        updates = {}
+        for field, value in target['vals'].items():
+            current = _many2one_id(partner.get(field)) if field in ('state_id', 'country_id') else partner.get(field)
+            if value != current:
+                updates[field] = value
+        if not updates:
+            for index in target['indexes']:
+                results[index] = {'index': index, 'success': True, 'id': partner_id, 'action': 'unchanged'}
+            continue
+        group = writes.setdefault(json.dumps(updates, sort_keys=True, default=str), {'vals': updates, 'ids': {}})
+        group['ids'][partner_id] = target['indexes']
+
+    if not to_create and not writes and not any(result and result['success'] for result in results):
+        return {
+            'success': False,
+            'data': _bulk_contact_summary(results),
+            'error': 'No valid contacts to upsert'
+        }, 400
+
+    # 3. create multi-record dan write per potongan (paralel, dibatasi pool Odoo)
+    batches = []
+    for create_chunk in chunked(to_create, chunk_size):
+        batches.append(('create', create_chunk, call('res.partner', 'create', [[entry['vals'] for entry in create_chunk]], default=None)))
+    for group in writes.values():
+        for id_chunk in chunked(list(group['ids']), chunk_size):
+            indexes = [(index, partner_id) for partner_id in id_chunk for index in group['ids'][partner_id]]
+            batches.append(('write', indexes, call('res.partner', 'write', [id_chunk, group['vals']], default=None)))
+
+    for batch in chunked(batches, Config.ODOO_POOL_SIZE):
+        outcomes = yield [rpc for _, _, rpc in batch]
+        for (action, entries, _), outcome in zip(batch, outcomes):
+            if action == 'create':
+                new_ids = outcome if isinstance(outcome, list) else None
+                for entry, new_id in zip(entries, new_ids or [None] * len(entries)):
+                    for index in entry['indexes']:
+                        if new_id is None:
+                            fail(index, 'Odoo create failed for this chunk')
+                        else:
+                            results[index] = {'index': index, 'success': True, 'id': new_id, 'action': 'created'}
+            else:
+                for index, partner_id in entries:
+                    if outcome is None:
+                        fail(index, 'Odoo write failed for this chunk')
+                    else:
+                        results[index] = {'index': index, 'success': True, 'id': partner_id, 'action': 'updated'}
+
+    summary = _bulk_contact_summary(results)
+    return {
+        'success': summary['failed'] == 0,
+        'data': summary,
+        'message': f"{len(results) - summary['failed']} of {len(results)} contacts upserted"
+    }, 200 if summary['failed'] == 0 else 207
+
+def _bulk_contact_summary(results):
+    counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+    for result in results:
+        counts[result['action'] if result['success'] else 'failed'] += 1
+    return dict(results=results, **counts)
+
+@contact_bp.route('/contacts/bulk', methods=['POST'])
+@handle_odoo_errors
+@idempotent('contact_bulk')
+def upsert_contacts_bulk():
+    """Create or update many contacts with chunked Odoo create/write calls"""
+    try:
+        chunk_size = parse_int_arg(request.args, 'chunk_size', minimum=1, maximum=Config.BULK_CONTACT_MAX_CHUNK_SIZE)
+    except ValueError as e:
+        return ordered_jsonify({'success': False, 'error': str(e)}), 400
+    body, status = run_sync(bulk_contact_flow(request.get_json(silent=True), chunk_size), odoo)
+    return ordered_jsonify(body), status
 
 @contact_bp.route('/contacts/<int:contact_id>', methods=['GET'])
 @handle_odoo_errors
 def get_contact_by_id(contact_id):
     """Get a specific contact by ID"""
+    body, status = run_sync(contact_detail_flow(contact_id), odoo)
+    return ordered_jsonify(body), status
+
+def contact_detail_flow(contact_id):
+    """
+    Flow GET /contacts/<id> (lihat rpc_flow).
+
+    Returns:
+        tuple: (body response, status HTTP)
+    """
     # Ambil data contact berdasarkan ID
-    contacts = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY,
+    contacts = yield call(
         'res.partner',
         'read',
         [contact_id],
-        {'fields': ['id', 'name', 'email', 'phone', 'x_studio_your_business', 'country_id', 'state_id']}
+        {'fields': CONTACT_FIELDS}
     )
     
     if not contacts:
-        return ordered_jsonify({
+        return {
             'success': False,
             'error': 'Contact not found'
-        }), 404
+        }, 404
     
     # Tambahkan informasi country dan state yang lebih detail
-    contact = contacts[0]
-    if contact.get('country_id') and contact['country_id'] != False:
-        contact['country_name'] = contact['country_id'][1] if isinstance(contact['country_id'], list) else contact['country_id']
-    else:
-        contact['country_name'] = None
-        
-    if contact.get('state_id') and contact['state_id'] != False:
-        contact['state_name'] = contact['state_id'][1] if isinstance(contact['state_id'], list) else contact['state_id']
-    else:
-        contact['state_name'] = None
-        
-    # Ubah country_id menjadi integer saja (ambil ID dari array)
-    if contact.get('country_id') and contact['country_id'] != False:
-        if isinstance(contact['country_id'], list):
-            contact['country_id'] = contact['country_id'][0]  # Ambil ID saja
-        # Jika sudah integer, biarkan saja
-    else:
-        contact['country_id'] = None
-        
-    # Ubah state_id menjadi integer saja (ambil ID dari array)
-    if contact.get('state_id') and contact['state_id'] != False:
-        if isinstance(contact['state_id'], list):
-            contact['state_id'] = contact['state_id'][0]  # Ambil ID saja
-        # Jika sudah integer, biarkan saja
-    else:
-        contact['state_id'] = None
+    contact = contact_mapper(tuple(CONTACT_OUTPUT_FIELDS))(contacts[0])
     
-    return ordered_jsonify({
+    return {
         'success': True,
         'data': contact
-    })
-
-
-
-
-
+    }, 200
@@ -2,150 +2,329 @@
 Quote and Sales Order related routes
 """
 from flask import Blueprint, request
-from app.functions.odoo_functions import ordered_jsonify
-from app.models.odoo_connection import models, ODOO_DB, uid, ODOO_API_KEY
+from app.functions.odoo_functions import (
+    ordered_jsonify, lookup_response, wants_ndjson, ndjson_response, iter_search_read, email_domain, partner_key
+)
+from app.functions.idempotency import idempotent
+from app.functions.rpc_flow import call, run_sync
+from config import Config
+from app.models.odoo_connection import odoo
+from app.functions.schema_cache import (
+    get_fields_meta, get_sale_order_fields_meta, get_sale_order_field_map, get_pickup_fields_meta, parse_domain
+)
+from app.functions.reference_data import reference_data
+from app.functions.partner_index import partner_index
+from app.functions.pickup_catalog import pickup_catalog
+from app.functions.option_catalog import commodity_catalog, uom_catalog, transport_catalog
+from app.functions.record_mapper import quote_mapper, contact_mapper
+from app.functions.columnar_export import EXPORT_FORMATS, available_formats, export_columns, export_response
+from app.functions.sync_engine import read_client
+from app.routes.contact_routes import VALID_BUSINESS_TYPES
+from app.functions.pagination import (
+    parse_pagination, parse_int_arg, parse_bool_arg, parse_date_arg,
+    parse_order_arg, order_clause, keyset_domain, encode_cursor, decode_cursor
+)
 from functools import wraps
-import ast
+import json
 
 # Create blueprint
 quote_bp = Blueprint('quotes', __name__)
 
-def _safe_lower(value):
+# Field sale.order yang boleh dipakai untuk ?order= di /quotes
+QUOTE_ORDER_FIELDS = ['id', 'name', 'create_date', 'date_order', 'state']
+
+def normalize_transportation(value):
+    """Normalisasi transportation_method: terima key atau label, kembalikan key selection"""
     try:
-        return str(value or '').strip().casefold()
+        return transport_catalog.snapshot().normalize(value)
     except Exception:
-        return ''
+        return value
 
-def _parse_domain(val):
+def _lookup_state(state_id):
     """
-    Parse domain value from fields_get (could be list/tuple/string).
-    Returns list.
+    Flow: cari state (dict reference data) berdasarkan ID; None jika tidak valid.
+
+    Cek pertama ke reference data di memori; jika tidak ada (mis. state baru
+    dibuat setelah refresh terakhir) baru fallback ke satu read Odoo.
     """
-    if isinstance(val, (list, tuple)):
-        return list(val)
-    if isinstance(val, str):
-        try:
-            parsed = ast.literal_eval(val)
-            if isinstance(parsed, (list, tuple)):
-                return list(parsed)
-        except Exception:
-            pass
-    return []
+    try:
+        state_id = int(state_id)
+    except (TypeError, ValueError):
+        return None
+    state = reference_data.snapshot().state_by_id.get(state_id)
+    if state is not None:
+        return state
+    state_data = yield call(
+        'res.country.state', 'read',
+        [[state_id]], {'fields': ['id', 'country_id']}
+    )
+    if not state_data:
+        return None
+    country = state_data[0].get('country_id')
+    return {'id': state_id, 'country_id': country[0] if country else None}
+
+def _country_exists(country_id):
+    """Flow: cek country ID di reference data, fallback ke search Odoo"""
+    try:
+        country_id = int(country_id)
+    except (TypeError, ValueError):
+        return False
+    if country_id in reference_data.snapshot().country_by_id:
+        return True
+    found = yield call(
+        'res.country', 'search',
+        [[['id', '=', country_id]]]
+    )
+    return bool(found)
+
+def _partner_search_call(name, email):
+    """Call search_read contact dengan name + email sama (=ilike) untuk _match_partner"""
+    return call(
+        'res.partner', 'search_read',
+        [[['name', '=ilike', str(name).strip()], ['email', '=ilike', str(email).strip()]]],
+        {'fields': ['id', 'name', 'email'], 'order': 'id'}
+    )
 
-def get_sale_order_field_map():
+def _match_partner(found, name, email):
     """
-    Deteksi nama teknis field di sale.order berdasarkan label (string).
-    Mengembalikan dict:
-      {
-        'commodity': <field_name>,
-        'uom': <field_name>,
-        'qty': <field_name>,
-        'kgs_chg': <field_name>,
-        'kgs_wt': <field_name>,
-        'ratio': <field_name>,
-      }
-    Dengan fallback ke nama yang selama ini digunakan jika tidak ditemukan.
+    Pilih contact yang sudah ada untuk dedupe; kembalikan ID atau None.
+
+    Logika dedupe:
+    - Cek name dulu (case-insensitive, trim whitespace)
+    - Jika name sama, lanjut cek email
+    - Jika name DAN email sama → reuse contact yang ada
+    - Jika name sama tapi email beda → create baru (orang berbeda)
+    - Jika name tidak ketemu → create baru
     """
-    # Default fallback (nama teknis historis)
-    field_map = {
-        'commodity': 'x_studio_commodity',
-        'uom': 'x_studio_many2one_field_1ef_1j58pa43n',
-        'qty': 'x_studio_qty',
-        'kgs_chg': 'x_studio_kgs_chg_1',
-        'kgs_wt': 'x_studio_kgs_wt',
-        'ratio': 'x_studio_ratio',
-    }
+    search_name = str(name).strip()
+    search_email = str(email).strip().lower()
+    for partner in found or []:
+        partner_name = str(partner.get('name', '')).strip()
+        partner_email = str(partner.get('email', '')).strip().lower() if partner.get('email') else ''
+        
+        # Exact match name (case-insensitive) dan email
+        if partner_name.lower() == search_name.lower() and partner_email == search_email:
+            return partner['id']
+    return None
+
+def _normalize_domain(domain):
+    """
+    Ubah domain Odoo ke bentuk prefix eksplisit ('&' implisit ditulis),
+    supaya bisa digabung dengan domain lain memakai '|'.
+    """
+    arity = {'!': 1, '&': 2, '|': 2}
+    result = []
+    expected = 1
+    for token in domain:
+        if expected == 0:
+            result.insert(0, '&')
+            expected = 1
+        if isinstance(token, (list, tuple)):
+            expected -= 1
+        else:
+            expected += arity.get(token, 0) - 1
+        result.append(token)
+    return result
+
+def _plan_pickup_reads(lookups):
+    """
+    Rencanakan validasi pickup origin/destination: satu search_read per model.
+
+    Args:
+        lookups: list (key, model, domain, record_id); domain adalah domain
+            field many2one di sale.order yang harus dipenuhi record tersebut
+
+    Returns:
+        list: (Call, items) per model; hasil Call dipetakan lewat _pickup_results.
+            Record berisi id dan x_studio_transportation_method (jika field
+            ada di model).
+    """
+    groups = []
+    for key, model, domain, record_id in lookups:
+        domain = list(domain or [])
+        for group in groups:
+            # ID sama dengan domain berbeda tidak bisa dibedakan dalam satu OR
+            if group['model'] == model and all(rid != record_id or dom == domain for _, dom, rid in group['items']):
+                group['items'].append((key, domain, record_id))
+                break
+        else:
+            groups.append({'model': model, 'items': [(key, domain, record_id)]})
+
+    plan = []
+    for group in groups:
+        model, items = group['model'], group['items']
+        branches = [_normalize_domain(domain + [['id', '=', record_id]]) for _, domain, record_id in items]
+        combined = ['|'] * (len(branches) - 1) + [token for branch in branches for token in branch]
+        plan.append((call(model, 'search_read', [combined], {'fields': _pickup_read_fields(model)}), items))
+    return plan
+
+def _pickup_read_fields(model):
+    """Field yang dibaca saat validasi pickup (transportation method jika ada di model)"""
+    fields = ['id']
     try:
-        fields_meta = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
-            'sale.order', 'fields_get',
-            [], {'attributes': ['string', 'type', 'relation']}
-        )
-        # Kandidat label (lowercase) untuk tiap field
-        label_candidates = {
-            'commodity': ['commodity', 'description of goods', 'commodity code'],
-            'uom': ['unit of measure', 'uom', 'uom type'],
-            'qty': ['qty', 'quantity', 'pcs'],
-            'kgs_chg': ['kgs chg', 'chargeable weight', 'chg wt', 'chg'],
-            'kgs_wt': ['kgs wt', 'actual weight', 'weight'],
-            'ratio': ['ratio', 'dim factor', 'volumetric ratio'],
-        }
-        # Pemetaan berdasarkan label string
-        for fname, meta in (fields_meta or {}).items():
-            label = _safe_lower(meta.get('string'))
-            if not label:
-                continue
-            # Coba cocokkan
-            for key, candidates in label_candidates.items():
-                if any(lbl in label for lbl in candidates):
-                    # Validasi tipe dasar wajar (tidak ketat agar fleksibel)
-                    field_map[key] = fname
-        return field_map
+        if 'x_studio_transportation_method' in get_fields_meta(model, ['type', 'string']):
+            fields.append('x_studio_transportation_method')
+    except Exception:
+        pass
+    return fields
+
+def _pickup_catalog():
+    """Snapshot katalog pickup, atau None jika gagal dimuat (semua pickup dicek ke Odoo)"""
+    try:
+        return pickup_catalog.snapshot()
     except Exception:
-        # Jika gagal, pakai fallback
-        return field_map
+        return None
+
+def _uom_catalog():
+    """Snapshot katalog UoM, atau None jika gagal dimuat (factor dibaca ke Odoo)"""
+    try:
+        return uom_catalog.snapshot()
+    except Exception:
+        return None
 
-def get_pickup_fields_meta():
+def _catalog_pickups(catalog, lookups):
     """
-    Dapatkan metadata field pickup origin/destination (field name, relation model, domain).
-    Note: Origin dan destination sekarang many2one ke model yang sama (x_pickup),
-    tapi mungkin punya domain berbeda untuk membedakan origin vs destination.
-    Menggunakan label untuk deteksi dinamis; fallback ke nama historis.
+    Validasi pickup dari katalog di memori.
+
+    Args:
+        catalog: PickupSnapshot atau None
+        lookups: list (key, model, domain, record_id) seperti _plan_pickup_reads
+
+    Returns:
+        dict: {key: record validasi} untuk ID yang ada di katalog
     """
-    defaults = {
-        'origin': {
-            'field': 'x_studio_pickup_origin',
-            'relation': None,
-            'domain': []
-        },
-        'destination': {
-            'field': 'x_studio_pickup_destination',
-            'relation': None,
-            'domain': []
-        }
+    pickups = {}
+    if catalog is None:
+        return pickups
+    for key, model, _, record_id in lookups:
+        if catalog.model(key) == model:
+            record = catalog.pickup(key, record_id)
+            if record is not None:
+                pickups[key] = record
+    return pickups
+
+def _pickup_results(plan, results):
+    """Petakan hasil search_read dari _plan_pickup_reads ke {key: record atau None}"""
+    pickups = {}
+    for (_, items), records in zip(plan, results):
+        by_id = {record['id']: record for record in records}
+        for key, _, record_id in items:
+            pickups[key] = by_id.get(record_id)
+    return pickups
+
+# Field res.partner yang dibaca untuk bagian contact di response quote
+QUOTE_CONTACT_FIELDS = ['id', 'name', 'email', 'phone', 'x_studio_your_business', 'country_id', 'state_id']
+
+def _validate_quote_input(data):
+    """Validasi field wajib dan business type; kembalikan pesan error atau None"""
+    # Validasi field wajib untuk contact
+    for field in ['name', 'email']:
+        if field not in data or not data.get(field):
+            return f'Field {field} is required'
+
+    # Validasi field wajib untuk sales order
+    # Sekarang origin/destination berupa dropdown (many2one) → kirim ID
+    for field in ['pickup_origin_id', 'pickup_destination_id', 'terms_condition', 'transportation_method']:
+        if field not in data:
+            return f'Field {field} is required'
+
+    # Validasi business type
+    if 'x_studio_your_business' in data and data['x_studio_your_business'] not in VALID_BUSINESS_TYPES:
+        return f'x_studio_your_business must be one of: {VALID_BUSINESS_TYPES}'
+    return None
+
+def _partner_create_vals(data, country_id):
+    """Vals res.partner untuk contact baru (hanya field yang ada nilainya)"""
+    contact_data = {
+        'name': data['name'],
+        'company_type': 'person',
+        'active': True
     }
-    try:
-        fields_meta = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
-            'sale.order', 'fields_get',
-            [], {'attributes': ['string', 'relation', 'domain']}
-        )
+    # Tambahkan field optional hanya jika ada nilainya
+    if data.get('email'):
+        contact_data['email'] = data['email']
+    if data.get('phone'):
+        contact_data['phone'] = data['phone']
+    if data.get('x_studio_your_business'):
+        contact_data['x_studio_your_business'] = data['x_studio_your_business']
+    if country_id:
+        contact_data['country_id'] = country_id
+    if data.get('state_id'):
+        contact_data['state_id'] = data['state_id']
+    return contact_data
 
-        def match_field(candidates, default_key):
-            for fname, meta in (fields_meta or {}).items():
-                label = _safe_lower(meta.get('string'))
-                if not label:
-                    continue
-                for cand in candidates:
-                    if cand in label:
-                        relation = meta.get('relation')
-                        domain = _parse_domain(meta.get('domain', []))
-                        return {
-                            'field': fname,
-                            'relation': relation,
-                            'domain': domain
-                        }
-            return defaults[default_key]
-
-        origin_meta = match_field(['pickup origin', 'origin'], 'origin')
-        dest_meta = match_field(['pickup destination', 'destination'], 'destination')
-
-        # Pastikan domain berbentuk list
-        origin_meta['domain'] = _parse_domain(origin_meta.get('domain', []))
-        dest_meta['domain'] = _parse_domain(dest_meta.get('domain', []))
-
-        # Jika relation tidak ditemukan, fallback ke defaults
-        if not origin_meta.get('relation'):
-            origin_meta['relation'] = defaults['origin']['relation']
-        if not dest_meta.get('relation'):
-            dest_meta['relation'] = defaults['destination']['relation']
+def _partner_update_vals(data, country_id):
+    """Vals write untuk contact yang direuse (tanpa overwrite agresif)"""
+    updates = {}
+    if data.get('name'):
+        updates['name'] = data['name']
+    if data.get('email'):
+        updates['email'] = data['email']
+    if data.get('phone'):
+        updates['phone'] = data['phone']
+    if data.get('x_studio_your_business'):
+        updates['x_studio_your_business'] = data['x_studio_your_business']
+    if data.get('state_id'):
+        updates['state_id'] = data['state_id']
+    if country_id:
+        updates['country_id'] = country_id
+    updates['active'] = True
+    return updates
 
-        return {
-            'origin': origin_meta,
-            'destination': dest_meta
-        }
+def _sale_order_vals(data, partner_id, so_field_map, origin_field_name, dest_field_name):
+    """Vals sale.order (quotation draft) dari data form"""
+    # Tanpa fallback ke note: wajib gunakan field custom yang telah disediakan
+    sales_order_data = {
+        'partner_id': partner_id,  # Link ke contact yang ditemukan/dibuat
+        'state': 'draft',  # Status draft untuk quotation
+        'x_studio_transportation_method': data['transportation_method'],
+        origin_field_name: data['pickup_origin_id'],
+        dest_field_name: data['pickup_destination_id'],
+        'x_studio_terms_condition': data['terms_condition']
+    }
+    
+    # Optional: tambahkan field-field baru (commodity, uom, qty, kgs_chg, kgs_wt, ratio)
+    # Hanya kirim field yang benar-benar ada nilainya (bukan None, bukan False untuk many2one)
+    # Dan pastikan field tersebut ada di Odoo sebelum dikirim
+    try:
+        available_fields = get_sale_order_fields_meta()
     except Exception:
-        return defaults
+        available_fields = {}
+    
+    optional_fields = [
+        ('commodity_id', 'commodity', False), ('uom_id', 'uom', False),
+        ('qty', 'qty', True), ('kgs_chg', 'kgs_chg', True),
+        ('kgs_wt', 'kgs_wt', True), ('ratio', 'ratio', True)
+    ]
+    for input_key, map_key, numeric in optional_fields:
+        value = data.get(input_key)
+        if value is None or (not numeric and value in (False, '')):
+            continue
+        field_name = so_field_map.get(map_key)
+        if field_name and field_name in available_fields:
+            sales_order_data[field_name] = value
+    return sales_order_data
+
+def _created_quote_fields(so_field_map, origin_field_name, dest_field_name):
+    """Field sale.order yang dibaca ulang setelah quote dibuat"""
+    return [
+        'id', 'name', 'partner_id', 'state', 'create_date', 'x_studio_transportation_method',
+        origin_field_name, dest_field_name, 'x_studio_terms_condition',
+        so_field_map['commodity'], so_field_map['uom'], so_field_map['qty'],
+        so_field_map['kgs_chg'], so_field_map['kgs_wt'], so_field_map['ratio']
+    ]
+
+# Key contact di response quote (urutan output)
+QUOTE_CONTACT_OUTPUT = ('id', 'name', 'email', 'phone', 'country_id', 'state_id', 'business_type', 'country_name', 'state_name')
+
+def _contact_response(contact_data):
+    """Bentuk contact di response quote (business_type, country/state id + nama)"""
+    return contact_mapper(QUOTE_CONTACT_OUTPUT)(contact_data)
+
+def _quote_response(quote_data, so_field_map, origin_field_name, dest_field_name):
+    """Ubah nama field sale.order hasil read ke nama field API"""
+    read_fields = _created_quote_fields(so_field_map, origin_field_name, dest_field_name)
+    return quote_mapper(read_fields, so_field_map, origin_field_name, dest_field_name)(quote_data)
 
 def handle_odoo_errors(f):
     """Decorator to handle Odoo API errors"""
@@ -161,454 +340,224 @@ def handle_odoo_errors(f):
             }), 500
     return decorated_function
 
-@quote_bp.route('/quote/create', methods=['POST'])
-@handle_odoo_errors
-def create_quote():
-    """Create contact and sales order from complete form data"""
+def create_quote_flow(data):
+    """
+    Flow pembuatan contact + sales order dari data form (lihat rpc_flow).
+
+    Dipakai oleh route sync (/quote/create) dan handler async (asgi.py).
+
+    Returns:
+        tuple: (body response, status HTTP)
+    """
     try:
-        # Ambil data dari request body
-        data = request.get_json()
-        
         if not data:
-            return ordered_jsonify({
+            return {
                 'success': False,
                 'error': 'No data provided'
-            }), 400
-        
-        # Validasi field wajib untuk contact
-        required_contact_fields = ['name', 'email']
-        for field in required_contact_fields:
-            if field not in data or not data.get(field):
-                return ordered_jsonify({
-                    'success': False,
-                    'error': f'Field {field} is required'
-                }), 400
-        
-        # Validasi field wajib untuk sales order
-        # Sekarang origin/destination berupa dropdown (many2one) → kirim ID
-        required_quote_fields = ['pickup_origin_id', 'pickup_destination_id', 'terms_condition', 'transportation_method']
-        for field in required_quote_fields:
-            if field not in data:
-                return ordered_jsonify({
-                    'success': False,
-                    'error': f'Field {field} is required'
-                }), 400
+            }, 400
         
-        # Validasi business type
-        valid_business_types = ["I am a business", "I am a freight forwarder"]
-        if 'x_studio_your_business' in data and data['x_studio_your_business'] not in valid_business_types:
-            return ordered_jsonify({
+        # Validasi field wajib dan business type
+        error = _validate_quote_input(data)
+        if error:
+            return {
                 'success': False,
-                'error': f'x_studio_your_business must be one of: {valid_business_types}'
-            }), 400
-        
-        # Validasi state_id jika ada dan ambil country_id dari state
-        country_id_from_state = None
-        if 'state_id' in data and data['state_id']:
-            # Cek apakah state_id ada di database dan ambil country_id-nya
-            state_data = models.execute_kw(
-                ODOO_DB, uid, ODOO_API_KEY,
-                'res.country.state',
-                'read',
-                [data['state_id']],
-                {'fields': ['id', 'country_id']}
-            )
-            if not state_data:
-                return ordered_jsonify({
-                    'success': False,
-                    'error': 'Invalid state_id'
-                }), 400
-            country_id_from_state = state_data[0]['country_id'][0] if state_data[0]['country_id'] else None
-        
-        # Validasi country_id jika ada (opsional, karena bisa diisi otomatis dari state)
-        if 'country_id' in data and data['country_id']:
-            # Cek apakah country_id ada di database
-            country_exists = models.execute_kw(
-                ODOO_DB, uid, ODOO_API_KEY,
-                'res.country',
-                'search',
-                [[['id', '=', data['country_id']]]]
-            )
-            if not country_exists:
-                return ordered_jsonify({
-                    'success': False,
-                    'error': 'Invalid country_id'
-                }), 400
-        
-        # 1. Validasi/temukan Contact terlebih dahulu untuk menghindari duplikasi
-        # Logika dedupe:
-        # - Jika ada force_create = true → selalu buat baru
-        # - Cek name dulu (case-insensitive, trim whitespace)
-        # - Jika name sama, lanjut cek email
-        # - Jika name DAN email sama → reuse contact yang ada
-        # - Jika name sama tapi email beda → create baru (orang berbeda)
-        # - Jika name tidak ketemu → create baru
-        partner_id = None
-        force_create = bool(data.get('force_create', False))
-        if not force_create and data.get('name') and data.get('email'):
-            # Normalisasi name untuk matching (case-insensitive, trim)
-            search_name = str(data['name']).strip()
-            search_email = str(data['email']).strip().lower()
-            
-            # Cari berdasarkan name (case-insensitive)
-            found = models.execute_kw(
-                ODOO_DB, uid, ODOO_API_KEY,
-                'res.partner', 'search_read',
-                [[['name', 'ilike', search_name]]],
-                {'fields': ['id', 'name', 'email'], 'limit': 10}  # Ambil beberapa untuk cek exact match
-            )
-            
-            if found:
-                # Cek exact match name (case-insensitive) dan email
-                for partner in found:
-                    partner_name = str(partner.get('name', '')).strip()
-                    partner_email = str(partner.get('email', '')).strip().lower() if partner.get('email') else ''
-                    
-                    # Exact match name (case-insensitive) dan email
-                    if partner_name.lower() == search_name.lower() and partner_email == search_email:
-                        partner_id = partner['id']
-                        break
-
-        # Tentukan country_id yang akan digunakan
-        # Prioritas: country_id dari request > country_id dari state > False
-        final_country_id = data.get('country_id', country_id_from_state) if data.get('country_id') else country_id_from_state
-        
-        contact_action = 'reused'
-        if not partner_id:
-            # Jika contact tidak ditemukan, otomatis buat baru
-            # Hanya kirim field yang tidak None
-            contact_data = {
-                'name': data['name'],
-                'company_type': 'person',
-                'active': True
-            }
-            # Tambahkan field optional hanya jika ada nilainya
-            if data.get('email'):
-                contact_data['email'] = data['email']
-            if data.get('phone'):
-                contact_data['phone'] = data['phone']
-            if data.get('x_studio_your_business'):
-                contact_data['x_studio_your_business'] = data['x_studio_your_business']
-            if final_country_id:
-                contact_data['country_id'] = final_country_id
-            if data.get('state_id'):
-                contact_data['state_id'] = data['state_id']
-            partner_id = models.execute_kw(
-                ODOO_DB, uid, ODOO_API_KEY,
-                'res.partner',
-                'create',
-                [contact_data]
-            )
-            contact_action = 'created'
-        else:
-            # Optional: sinkronkan field baru ke contact yang direuse (tanpa overwrite agresif)
-            updates = {}
-            if data.get('name'):
-                updates['name'] = data['name']
-            if data.get('email'):
-                updates['email'] = data['email']
-            if data.get('phone'):
-                updates['phone'] = data['phone']
-            if 'x_studio_your_business' in data and data.get('x_studio_your_business'):
-                updates['x_studio_your_business'] = data['x_studio_your_business']
-            if 'state_id' in data and data.get('state_id'):
-                updates['state_id'] = data['state_id']
-            if final_country_id:
-                updates['country_id'] = final_country_id
-            updates['active'] = True
-            if updates:
-                try:
-                    models.execute_kw(
-                        ODOO_DB, uid, ODOO_API_KEY,
-                        'res.partner', 'write',
-                        [partner_id, updates]
-                    )
-                except Exception:
-                    pass
+                'error': error
+            }, 400
         
         # Normalisasi transportation_method: terima key atau label
-        def normalize_transportation(value, model_name='sale.order'):
-            try:
-                fields_meta = models.execute_kw(
-                    ODOO_DB, uid, ODOO_API_KEY,
-                    model_name, 'fields_get',
-                    [], {'attributes': ['selection']}
-                )
-                sel = fields_meta.get('x_studio_transportation_method', {}).get('selection', [])
-                # sel: list of [key, label]
-                for key, label in sel:
-                    if str(value).lower() == str(key).lower() or str(value).lower() == str(label).lower():
-                        return key
-            except Exception:
-                pass
-            return value
-
         data['transportation_method'] = normalize_transportation(data['transportation_method'])
 
-        # Ambil metadata pickup origin/destination (field name, relation, domain)
+        # Metadata (fields_get) diambil dari cache, bukan round trip per request
         pickup_meta = get_pickup_fields_meta()
         origin_field_meta = pickup_meta.get('origin', {})
         dest_field_meta = pickup_meta.get('destination', {})
+        so_field_map = get_sale_order_field_map()
 
         origin_model_name = origin_field_meta.get('relation')
         dest_model_name = dest_field_meta.get('relation')
 
-        # Validasi keberadaan record origin/destination dan kesesuaian transportation method
         # Note: origin dan destination sekarang many2one ke model yang sama (x_pickup)
         # tapi punya domain berbeda untuk membedakan origin vs destination
         if not origin_model_name or not dest_model_name:
-            return ordered_jsonify({
+            return {
                 'success': False,
                 'error': 'Pickup field relation not found in Odoo'
-            }), 500
+            }, 500
 
-        def build_domain(base_domain, extra_condition):
-            domain = []
-            if base_domain:
-                domain.extend(list(base_domain))
-            domain.append(extra_condition)
-            return domain
-
-        # Pastikan ID valid sesuai domain field
-        origin_domain = build_domain(
-            origin_field_meta.get('domain', []),
-            ['id', '=', int(data['pickup_origin_id'])]
-        )
-        dest_domain = build_domain(
-            dest_field_meta.get('domain', []),
-            ['id', '=', int(data['pickup_destination_id'])]
-        )
+        # Validasi state_id/country_id dari reference data di memori
+        country_id_from_state = None
+        if 'state_id' in data and data['state_id']:
+            state = yield from _lookup_state(data['state_id'])
+            if state is None:
+                return {
+                    'success': False,
+                    'error': 'Invalid state_id'
+                }, 400
+            country_id_from_state = state.get('country_id')
 
-        origin_ok = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
-            origin_model_name, 'search_count',
-            [origin_domain]
-        )
-        dest_ok = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
-            dest_model_name, 'search_count',
-            [dest_domain]
-        )
-        if not origin_ok or not dest_ok:
-            return ordered_jsonify({
+        # Validasi country_id jika ada (opsional, karena bisa diisi otomatis dari state)
+        if 'country_id' in data and data['country_id']:
+            country_ok = yield from _country_exists(data['country_id'])
+            if not country_ok:
+                return {
+                    'success': False,
+                    'error': 'Invalid country_id'
+                }, 400
+
+        try:
+            pickup_lookups = [
+                ('origin', origin_model_name, origin_field_meta.get('domain', []), int(data['pickup_origin_id'])),
+                ('destination', dest_model_name, dest_field_meta.get('domain', []), int(data['pickup_destination_id']))
+            ]
+        except (TypeError, ValueError):
+            return {
                 'success': False,
                 'error': 'Invalid pickup_origin_id or pickup_destination_id'
-            }), 400
+            }, 400
 
-        def read_transport_method(model_name, record_id):
-            try:
-                rec = models.execute_kw(
-                    ODOO_DB, uid, ODOO_API_KEY,
-                    model_name, 'read',
-                    [int(record_id)],
-                    {'fields': ['x_studio_transportation_method']}
-                )
-                return rec[0] if rec else {}
-            except Exception:
-                return {}
+        # Origin/destination divalidasi dari katalog pickup di memori; ID yang
+        # belum ada di katalog (mis. pickup baru sebelum refresh) dicek ke Odoo
+        pickups = _catalog_pickups(_pickup_catalog(), pickup_lookups)
 
-        origin_rec = read_transport_method(origin_model_name, data['pickup_origin_id'])
-        dest_rec = read_transport_method(dest_model_name, data['pickup_destination_id'])
+        # 1. Lookup yang saling independen dijalankan paralel (satu batch):
+        # - Validasi origin/destination yang tidak ada di katalog: satu search_read per model pickup
+        # - Dedupe contact (lihat _match_partner), kecuali force_create = true
+        # - Factor UoM untuk mengisi ratio otomatis
+        pickup_plan = _plan_pickup_reads([lookup for lookup in pickup_lookups if pickups.get(lookup[0]) is None])
+        batch = [pickup_call for pickup_call, _ in pickup_plan]
 
-        if (origin_rec and origin_rec.get('x_studio_transportation_method') not in (False, data['transportation_method'])) or \
-           (dest_rec and dest_rec.get('x_studio_transportation_method') not in (False, data['transportation_method'])):
-            return ordered_jsonify({
-                'success': False,
-                'error': 'Origin/Destination not allowed for selected transportation_method'
-            }), 400
-
-        # 2. Buat Sales Order dengan referensi ke contact
-        # Tanpa fallback ke note: wajib gunakan field custom yang telah disediakan
-        origin_field_name = origin_field_meta.get('field', 'x_studio_pickup_origin')
-        dest_field_name = dest_field_meta.get('field', 'x_studio_pickup_destination')
-        sales_order_data = {
-            'partner_id': partner_id,  # Link ke contact yang ditemukan/dibuat
-            'state': 'draft',  # Status draft untuk quotation
-            'x_studio_transportation_method': data['transportation_method'],
-            origin_field_name: data['pickup_origin_id'],
-            dest_field_name: data['pickup_destination_id'],
-            'x_studio_terms_condition': data['terms_condition']
-        }
-        
-        # Optional: tambahkan field-field baru (commodity, uom, qty, kgs_chg, kgs_wt, ratio)
-        # Hanya kirim field yang benar-benar ada nilainya (bukan None, bukan False untuk many2one)
-        # Dan pastikan field tersebut ada di Odoo sebelum dikirim
-        so_field_map = get_sale_order_field_map()
+        force_create = bool(data.get('force_create', False))
+        partner_id = None
+        find_partner = False
+        if not force_create and data.get('name') and data.get('email'):
+            # Index partner di memori dulu; miss → query exact (=ilike) name + email
+            partner_id = partner_index.lookup(data['name'], data['email'])
+            find_partner = partner_id is None
+        indexed_partner = partner_id is not None
+        if find_partner:
+            batch.append(_partner_search_call(data['name'], data['email']))
 
-        # Jika ada uom_id, isi ratio otomatis dari factor di model UOM
+        # Factor UoM dari katalog di memori; ID yang tidak ada di katalog
+        # (mis. UoM yang diarsipkan) dibaca ke Odoo
         uom_id_value = data.get('uom_id')
-        if uom_id_value not in (None, False, ''):
+        read_uom = uom_id_value not in (None, False, '')
+        uom_factor = None
+        if read_uom:
+            uom_snapshot = _uom_catalog()
+            try:
+                found_uom, uom_factor = uom_snapshot.factor(int(uom_id_value)) if uom_snapshot else (False, None)
+            except (TypeError, ValueError):
+                found_uom = False
+            read_uom = not found_uom
+        if read_uom:
             uom_model_name = 'uom.uom'
             uom_field_name = so_field_map.get('uom')
             if uom_field_name:
                 try:
-                    uom_field_meta = models.execute_kw(
-                        ODOO_DB, uid, ODOO_API_KEY,
-                        'sale.order', 'fields_get',
-                        [uom_field_name], {'attributes': ['relation']}
-                    )
-                    uom_model_name = uom_field_meta.get(uom_field_name, {}).get('relation') or uom_model_name
+                    uom_model_name = get_sale_order_fields_meta().get(uom_field_name, {}).get('relation') or uom_model_name
                 except Exception:
                     pass
             try:
-                uom_rec = models.execute_kw(
-                    ODOO_DB, uid, ODOO_API_KEY,
-                    uom_model_name, 'read',
-                    [int(uom_id_value)],
-                    {'fields': ['factor']}
-                )
-            except Exception:
-                uom_rec = []
-            if uom_rec:
-                uom_factor = uom_rec[0].get('factor')
-                if uom_factor is not None:
-                    data['ratio'] = uom_factor
+                # Gagal baca factor tidak menggagalkan quote (ratio tidak diisi)
+                batch.append(call(uom_model_name, 'read', [int(uom_id_value)], {'fields': ['factor']}, default=[]))
+            except (TypeError, ValueError):
+                read_uom = False
 
-        try:
-            # Validasi field yang ada di Odoo
-            available_fields = models.execute_kw(
-                ODOO_DB, uid, ODOO_API_KEY,
-                'sale.order', 'fields_get',
-                [], {}
-            )
-        except Exception:
-            available_fields = {}
+        results = (yield batch) if batch else []
+        pickups.update(_pickup_results(pickup_plan, results[:len(pickup_plan)]))
+        extra = results[len(pickup_plan):]
+        if find_partner:
+            partner_id = _match_partner(extra.pop(0), data['name'], data['email'])
+            partner_index.remember(partner_id, data['name'], data['email'])
+        uom_rec = extra.pop(0) if read_uom else []
+
+        origin_rec = pickups.get('origin')
+        dest_rec = pickups.get('destination')
+        if origin_rec is None or dest_rec is None:
+            return {
+                'success': False,
+                'error': 'Invalid pickup_origin_id or pickup_destination_id'
+            }, 400
+
+        if origin_rec.get('x_studio_transportation_method', False) not in (False, data['transportation_method']) or \
+           dest_rec.get('x_studio_transportation_method', False) not in (False, data['transportation_method']):
+            return {
+                'success': False,
+                'error': 'Origin/Destination not allowed for selected transportation_method'
+            }, 400
+
+        if uom_rec:
+            uom_factor = uom_rec[0].get('factor')
+        if uom_factor is not None:
+            data['ratio'] = uom_factor
+
+        # Tentukan country_id yang akan digunakan
+        # Prioritas: country_id dari request > country_id dari state > False
+        final_country_id = data.get('country_id', country_id_from_state) if data.get('country_id') else country_id_from_state
         
-        # Hanya tambahkan field jika field tersebut ada di Odoo
-        if 'commodity_id' in data and data.get('commodity_id') not in (None, False, ''):
-            field_name = so_field_map.get('commodity')
-            if field_name and field_name in available_fields:
-                sales_order_data[field_name] = data['commodity_id']
-        if 'uom_id' in data and data.get('uom_id') not in (None, False, ''):
-            field_name = so_field_map.get('uom')
-            if field_name and field_name in available_fields:
-                sales_order_data[field_name] = data['uom_id']
-        if 'qty' in data and data.get('qty') is not None:
-            field_name = so_field_map.get('qty')
-            if field_name and field_name in available_fields:
-                sales_order_data[field_name] = data.get('qty', 0)
-        if 'kgs_chg' in data and data.get('kgs_chg') is not None:
-            field_name = so_field_map.get('kgs_chg')
-            if field_name and field_name in available_fields:
-                sales_order_data[field_name] = data.get('kgs_chg', 0)
-        if 'kgs_wt' in data and data.get('kgs_wt') is not None:
-            field_name = so_field_map.get('kgs_wt')
-            if field_name and field_name in available_fields:
-                sales_order_data[field_name] = data.get('kgs_wt', 0)
-        if 'ratio' in data and data.get('ratio') is not None:
-            field_name = so_field_map.get('ratio')
-            if field_name and field_name in available_fields:
-                sales_order_data[field_name] = data.get('ratio', 0.0)
+        contact_action = 'reused'
+        if partner_id:
+            # Optional: sinkronkan field baru ke contact yang direuse (tanpa overwrite agresif)
+            updated = yield call(
+                'res.partner', 'write',
+                [partner_id, _partner_update_vals(data, final_country_id)],
+                default=None
+            )
+            if updated is None and indexed_partner:
+                # ID dari index bisa sudah dihapus di Odoo (polling index tidak
+                # melihat unlink): buang dari index lalu cari ulang ke Odoo
+                partner_index.forget(partner_id)
+                partner_id = _match_partner((yield _partner_search_call(data['name'], data['email'])), data['name'], data['email'])
+                if partner_id:
+                    partner_index.remember(partner_id, data['name'], data['email'])
+                    yield call(
+                        'res.partner', 'write',
+                        [partner_id, _partner_update_vals(data, final_country_id)],
+                        default=False
+                    )
+        if not partner_id:
+            # Jika contact tidak ditemukan, otomatis buat baru
+            partner_id = yield call(
+                'res.partner',
+                'create',
+                [_partner_create_vals(data, final_country_id)]
+            )
+            partner_index.remember(partner_id, data['name'], data.get('email'))
+            contact_action = 'created'
         
-        new_quote_id = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
+        # 2. Buat Sales Order dengan referensi ke contact
+        origin_field_name = origin_field_meta.get('field', 'x_studio_pickup_origin')
+        dest_field_name = dest_field_meta.get('field', 'x_studio_pickup_destination')
+        new_quote_id = yield call(
             'sale.order',
             'create',
-            [sales_order_data]
-        )
-        
-        # 3. Ambil data yang baru dibuat untuk response
-        new_contact = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
-            'res.partner',
-            'read',
-            [partner_id],
-            {'fields': ['id', 'name', 'email', 'phone', 'x_studio_your_business', 'country_id', 'state_id']}
+            [_sale_order_vals(data, partner_id, so_field_map, origin_field_name, dest_field_name)]
         )
         
-        # Ambil data sales order dengan field custom (tanpa fallback)
-        read_fields = ['id', 'name', 'partner_id', 'state', 'create_date', 'x_studio_transportation_method', origin_field_name, dest_field_name, 'x_studio_terms_condition', so_field_map['commodity'], so_field_map['uom'], so_field_map['qty'], so_field_map['kgs_chg'], so_field_map['kgs_wt'], so_field_map['ratio']]
-        new_quote = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
-            'sale.order',
-            'read',
-            [new_quote_id],
-            {'fields': read_fields}
-        )
-        
-        # Ubah nama field untuk contact
-        contact_data = new_contact[0]
-        if 'x_studio_your_business' in contact_data:
-            contact_data['business_type'] = contact_data['x_studio_your_business']
-            del contact_data['x_studio_your_business']
-        
-        # Tambahkan informasi country dan state yang lebih detail
-        if contact_data.get('country_id') and contact_data['country_id'] != False:
-            contact_data['country_name'] = contact_data['country_id'][1] if isinstance(contact_data['country_id'], list) else contact_data['country_id']
-            # Ubah country_id menjadi integer saja
-            if isinstance(contact_data['country_id'], list):
-                contact_data['country_id'] = contact_data['country_id'][0]
-        else:
-            contact_data['country_name'] = None
-            contact_data['country_id'] = None
-            
-        if contact_data.get('state_id') and contact_data['state_id'] != False:
-            contact_data['state_name'] = contact_data['state_id'][1] if isinstance(contact_data['state_id'], list) else contact_data['state_id']
-            # Ubah state_id menjadi integer saja
-            if isinstance(contact_data['state_id'], list):
-                contact_data['state_id'] = contact_data['state_id'][0]
-        else:
-            contact_data['state_name'] = None
-            contact_data['state_id'] = None
-        
-        # Ubah nama field untuk sales order
-        quote_data = new_quote[0]
-        if 'x_studio_transportation_method' in quote_data:
-            quote_data['transportation_method'] = quote_data['x_studio_transportation_method']
-            del quote_data['x_studio_transportation_method']
-        
-        if origin_field_name in quote_data:
-            quote_data['pickup_origin'] = quote_data[origin_field_name]
-            del quote_data[origin_field_name]
-        
-        if dest_field_name in quote_data:
-            quote_data['pickup_destination'] = quote_data[dest_field_name]
-            del quote_data[dest_field_name]
-        
-        if 'x_studio_terms_condition' in quote_data:
-            quote_data['terms_condition'] = quote_data['x_studio_terms_condition']
-            del quote_data['x_studio_terms_condition']
-        
-        # Normalisasi field-field baru
-        if so_field_map['commodity'] in quote_data:
-            # Handle many2one: ambil ID saja jika berupa list [id, name]
-            if isinstance(quote_data[so_field_map['commodity']], list) and len(quote_data[so_field_map['commodity']]) >= 1:
-                quote_data['commodity'] = quote_data[so_field_map['commodity']][0]
-            else:
-                quote_data['commodity'] = quote_data[so_field_map['commodity']]
-            del quote_data[so_field_map['commodity']]
-        if so_field_map['uom'] in quote_data:
-            # Handle many2one: kembalikan NAMA jika berupa list [id, name]
-            if isinstance(quote_data[so_field_map['uom']], list):
-                if len(quote_data[so_field_map['uom']]) >= 2:
-                    quote_data['uom'] = quote_data[so_field_map['uom']][1]
-                elif len(quote_data[so_field_map['uom']]) >= 1:
-                    # Fallback ke id jika nama tidak tersedia
-                    quote_data['uom'] = quote_data[so_field_map['uom']][0]
-                else:
-                    quote_data['uom'] = None
-            else:
-                quote_data['uom'] = quote_data[so_field_map['uom']]
-            del quote_data[so_field_map['uom']]
-        if so_field_map['qty'] in quote_data:
-            quote_data['qty'] = quote_data[so_field_map['qty']]
-            del quote_data[so_field_map['qty']]
-        if so_field_map['kgs_chg'] in quote_data:
-            quote_data['kgs_chg'] = quote_data[so_field_map['kgs_chg']]
-            del quote_data[so_field_map['kgs_chg']]
-        if so_field_map['kgs_wt'] in quote_data:
-            quote_data['kgs_wt'] = quote_data[so_field_map['kgs_wt']]
-            del quote_data[so_field_map['kgs_wt']]
-        if so_field_map['ratio'] in quote_data:
-            quote_data['ratio'] = quote_data[so_field_map['ratio']]
-            del quote_data[so_field_map['ratio']]
+        # 3. Ambil data yang baru dibuat untuk response (contact dan sales order paralel)
+        new_contact, new_quote = yield [
+            call(
+                'res.partner',
+                'read',
+                [partner_id],
+                {'fields': QUOTE_CONTACT_FIELDS}
+            ),
+            call(
+                'sale.order',
+                'read',
+                [new_quote_id],
+                {'fields': _created_quote_fields(so_field_map, origin_field_name, dest_field_name)}
+            )
+        ]
+        contact_data = _contact_response(new_contact[0])
+        quote_data = _quote_response(new_quote[0], so_field_map, origin_field_name, dest_field_name)
         
         # Siapkan response message
         message = 'Quote created successfully'
         if country_id_from_state and not data.get('country_id') and contact_action == 'created':
             message += f'. Country automatically set to {contact_data["country_name"]} based on selected state'
         
-        return ordered_jsonify({
+        return {
             'success': True,
             'data': {
                 'contact': contact_data,
@@ -616,304 +565,621 @@ def create_quote():
                 'contact_action': contact_action
             },
             'message': message
-        }), 201
+        }, 201
         
     except Exception as e:
-        return ordered_jsonify({
+        return {
             'success': False,
             'error': 'Failed to create quote',
             'details': str(e)
-        }), 500
+        }, 500
 
-@quote_bp.route('/quotes', methods=['GET'])
+@quote_bp.route('/quote/create', methods=['POST'])
 @handle_odoo_errors
-def get_all_quotes():
-    """Get all sales orders (quotes) with partner email information"""
-    # Ambil semua ID sales order
-    quote_ids = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY, 
-        'sale.order', 
-        'search', 
-        [[]]  # Domain kosong = semua records
-    )
-    
-    if not quote_ids:
-        return ordered_jsonify({
-            'success': True,
-            'data': [],
-            'count': 0
-        })
-    
+@idempotent('quote_create')
+def create_quote():
+    """Create contact and sales order from complete form data"""
+    body, status = run_sync(create_quote_flow(request.get_json(silent=True)), odoo)
+    return ordered_jsonify(body), status
+
+def _as_id_list(value):
+    """Hasil `create` multi-record: list ID (Odoo lama bisa mengembalikan satu ID)"""
+    return value if isinstance(value, list) else [value]
+
+def bulk_quote_flow(items):
+    """
+    Flow pembuatan banyak quote sekaligus (POST /quotes/bulk).
+
+    Validasi dan pembuatan record dilakukan per fase untuk seluruh batch,
+    sehingga jumlah round trip ke Odoo tetap (bukan per quote):
+    1. Satu batch paralel: state/country yang tidak ada di reference data,
+       pickup origin/destination yang tidak ada di katalog pickup
+       (search_read `id in`), kandidat partner (email), factor UoM
+    2. Satu `create` res.partner multi-record untuk contact baru (+ write
+       contact yang direuse, dikelompokkan per vals yang sama)
+    3. Satu `create` sale.order multi-record
+    4. Satu batch paralel read contact dan sales order untuk response
+
+    Item yang tidak valid dilaporkan per index dan tidak menggagalkan item
+    lain. Contact dengan name + email sama di dalam satu batch dibuat sekali.
+
+    Returns:
+        tuple: (body response, status HTTP) — 201 jika semua berhasil, 207
+            jika sebagian, 400 jika tidak ada yang valid
+    """
+    try:
+        if isinstance(items, dict):
+            items = items.get('quotes')
+        if not isinstance(items, list) or not items:
+            return {
+                'success': False,
+                'error': 'Body must be a non-empty array of quotes (or {"quotes": [...]})'
+            }, 400
+        if len(items) > Config.BULK_QUOTE_MAX_ITEMS:
+            return {
+                'success': False,
+                'error': f'At most {Config.BULK_QUOTE_MAX_ITEMS} quotes per request'
+            }, 400
+
+        pickup_meta = get_pickup_fields_meta()
+        origin_field_meta = pickup_meta.get('origin', {})
+        dest_field_meta = pickup_meta.get('destination', {})
+        so_field_map = get_sale_order_field_map()
+        origin_model_name = origin_field_meta.get('relation')
+        dest_model_name = dest_field_meta.get('relation')
+        if not origin_model_name or not dest_model_name:
+            return {
+                'success': False,
+                'error': 'Pickup field relation not found in Odoo'
+            }, 500
+        origin_field_name = origin_field_meta.get('field', 'x_studio_pickup_origin')
+        dest_field_name = dest_field_meta.get('field', 'x_studio_pickup_destination')
+
+        results = [None] * len(items)
+
+        def fail(index, error):
+            results[index] = {'index': index, 'success': False, 'status': 400, 'error': error}
+
+        # Validasi lokal (tanpa Odoo)
+        pending = []
+        for index, data in enumerate(items):
+            if not isinstance(data, dict) or not data:
+                fail(index, 'No data provided')
+                continue
+            data = dict(data)
+            error = _validate_quote_input(data)
+            if error:
+                fail(index, error)
+                continue
+            try:
+                origin_id = int(data['pickup_origin_id'])
+                dest_id = int(data['pickup_destination_id'])
+            except (TypeError, ValueError):
+                fail(index, 'Invalid pickup_origin_id or pickup_destination_id')
+                continue
+            try:
+                state_id = int(data['state_id']) if data.get('state_id') else None
+            except (TypeError, ValueError):
+                fail(index, 'Invalid state_id')
+                continue
+            try:
+                country_id = int(data['country_id']) if data.get('country_id') else None
+            except (TypeError, ValueError):
+                fail(index, 'Invalid country_id')
+                continue
+            try:
+                uom_id = int(data['uom_id']) if data.get('uom_id') not in (None, False, '') else None
+            except (TypeError, ValueError):
+                uom_id = None
+            data['transportation_method'] = normalize_transportation(data['transportation_method'])
+            pending.append({
+                'index': index, 'data': data, 'origin_id': origin_id, 'dest_id': dest_id,
+                'state_id': state_id, 'country_id': country_id, 'uom_id': uom_id
+            })
+
+        # 1. Semua lookup validasi dalam satu batch paralel
+        snapshot = reference_data.snapshot()
+        states = dict(snapshot.state_by_id)
+        known_countries = set(snapshot.country_by_id)
+        missing_states = sorted({item['state_id'] for item in pending if item['state_id'] and item['state_id'] not in states})
+        missing_countries = sorted({item['country_id'] for item in pending if item['country_id'] and item['country_id'] not in known_countries})
+        # Pickup dari katalog di memori; hanya ID yang tidak ada di katalog yang di-query
+        origins, destinations = {}, {}
+        catalog = _pickup_catalog()
+        for item in pending:
+            found_pickups = _catalog_pickups(catalog, [
+                ('origin', origin_model_name, None, item['origin_id']),
+                ('destination', dest_model_name, None, item['dest_id'])
+            ])
+            if 'origin' in found_pickups:
+                origins[item['origin_id']] = found_pickups['origin']
+            if 'destination' in found_pickups:
+                destinations[item['dest_id']] = found_pickups['destination']
+        origin_ids = sorted({item['origin_id'] for item in pending if item['origin_id'] not in origins})
+        dest_ids = sorted({item['dest_id'] for item in pending if item['dest_id'] not in destinations})
+        # Contact dicari di index partner dulu; hanya yang miss yang di-query ke Odoo
+        emails = set()
+        for item in pending:
+            if item['data'].get('force_create'):
+                continue
+            item['indexed_partner'] = partner_index.lookup(item['data']['name'], item['data']['email'])
+            if item['indexed_partner'] is None:
+                emails.add(str(item['data']['email']).strip().lower())
+        uom_factors = {}
+        uom_snapshot = _uom_catalog()
+        if uom_snapshot is not None:
+            for item in pending:
+                found_uom, factor = uom_snapshot.factor(item['uom_id'])
+                if found_uom:
+                    uom_factors[item['uom_id']] = factor
+        uom_ids = sorted({item['uom_id'] for item in pending if item['uom_id'] and item['uom_id'] not in uom_factors})
+
+        uom_model_name = 'uom.uom'
+        try:
+            uom_model_name = get_sale_order_fields_meta().get(so_field_map.get('uom'), {}).get('relation') or uom_model_name
+        except Exception:
+            pass
+
+        lookups = {}
+        if origin_ids:
+            lookups['origin'] = call(
+                origin_model_name, 'search_read',
+                [list(origin_field_meta.get('domain') or []) + [['id', 'in', origin_ids]]],
+                {'fields': _pickup_read_fields(origin_model_name)}
+            )
+        if dest_ids:
+            lookups['destination'] = call(
+                dest_model_name, 'search_read',
+                [list(dest_field_meta.get('domain') or []) + [['id', 'in', dest_ids]]],
+                {'fields': _pickup_read_fields(dest_model_name)}
+            )
+        if missing_states:
+            lookups['states'] = call(
+                'res.country.state', 'search_read',
+                [[['id', 'in', missing_states]]], {'fields': ['id', 'country_id']}
+            )
+        if missing_countries:
+            lookups['countries'] = call('res.country', 'search', [[['id', 'in', missing_countries]]])
+        if emails:
+            lookups['partners'] = call(
+                'res.partner', 'search_read',
+                [email_domain(emails)], {'fields': ['id', 'name', 'email'], 'order': 'id'}
+            )
+        indexed_ids = sorted({item['indexed_partner'] for item in pending if item.get('indexed_partner')})
+        if indexed_ids:
+            # ID dari index bisa sudah dihapus di Odoo (polling index tidak melihat unlink)
+            lookups['indexed'] = call('res.partner', 'search', [[['id', 'in', indexed_ids]]])
+        if uom_ids:
+            # Gagal baca factor tidak menggagalkan quote (ratio tidak diisi)
+            lookups['uoms'] = call(uom_model_name, 'search_read', [[['id', 'in', uom_ids]]], {'fields': ['id', 'factor']}, default=[])
+        found = dict(zip(lookups, (yield list(lookups.values())))) if lookups else {}
+
+        for record in found.get('states', []):
+            country = record.get('country_id')
+            states[record['id']] = {'id': record['id'], 'country_id': country[0] if country else None}
+        known_countries.update(found.get('countries', []))
+        origins.update((record['id'], record) for record in found.get('origin', []))
+        destinations.update((record['id'], record) for record in found.get('destination', []))
+        uom_factors.update((record['id'], record.get('factor')) for record in found.get('uoms', []))
+        live_ids = set(found.get('indexed', []))
+        stale = [item for item in pending if item.get('indexed_partner') and item['indexed_partner'] not in live_ids]
+        if stale:
+            # Partner yang sudah dihapus dibuang dari index lalu dicari ulang berdasarkan email
+            for item in stale:
+                partner_index.forget(item['indexed_partner'])
+                item['indexed_partner'] = None
+            found['partners'] = list(found.get('partners', [])) + (yield call(
+                'res.partner', 'search_read',
+                [email_domain({str(item['data']['email']).strip().lower() for item in stale})],
+                {'fields': ['id', 'name', 'email'], 'order': 'id'}
+            ))
+        existing_partners = {}
+        for partner in found.get('partners', []):
+            existing_partners.setdefault(partner_key(partner.get('name'), partner.get('email')), partner['id'])
+            partner_index.remember(partner['id'], partner.get('name'), partner.get('email'))
+
+        # Validasi hasil lookup per item
+        accepted = []
+        for item in pending:
+            data = item['data']
+            if item['state_id'] and item['state_id'] not in states:
+                fail(item['index'], 'Invalid state_id')
+                continue
+            if item['country_id'] and item['country_id'] not in known_countries:
+                fail(item['index'], 'Invalid country_id')
+                continue
+            origin_rec = origins.get(item['origin_id'])
+            dest_rec = destinations.get(item['dest_id'])
+            if origin_rec is None or dest_rec is None:
+                fail(item['index'], 'Invalid pickup_origin_id or pickup_destination_id')
+                continue
+            if origin_rec.get('x_studio_transportation_method', False) not in (False, data['transportation_method']) or \
+               dest_rec.get('x_studio_transportation_method', False) not in (False, data['transportation_method']):
+                fail(item['index'], 'Origin/Destination not allowed for selected transportation_method')
+                continue
+            if uom_factors.get(item['uom_id']) is not None:
+                data['ratio'] = uom_factors[item['uom_id']]
+            country_id_from_state = states[item['state_id']].get('country_id') if item['state_id'] else None
+            item['country_id_from_state'] = country_id_from_state
+            item['final_country_id'] = data.get('country_id', country_id_from_state) if data.get('country_id') else country_id_from_state
+            accepted.append(item)
+
+        if not accepted:
+            return {
+                'success': False,
+                'data': {'results': results, 'created': 0, 'failed': len(results)},
+                'error': 'No valid quotes to create'
+            }, 400
+
+        # 2. Contact: reuse (name + email sama) atau buat baru dalam satu create
+        new_partner_vals = []
+        new_partner_slot = {}
+        reuse_updates = {}
+        for item in accepted:
+            data = item['data']
+            key = partner_key(data['name'], data['email'])
+            partner_id = None if data.get('force_create') else (item.get('indexed_partner') or existing_partners.get(key))
+            if partner_id:
+                item['partner_id'] = partner_id
+                item['contact_action'] = 'reused'
+                updates = _partner_update_vals(data, item['final_country_id'])
+                reuse_updates.setdefault(json.dumps(updates, sort_keys=True, default=str), (updates, set()))[1].add(partner_id)
+                continue
+            slot_key = ('force', item['index']) if data.get('force_create') else key
+            if slot_key not in new_partner_slot:
+                new_partner_slot[slot_key] = len(new_partner_vals)
+                new_partner_vals.append(_partner_create_vals(data, item['final_country_id']))
+            item['partner_slot'] = new_partner_slot[slot_key]
+            item['contact_action'] = 'created'
+
+        partner_calls = [
+            call('res.partner', 'write', [sorted(ids), updates], default=False)
+            for updates, ids in reuse_updates.values()
+        ]
+        if new_partner_vals:
+            partner_calls.insert(0, call('res.partner', 'create', [new_partner_vals]))
+        if partner_calls:
+            partner_results = yield partner_calls
+            if new_partner_vals:
+                new_partner_ids = _as_id_list(partner_results[0])
+                for item in accepted:
+                    if 'partner_slot' in item:
+                        item['partner_id'] = new_partner_ids[item['partner_slot']]
+                        partner_index.remember(item['partner_id'], item['data']['name'], item['data']['email'])
+
+        # 3. Semua sales order dalam satu create
+        quote_ids = _as_id_list((yield call(
+            'sale.order', 'create',
+            [[_sale_order_vals(item['data'], item['partner_id'], so_field_map, origin_field_name, dest_field_name) for item in accepted]]
+        )))
+
+        # 4. Baca ulang contact dan sales order untuk response (paralel)
+        partner_ids = sorted({item['partner_id'] for item in accepted})
+        new_contacts, new_quotes = yield [
+            call('res.partner', 'read', [partner_ids], {'fields': QUOTE_CONTACT_FIELDS}),
+            call('sale.order', 'read', [quote_ids], {'fields': _created_quote_fields(so_field_map, origin_field_name, dest_field_name)})
+        ]
+        contacts_by_id = {contact['id']: contact for contact in new_contacts}
+        quotes_by_id = {quote['id']: quote for quote in new_quotes}
+
+        for item, quote_id in zip(accepted, quote_ids):
+            contact = contacts_by_id.get(item['partner_id'])
+            quote = quotes_by_id.get(quote_id)
+            contact_data = _contact_response(contact) if contact else {'id': item['partner_id']}
+            quote_data = _quote_response(quote, so_field_map, origin_field_name, dest_field_name) if quote else {'id': quote_id}
+            message = 'Quote created successfully'
+            if item['country_id_from_state'] and not item['data'].get('country_id') and item['contact_action'] == 'created':
+                message += f'. Country automatically set to {contact_data.get("country_name")} based on selected state'
+            results[item['index']] = {
+                'index': item['index'],
+                'success': True,
+                'status': 201,
+                'data': {
+                    'contact': contact_data,
+                    'sales_order': quote_data,
+                    'contact_action': item['contact_action']
+                },
+                'message': message
+            }
+
+        created = len(accepted)
+        failed = len(results) - created
+        return {
+            'success': failed == 0,
+            'data': {'results': results, 'created': created, 'failed': failed},
+            'message': f'{created} of {len(results)} quotes created'
+        }, 201 if failed == 0 else 207
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': 'Failed to create quotes',
+            'details': str(e)
+        }, 500
+
+@quote_bp.route('/quotes/bulk', methods=['POST'])
+@handle_odoo_errors
+@idempotent('quote_bulk')
+def create_quotes_bulk():
+    """Create many quotes (contacts + sales orders) with batched Odoo writes"""
+    body, status = run_sync(bulk_quote_flow(request.get_json(silent=True)), odoo)
+    return ordered_jsonify(body), status
+
+def _build_quote_domain(args):
+    """
+    Terjemahkan query param filter /quotes menjadi domain Odoo.
+
+    Raises:
+        ValueError: jika ada parameter yang tidak valid
+    """
+    domain = []
+    date_from = parse_date_arg(args, 'date_from')
+    date_to = parse_date_arg(args, 'date_to', end_of_day=True)
+    if date_from:
+        domain.append(['create_date', '>=', date_from])
+    if date_to:
+        domain.append(['create_date', '<=', date_to])
+
+    states = [st.strip() for st in (args.get('state') or '').split(',') if st.strip()]
+    if states:
+        domain.append(['state', 'in', states])
+
+    partner_id = parse_int_arg(args, 'partner_id', minimum=1)
+    if partner_id is not None:
+        domain.append(['partner_id', '=', partner_id])
+
+    transportation = args.get('transportation_method')
+    if transportation:
+        domain.append(['x_studio_transportation_method', '=', normalize_transportation(transportation)])
+    return domain
+
+def _quote_list_fields():
+    """Field map dan daftar field sale.order yang dibaca untuk list quote"""
     # Ambil data sales order dengan field custom dan partner_id (tanpa state dari sales order)
     so_field_map = get_sale_order_field_map()
     pickup_meta = get_pickup_fields_meta()
     origin_field_name = pickup_meta.get('origin', {}).get('field', 'x_studio_pickup_origin')
     dest_field_name = pickup_meta.get('destination', {}).get('field', 'x_studio_pickup_destination')
     read_fields = ['id', 'name', 'partner_id', 'create_date', 'x_studio_transportation_method', origin_field_name, dest_field_name, 'x_studio_terms_condition', so_field_map['commodity'], so_field_map['uom'], so_field_map['qty'], so_field_map['kgs_chg'], so_field_map['kgs_wt'], so_field_map['ratio']]
-    quotes = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY,
-        'sale.order',
-        'read',
-        [quote_ids],
-        {'fields': read_fields}
-    )
-    
+    return read_fields, so_field_map, origin_field_name, dest_field_name
+
+def _normalize_quotes(quotes, read_fields, so_field_map, origin_field_name, dest_field_name):
+    """Tambahkan info customer dan ubah nama field x_studio_ pada list quote (list row compact)"""
+    return run_sync(_normalize_quotes_flow(quotes, read_fields, so_field_map, origin_field_name, dest_field_name), odoo)
+
+def _normalize_quotes_flow(quotes, read_fields, so_field_map, origin_field_name, dest_field_name):
+    """Flow _normalize_quotes (satu read res.partner untuk semua quote)"""
     # Ambil informasi partner untuk setiap quote
-    partner_ids = [quote['partner_id'][0] for quote in quotes if quote.get('partner_id') and isinstance(quote['partner_id'], list)]
+    partner_ids = list({quote['partner_id'][0] for quote in quotes if quote.get('partner_id') and isinstance(quote['partner_id'], list)})
+    customers = {}
     if partner_ids:
-        partners = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
+        partners = yield call(
             'res.partner',
             'read',
             [partner_ids],
             {'fields': ['id', 'name', 'email', 'phone', 'state_id']}
         )
         
-        # Ambil semua state_id yang unik dari partners
-        state_ids = list(set([partner['state_id'][0] for partner in partners if partner.get('state_id')]))
-        
-        # Ambil informasi state
-        states = {}
-        if state_ids:
-            state_data = models.execute_kw(
-                ODOO_DB, uid, ODOO_API_KEY,
-                'res.country.state',
-                'read',
-                [state_ids],
-                {'fields': ['id', 'name', 'code']}
-            )
-            states = {state['id']: state for state in state_data}
-        
-        # Buat mapping partner_id -> partner data
-        partner_map = {partner['id']: partner for partner in partners}
+        # Informasi state (name, code) diambil dari reference data di memori
+        states = reference_data.snapshot().state_by_id
         
-        # Tambahkan informasi partner ke setiap quote
-        for quote in quotes:
-            if quote.get('partner_id'):
-                partner_id = quote['partner_id'][0]
-                if partner_id in partner_map:
-                    partner = partner_map[partner_id]
-                    
-                    # Kelompokkan semua informasi partner dalam objek partner_id
-                    partner_info = {
-                        'id': partner_id,
-                        'name': partner['name'],
-                        'email': partner['email'],
-                        'phone': partner['phone']
-                    }
-                    
-                    # Ambil state dari partner
-                    if partner.get('state_id'):
-                        state_id = partner['state_id'][0]
-                        if state_id in states:
-                            partner_info['state'] = states[state_id]['name']
-                            partner_info['state_code'] = states[state_id]['code']
-                        else:
-                            partner_info['state'] = None
-                            partner_info['state_code'] = None
-                    else:
-                        partner_info['state'] = None
-                        partner_info['state_code'] = None
-                    
-                    # Ganti partner_id dengan objek lengkap dan ubah nama key
-                    quote['customer'] = partner_info
-                    # Hapus partner_id yang lama
-                    if 'partner_id' in quote:
-                        del quote['partner_id']
-                else:
-                    # Jika partner tidak ditemukan, set customer menjadi null
-                    quote['customer'] = None
-                    # Hapus partner_id yang lama
-                    if 'partner_id' in quote:
-                        del quote['partner_id']
-            else:
-                # Jika tidak ada partner_id, set customer menjadi null
-                quote['customer'] = None
-                # Hapus partner_id yang lama
-                if 'partner_id' in quote:
-                    del quote['partner_id']
+        # Satu objek customer per partner (dipakai bersama oleh quote-nya)
+        for partner in partners:
+            state = states.get(partner['state_id'][0]) if partner.get('state_id') else None
+            customers[partner['id']] = {
+                'id': partner['id'],
+                'name': partner['name'],
+                'email': partner['email'],
+                'phone': partner['phone'],
+                'state': state['name'] if state else None,
+                'state_code': state['code'] if state else None
+            }
+
+    def customer(partner):
+        # Partner yang tidak ditemukan (atau quote tanpa partner) -> customer null
+        return customers.get(partner[0]) if partner else None
+
+    # partner_id diganti customer dan field x_studio_ di-rename dalam satu pass;
+    # hasilnya row ber-__slots__ (bukan dict per quote) untuk listing/export
+    mapper = quote_mapper(read_fields, so_field_map, origin_field_name, dest_field_name, customer=True, compact=True)
+    return mapper.map_all(quotes, customer=customer)
+
+@quote_bp.route('/quotes', methods=['GET'])
+@handle_odoo_errors
+def get_all_quotes():
+    """Get sales orders (quotes) with partner email information (paginated).
+
+    Query params (semua opsional):
+        date_from, date_to: filter create_date (YYYY-MM-DD, inklusif)
+        state: state sale.order, bisa dipisah koma (mis. draft,sent)
+        partner_id: ID customer
+        transportation_method: key atau label
+        limit, offset, order: paging (order mis. "create_date desc")
+        cursor: token next_cursor dari response sebelumnya (keyset)
+        total: 1 untuk menyertakan total record sesuai filter
+        max_staleness: umur maks data mirror (detik) jika SYNC_ENABLED; 0 = langsung dari Odoo
+        format=ndjson (atau Accept: application/x-ndjson): stream semua quote sesuai filter
+    """
+    if wants_ndjson():
+        return _export_quotes_ndjson(request.args)
+    try:
+        client = read_client(odoo, request.args)
+    except ValueError as e:
+        return ordered_jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    body, status = run_sync(quote_list_flow(request.args), client)
+    return ordered_jsonify(body), status
+
+def _export_quotes_ndjson(args):
+    """Mode export: stream semua quote sesuai filter per batch sebagai NDJSON"""
+    try:
+        filter_domain = _build_quote_domain(args)
+    except ValueError as e:
+        return ordered_jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    read_fields, so_field_map, origin_field_name, dest_field_name = _quote_list_fields()
+
+    def batches():
+        for batch in iter_search_read(odoo, 'sale.order', filter_domain, read_fields, Config.EXPORT_BATCH_SIZE):
+            yield _normalize_quotes(batch, read_fields, so_field_map, origin_field_name, dest_field_name)
+    return ndjson_response(batches())
+
+@quote_bp.route('/quotes/export', methods=['GET'])
+@handle_odoo_errors
+def export_quotes():
+    """Export quote sebagai tabel bertipe, di-stream per batch.
+
+    Query params (semua opsional):
+        format: csv (default), parquet atau arrow (Arrow IPC stream); parquet/arrow butuh pyarrow
+        date_from, date_to, state, partner_id, transportation_method: filter seperti GET /quotes
+        after_id: lanjutkan export setelah quote dengan id ini
+    """
+    fmt = (request.args.get('format') or 'csv').strip().lower()
+    try:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid format: {fmt}. Valid values: {', '.join(EXPORT_FORMATS)}")
+        if fmt not in available_formats():
+            raise ValueError(f"Format {fmt} requires pyarrow to be installed")
+        filter_domain = _build_quote_domain(request.args)
+        after_id = parse_int_arg(request.args, 'after_id')
+    except ValueError as e:
+        return ordered_jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    _, so_field_map, origin_field_name, dest_field_name = _quote_list_fields()
+    # Kolom mengikuti key GET /quotes; customer langsung dari partner_id (tanpa read res.partner)
+    fields = [
+        ('id', 'id'),
+        ('name', 'name'),
+        ('customer', 'partner_id'),
+        ('create_date', 'create_date'),
+        ('transportation_method', 'x_studio_transportation_method'),
+        ('pickup_origin', origin_field_name),
+        ('pickup_destination', dest_field_name),
+        ('terms_condition', 'x_studio_terms_condition'),
+        ('commodity', so_field_map['commodity']),
+        ('uom', so_field_map['uom']),
+        ('qty', so_field_map['qty']),
+        ('kgs_chg', so_field_map['kgs_chg']),
+        ('kgs_wt', so_field_map['kgs_wt']),
+        ('ratio', so_field_map['ratio']),
+    ]
+    columns = export_columns(fields, get_sale_order_fields_meta())
+    read_fields = list(dict.fromkeys(source for _, source in fields))
+    batches = iter_search_read(odoo, 'sale.order', filter_domain, read_fields, Config.COLUMNAR_BATCH_SIZE, after_id)
+    return export_response(batches, columns, fmt, 'quotes')
+
+def quote_list_flow(args):
+    """
+    Flow satu halaman GET /quotes (lihat rpc_flow).
+
+    Returns:
+        tuple: (body response, status HTTP)
+    """
+    try:
+        filter_domain = _build_quote_domain(args)
+        limit, offset, _ = parse_pagination(args)
+        order_field, order_dir = parse_order_arg(args, QUOTE_ORDER_FIELDS, 'id desc')
+        cursor = decode_cursor(args['cursor']) if args.get('cursor') else None
+        if cursor is not None and cursor.get('order') != [order_field, order_dir]:
+            raise ValueError('Cursor does not match the requested order')
+    except ValueError as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }, 400
+
+    read_fields, so_field_map, origin_field_name, dest_field_name = _quote_list_fields()
+
+    domain = list(filter_domain)
+    if cursor is not None:
+        # Keyset: lanjut setelah record terakhir halaman sebelumnya
+        domain.extend(keyset_domain(order_field, order_dir, cursor.get('value'), cursor.get('id')))
+        offset = 0
     
-    # Ubah nama field yang memiliki prefix x_studio_
-    for quote in quotes:
-        # Ubah x_studio_transportation_method menjadi transportation_method
-        if 'x_studio_transportation_method' in quote:
-            quote['transportation_method'] = quote['x_studio_transportation_method']
-            del quote['x_studio_transportation_method']
-        
-        # Ubah pickup origin/destination menjadi nama generik
-        if origin_field_name in quote:
-            quote['pickup_origin'] = quote[origin_field_name]
-            del quote[origin_field_name]
-        
-        if dest_field_name in quote:
-            quote['pickup_destination'] = quote[dest_field_name]
-            del quote[dest_field_name]
-        
-        # Ubah x_studio_terms_condition menjadi terms_condition
-        if 'x_studio_terms_condition' in quote:
-            quote['terms_condition'] = quote['x_studio_terms_condition']
-            del quote['x_studio_terms_condition']
-        
-        # Normalisasi field-field baru
-        if so_field_map['commodity'] in quote:
-            # Handle many2one: ambil ID saja jika berupa list [id, name]
-            if isinstance(quote[so_field_map['commodity']], list) and len(quote[so_field_map['commodity']]) >= 1:
-                quote['commodity'] = quote[so_field_map['commodity']][0]
-            else:
-                quote['commodity'] = quote[so_field_map['commodity']]
-            del quote[so_field_map['commodity']]
-        if so_field_map['uom'] in quote:
-            # Handle many2one: kembalikan NAMA jika berupa list [id, name]
-            if isinstance(quote[so_field_map['uom']], list):
-                if len(quote[so_field_map['uom']]) >= 2:
-                    quote['uom'] = quote[so_field_map['uom']][1]
-                elif len(quote[so_field_map['uom']]) >= 1:
-                    quote['uom'] = quote[so_field_map['uom']][0]
-                else:
-                    quote['uom'] = None
-            else:
-                quote['uom'] = quote[so_field_map['uom']]
-            del quote[so_field_map['uom']]
-        if so_field_map['qty'] in quote:
-            quote['qty'] = quote[so_field_map['qty']]
-            del quote[so_field_map['qty']]
-        if so_field_map['kgs_chg'] in quote:
-            quote['kgs_chg'] = quote[so_field_map['kgs_chg']]
-            del quote[so_field_map['kgs_chg']]
-        if so_field_map['kgs_wt'] in quote:
-            quote['kgs_wt'] = quote[so_field_map['kgs_wt']]
-            del quote[so_field_map['kgs_wt']]
-        if so_field_map['ratio'] in quote:
-            quote['ratio'] = quote[so_field_map['ratio']]
-            del quote[so_field_map['ratio']]
+    # Field order dibutuhkan untuk cursor; dibaca tambahan (tidak ikut response) jika perlu
+    response_fields = list(read_fields)
+    if order_field not in read_fields:
+        read_fields.append(order_field)
+    
+    # Satu search_read: filter, paging dan urutan dikerjakan di Odoo;
+    # search_count (jika diminta) berjalan paralel
+    batch = [call(
+        'sale.order',
+        'search_read',
+        [domain],
+        {'fields': read_fields, 'limit': limit, 'offset': offset, 'order': order_clause(order_field, order_dir)}
+    )]
+    if parse_bool_arg(args, 'total'):
+        batch.append(call('sale.order', 'search_count', [filter_domain]))
+    quotes, *total = yield batch
+
+    next_cursor = None
+    if len(quotes) == limit:
+        last = quotes[-1]
+        next_cursor = encode_cursor({
+            'order': [order_field, order_dir],
+            'value': last.get(order_field),
+            'id': last['id']
+        })
+    
+    quotes = yield from _normalize_quotes_flow(quotes, response_fields, so_field_map, origin_field_name, dest_field_name)
     
-    return ordered_jsonify({
+    response = {
         'success': True,
         'data': quotes,
-        'count': len(quotes)
-    })
+        'count': len(quotes),
+        'limit': limit,
+        'offset': offset,
+        'next_cursor': next_cursor
+    }
+    if total:
+        response['total'] = total[0]
+    
+    return response, 200
 
 # ===================== LOOKUP ENDPOINTS =====================
 
-def _get_pickup_records(pickup_type='origin', transportation=None):
+def pickup_lookup(pickup_type, args):
     """
-    Helper function untuk ambil list pickup (origin atau destination).
-    
-    Args:
-        pickup_type: 'origin' atau 'destination'
-        transportation: transportation method untuk filter
-    
+    Lookup pickup dari katalog di memori (ETag per snapshot katalog).
+
     Returns:
-        List of records dengan field yang sudah dinormalisasi
+        tuple: (body response, status HTTP, (etag, last_modified) atau None)
     """
+    transportation = args.get('transportation')
     if not transportation:
-        return []
-    
-    pickup_meta = get_pickup_fields_meta()
-    meta = pickup_meta.get(pickup_type, {})
-    model_name = meta.get('relation')
-    
-    if not model_name:
-        return []
-    
-    # Deteksi field yang tersedia secara dinamis
-    fields_meta = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY,
-        model_name, 'fields_get',
-        [], {'attributes': ['type', 'string']}
-    )
-    
-    def pick_field(candidates):
-        for cand in candidates:
-            if cand in fields_meta:
-                return cand
-        return None
-    
-    address_field = pick_field(['x_name', 'x_studio_pickup_address', 'x_studio_address', 'x_studio_address_pickup', 'address', 'name'])
-    country_field = pick_field(['x_studio_country', 'country_id', 'x_studio_country_id'])
-    pickup_code_field = pick_field(['x_studio_pickup_code'])
-    transport_field = pick_field(['x_studio_transportation_method', 'transportation_method', 'x_transportation_method', 'x_transportation'])
-    
-    fields_to_read = ['id']
-    if address_field:
-        fields_to_read.append(address_field)
-    if country_field:
-        fields_to_read.append(country_field)
-    if pickup_code_field:
-        fields_to_read.append(pickup_code_field)
-    
-    # Build domain: domain dari field + filter transportation
-    domain = _parse_domain(meta.get('domain', []))
-    if transport_field:
-        domain.append([transport_field, '=', transportation])
-    
-    records = models.execute_kw(
-        ODOO_DB, uid, ODOO_API_KEY,
-        model_name, 'search_read',
-        [domain],
-        {'fields': fields_to_read}
+        return {
+            'success': False,
+            'error': 'Query param transportation is required'
+        }, 400, None
+
+    snapshot = pickup_catalog.snapshot()
+    records = snapshot.records(pickup_type, transportation)
+    return (
+        {'success': True, 'data': records, 'count': len(records)}, 200,
+        (f'{snapshot.etag}-{pickup_type}', snapshot.last_modified)
     )
-    
-    # Normalisasi response
-    for rec in records:
-        if 'display_name' in rec:
-            del rec['display_name']
-        
-        # Normalisasi alamat
-        if address_field and address_field in rec:
-            field_name = 'pickup_origin_address' if pickup_type == 'origin' else 'pickup_destination_address'
-            rec[field_name] = rec[address_field]
-            del rec[address_field]
-        
-        # Normalisasi country
-        if country_field and country_field in rec:
-            rec['country'] = rec[country_field]
-            del rec[country_field]
-        
-        # Tambahkan pickup_code jika ada
-        if pickup_code_field and pickup_code_field in rec:
-            rec['pickup_code'] = rec[pickup_code_field]
-            del rec[pickup_code_field]
-            
-            # Tambahkan country_name
-            if isinstance(rec.get('country'), list) and len(rec['country']) == 2:
-                rec['country_name'] = rec['country'][1]
-            else:
-                rec['country_name'] = None
-        else:
-            rec['country'] = None
-            rec['country_name'] = None
-    
-    return records
 
 @quote_bp.route('/lookups/pickup-origins', methods=['GET'])
 @handle_odoo_errors
 def get_pickup_origins():
     """Ambil list Pickup Origin terfilter oleh transportation method (selection)."""
-    transportation = request.args.get('transportation')
-    if not transportation:
-        return ordered_jsonify({
-            'success': False,
-            'error': 'Query param transportation is required'
-        }), 400
-
-    records = _get_pickup_records('origin', transportation)
-    return ordered_jsonify({'success': True, 'data': records, 'count': len(records)})
+    return lookup_response(pickup_lookup('origin', request.args))
 
 
 @quote_bp.route('/lookups/pickup-destinations', methods=['GET'])
 @handle_odoo_errors
 def get_pickup_destinations():
     """Ambil list Pickup Destination terfilter oleh transportation method (selection)."""
-    transportation = request.args.get('transportation')
-    if not transportation:
-        return ordered_jsonify({
-            'success': False,
-            'error': 'Query param transportation is required'
-        }), 400
-
-    records = _get_pickup_records('destination', transportation)
-    return ordered_jsonify({'success': True, 'data': records, 'count': len(records)})
+    return lookup_response(pickup_lookup('destination', request.args))
 
 @quote_bp.route('/quotes/test-fields', methods=['GET'])
 @handle_odoo_errors
@@ -921,8 +1187,7 @@ def test_quote_fields():
     """Test endpoint untuk mengecek field custom yang tersedia"""
     try:
         # Coba baca field custom satu per satu
-        test_quote_id = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY, 
+        test_quote_id = odoo.execute_kw(
             'sale.order', 
             'search', 
             [[]],  # Ambil quote pertama yang ada
@@ -949,8 +1214,7 @@ def test_quote_fields():
         
         for field in test_fields:
             try:
-                models.execute_kw(
-                    ODOO_DB, uid, ODOO_API_KEY,
+                odoo.execute_kw(
                     'sale.order',
                     'read',
                     [test_quote_id[0]],
@@ -977,205 +1241,37 @@ def test_quote_fields():
 @quote_bp.route('/lookups/transportation-methods', methods=['GET'])
 @handle_odoo_errors
 def get_transportation_methods():
-    """Ambil opsi selection dari field Transportation Method pada sale.order.
+    """Ambil opsi Transportation Method (x_transportation, fallback selection sale.order) dari registry di memori.
 
-    Response: { success, data: [{ value, label }], count }
+    Response: { success, data: [{ value, id }], count }
     """
-    # 1) Coba baca dari model studio khusus: x_transportation
-    try:
-        records = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
-            'x_transportation', 'search_read',
-            [[]], {'fields': ['id', 'name', 'display_name']}
-        )
-        if records:
-            options = []
-            for rec in records:
-                label = rec.get('display_name') or rec.get('name') or ''
-                value = rec.get('name') or label
-                options.append({'value': value, 'id': rec.get('id')})
-            return ordered_jsonify({'success': True, 'data': options, 'count': len(options)})
-    except Exception:
-        # Abaikan, lanjut ke fallback
-        pass
+    return lookup_response(option_lookup(transport_catalog, 'transportation methods'))
 
-    # 2) Fallback: Baca metadata field selection dari sale.order
+def option_lookup(catalog, name):
+    """Lookup dropdown dari katalog option di memori (lihat pickup_lookup)"""
     try:
-        fields_meta = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
-            'sale.order', 'fields_get',
-            [], {'attributes': ['selection']}
-        )
-        selection = fields_meta.get('x_studio_transportation_method', {}).get('selection', [])
-        options = []
-        for item in selection:
-            if isinstance(item, (list, tuple)) and len(item) == 2:
-                options.append({'value': item[0]})
-        return ordered_jsonify({'success': True, 'data': options, 'count': len(options)})
+        snapshot = catalog.snapshot()
     except Exception as e:
-        return ordered_jsonify({'success': False, 'error': 'Failed to fetch transportation methods', 'details': str(e)}), 500
+        return {'success': False, 'error': f'Failed to fetch {name}', 'details': str(e)}, 500, None
+    return (
+        {'success': True, 'data': snapshot.options, 'count': len(snapshot.options)}, 200,
+        (snapshot.etag, snapshot.last_modified)
+    )
 
 @quote_bp.route('/lookups/commodities', methods=['GET'])
 @handle_odoo_errors
 def get_commodities():
-    """Ambil list Commodity untuk dropdown.
+    """Ambil list Commodity untuk dropdown (dari katalog di memori).
     
     Response: { success, data: [{ id, name }], count }
     """
-    try:
-        # Deteksi field commodity dari sale.order
-        so_field_map = get_sale_order_field_map()
-        commodity_field = so_field_map.get('commodity')
-        
-        if not commodity_field:
-            return ordered_jsonify({'success': True, 'data': [], 'count': 0})
-        
-        # Ambil metadata field untuk dapatkan relation model
-        fields_meta = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
-            'sale.order', 'fields_get',
-            [commodity_field], {'attributes': ['relation', 'string']}
-        )
-        
-        relation_model = fields_meta.get(commodity_field, {}).get('relation')
-        if not relation_model:
-            return ordered_jsonify({'success': True, 'data': [], 'count': 0})
-        
-        # Ambil semua record dari model relation
-        # Cek field yang tersedia di model
-        try:
-            model_fields = models.execute_kw(
-                ODOO_DB, uid, ODOO_API_KEY,
-                relation_model, 'fields_get',
-                [], {'attributes': ['store', 'type']}
-            )
-            # Tentukan field yang akan di-request (hanya yang ada)
-            fields_to_read = ['id']
-            if 'name' in model_fields:
-                fields_to_read.append('name')
-            if 'display_name' in model_fields:
-                fields_to_read.append('display_name')
-            
-            # Tentukan order by (hanya field yang stored, bukan computed)
-            order_by = None
-            if 'name' in model_fields:
-                # Cek apakah name stored (bukan computed)
-                name_meta = model_fields.get('name', {})
-                if name_meta.get('store', True):  # Default True jika tidak ada info
-                    order_by = 'name'
-            # Jangan pakai display_name untuk order karena biasanya computed
-            if not order_by and 'id' in model_fields:
-                order_by = 'id'
-        except Exception:
-            fields_to_read = ['id']
-            order_by = None
-        
-        # Build search_read params
-        search_params = {'fields': fields_to_read}
-        if order_by:
-            search_params['order'] = order_by
-        
-        records = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
-            relation_model, 'search_read',
-            [[]],
-            search_params
-        )
-        
-        # Format response
-        options = []
-        for rec in records:
-            name = rec.get('display_name') or rec.get('name') or ''
-            options.append({
-                'id': rec.get('id'),
-                'name': name
-            })
-        
-        return ordered_jsonify({'success': True, 'data': options, 'count': len(options)})
-    
-    except Exception as e:
-        return ordered_jsonify({'success': False, 'error': 'Failed to fetch commodities', 'details': str(e)}), 500
+    return lookup_response(option_lookup(commodity_catalog, 'commodities'))
 
 @quote_bp.route('/lookups/uoms', methods=['GET'])
 @handle_odoo_errors
 def get_uoms():
-    """Ambil list Unit of Measure (UOM) untuk dropdown.
+    """Ambil list Unit of Measure (UOM) untuk dropdown (dari katalog di memori).
     
-    Response: { success, data: [{ id, name }], count }
+    Response: { success, data: [{ id, name, factor }], count }
     """
-    try:
-        # Deteksi field UOM dari sale.order
-        so_field_map = get_sale_order_field_map()
-        uom_field = so_field_map.get('uom')
-        
-        if not uom_field:
-            return ordered_jsonify({'success': True, 'data': [], 'count': 0})
-        
-        # Ambil metadata field untuk dapatkan relation model
-        fields_meta = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
-            'sale.order', 'fields_get',
-            [uom_field], {'attributes': ['relation', 'string']}
-        )
-        
-        relation_model = fields_meta.get(uom_field, {}).get('relation')
-        if not relation_model:
-            return ordered_jsonify({'success': True, 'data': [], 'count': 0})
-        
-        # Ambil semua record dari model relation (biasanya uom.uom)
-        # Cek field yang tersedia di model
-        try:
-            model_fields = models.execute_kw(
-                ODOO_DB, uid, ODOO_API_KEY,
-                relation_model, 'fields_get',
-                [], {'attributes': ['store', 'type']}
-            )
-            # Tentukan field yang akan di-request (hanya yang ada)
-            fields_to_read = ['id']
-            if 'name' in model_fields:
-                fields_to_read.append('name')
-            if 'display_name' in model_fields:
-                fields_to_read.append('display_name')
-            if 'factor' in model_fields:
-                fields_to_read.append('factor')
-            
-            # Tentukan order by (hanya field yang stored, bukan computed)
-            order_by = None
-            if 'name' in model_fields:
-                # Cek apakah name stored (bukan computed)
-                name_meta = model_fields.get('name', {})
-                if name_meta.get('store', True):  # Default True jika tidak ada info
-                    order_by = 'name'
-            # Jangan pakai display_name untuk order karena biasanya computed
-            if not order_by and 'id' in model_fields:
-                order_by = 'id'
-        except Exception:
-            fields_to_read = ['id']
-            order_by = None
-        
-        # Build search_read params
-        search_params = {'fields': fields_to_read}
-        if order_by:
-            search_params['order'] = order_by
-        
-        records = models.execute_kw(
-            ODOO_DB, uid, ODOO_API_KEY,
-            relation_model, 'search_read',
-            [[]],
-            search_params
-        )
-        
-        # Format response
-        options = []
-        for rec in records:
-            name = rec.get('display_name') or rec.get('name') or ''
-            options.append({
-                'id': rec.get('id'),
-                'name': name,
-                'factor': rec.get('factor')
-            })
-        
-        return ordered_jsonify({'success': True, 'data': options, 'count': len(options)})
-    
-    except Exception as e:
-        return ordered_jsonify({'success': False, 'error': 'Failed to fetch UOMs', 'details': str(e)}), 500
+    return lookup_response(option_lookup(uom_catalog, 'UOMs'))
@@ -1,9 +1,20 @@
 """
 System routes (health check, home page)
 """
-from flask import Blueprint
+import hmac
+from flask import Blueprint, request
+from config import Config
 from app.functions.odoo_functions import ordered_jsonify
-from app.models.odoo_connection import uid
+from app.functions.schema_cache import schema_cache, invalidate_fields_meta
+from app.functions.reference_data import reference_data
+from app.functions.idempotency import idempotency_store
+from app.functions.partner_index import partner_index
+from app.functions.pickup_catalog import pickup_catalog
+from app.functions.option_catalog import commodity_catalog, uom_catalog, transport_catalog
+from app.functions.sync_engine import sync_engine
+from app.models.odoo_connection import odoo
+
+CACHE_TOKEN_HEADER = 'X-Cache-Invalidate-Token'
 
 # Create blueprint
 system_bp = Blueprint('system', __name__)
@@ -17,17 +28,22 @@ def home():
         'endpoints': {
             'contacts': {
                 'GET /states': 'Get all states for dropdown',
+                'GET /countries': 'Get all countries for dropdown',
+                'GET /states/country/<id>': 'Get states for a specific country',
                 'GET /contacts': 'Get all contacts',
                 'POST /contacts/create': 'Create new contact',
+                'POST /contacts/bulk': 'Create or update many contacts (chunked batch writes)',
                 'GET /contacts/<id>': 'Get specific contact by ID'
             },
             'quotes': {
                 'POST /quote/create': 'Create complete quote (contact + sales order)',
+                'POST /quotes/bulk': 'Create many quotes in one request (batched Odoo writes)',
                 'GET /quotes': 'Get all quotes (sales orders)',
                 'GET /quotes/test-fields': 'Test which custom fields are available'
             },
             'system': {
-                'GET /health': 'Health check'
+                'GET /health': 'Health check',
+                'POST /cache/invalidate': 'Invalidate cached Odoo metadata, catalogs and mirror of ?model= (requires X-Cache-Invalidate-Token)'
             }
         },
         'field_mapping': {
@@ -40,9 +56,74 @@ def home():
 
 @system_bp.route('/health')
 def health_check():
-    """Health check endpoint"""
+    """
+    Health check endpoint (degraded jika login Odoo terakhir gagal atau circuit breaker tidak closed).
+
+    Hanya membaca uid yang sudah di-cache dan status breaker: health check tidak
+    pernah memicu autentikasi ke Odoo. Sebelum call pertama koneksi dilaporkan 'pending'.
+    """
+    breaker = odoo.breaker.stats()
+    auth = odoo.auth_status()
+    if auth['authenticated']:
+        connection = 'connected'
+    elif auth['last_error']:
+        connection = 'disconnected'
+    else:
+        connection = 'pending'
+    healthy = connection != 'disconnected' and breaker['state'] == 'closed'
+    return ordered_jsonify({
+        'status': 'healthy' if healthy else 'degraded',
+        'odoo_connection': connection,
+        'user_id': auth['user_id'],
+        'auth_error': auth['last_error'],
+        'circuit_breaker': breaker,
+        'pool': odoo.stats(),
+        'schema_cache': schema_cache.stats(),
+        'reference_data': reference_data.stats(),
+        'idempotency': idempotency_store.stats(),
+        'partner_index': partner_index.stats(),
+        'pickup_catalog': pickup_catalog.stats(),
+        'option_catalogs': {
+            'commodity': commodity_catalog.stats(),
+            'uom': uom_catalog.stats(),
+            'transportation': transport_catalog.stats()
+        },
+        'mirror': sync_engine.stats()
+    })
+
+@system_bp.route('/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """
+    Invalidate cached fields_get metadata, katalog dan mirror untuk ?model=<name>.
+
+    Invalidasi memicu reload penuh dari Odoo, jadi hanya dilayani dengan token
+    CACHE_INVALIDATE_TOKEN (header X-Cache-Invalidate-Token) dan per model.
+    """
+    token = request.headers.get(CACHE_TOKEN_HEADER, '')
+    if not Config.CACHE_INVALIDATE_TOKEN or not hmac.compare_digest(token, Config.CACHE_INVALIDATE_TOKEN):
+        return ordered_jsonify({
+            'success': False,
+            'error': f'Cache invalidation requires a valid {CACHE_TOKEN_HEADER} header'
+        }), 403
+    model = (request.args.get('model') or '').strip()
+    if not model:
+        return ordered_jsonify({
+            'success': False,
+            'error': 'Parameter model is required'
+        }), 400
+    removed = invalidate_fields_meta(model)
+    if model in ('res.country', 'res.country.state'):
+        reference_data.invalidate()
+    if model == 'res.partner':
+        partner_index.invalidate()
+    if model == 'sale.order' or model in pickup_catalog.models():
+        pickup_catalog.invalidate()
+    for catalog in (commodity_catalog, uom_catalog, transport_catalog):
+        if model in catalog.models():
+            catalog.invalidate()
+    sync_engine.invalidate(model)
     return ordered_jsonify({
-        'status': 'healthy',
-        'odoo_connection': 'connected' if uid else 'disconnected',
-        'user_id': uid
+        'success': True,
+        'model': model,
+        'removed': removed
     })
@@ -0,0 +1,20 @@
+"""
+Odoo External API - ASGI entry point (async Odoo RPC)
+
+Jalankan dengan server ASGI, mis.:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+from config import Config
+from main import app as flask_app
+from app.models.odoo_connection import ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_API_KEY
+from app.models.async_odoo_client import AsyncOdooClient
+from app.models.circuit_breaker import CircuitBreaker, RetryPolicy
+from app.routes.async_routes import create_asgi_app
+
+app = create_asgi_app(flask_app, lambda: AsyncOdooClient(
+    ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_API_KEY,
+    pool_size=Config.ODOO_ASYNC_POOL_SIZE,
+    timeout=Config.ODOO_ASYNC_TIMEOUT,
+    breaker=CircuitBreaker(Config.ODOO_BREAKER_THRESHOLD, Config.ODOO_BREAKER_RESET_TIMEOUT),
+    retry=RetryPolicy(Config.ODOO_RETRY_ATTEMPTS, Config.ODOO_RETRY_BACKOFF, Config.ODOO_RETRY_BACKOFF_MAX)
+))
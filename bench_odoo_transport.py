@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark transport Odoo: XML-RPC vs JSON-RPC (ukuran payload dan waktu decode)
+
+Contoh:
+    python bench_odoo_transport.py
+    python bench_odoo_transport.py --records 2000
+    python bench_odoo_transport.py --live   # pakai Odoo dari Config
+"""
+
+import argparse
+import json
+import time
+import timeit
+import xmlrpc.client
+
+from app.functions.serializers import loads
+
+def build_partner_records(n):
+    """Hasil `read` res.partner sintetis (field yang dipakai /contacts)"""
+    return [{
+        'id': i,
+        'name': f'Pelanggan {i}',
+        'email': f'pelanggan{i}@example.com',
+        'phone': '081234567890',
+        'x_studio_your_business': 'I am a business',
+        'country_id': [100, 'Indonesia'],
+        'state_id': [5, 'DKI Jakarta']
+    } for i in range(1, n + 1)]
+
+def build_sale_order_records(n):
+    """Hasil `read` sale.order sintetis (field yang dipakai /quotes)"""
+    return [{
+        'id': i,
+        'name': f'S{i:05d}',
+        'partner_id': [1000 + i, f'Pelanggan {i}'],
+        'create_date': '2026-10-01 08:15:30',
+        'x_studio_transportation_method': 'ocean',
+        'x_studio_pickup_origin': [12, 'Tanjung Priok, Jakarta'],
+        'x_studio_pickup_destination': [34, 'Tanjung Perak, Surabaya'],
+        'x_studio_terms_condition': 'Pieces, weights, dimensions, special handling',
+        'x_studio_commodity': [7, 'General Cargo'],
+        'x_studio_many2one_field_1ef_1j58pa43n': [1, 'Unit(s)'],
+        'x_studio_qty': 100,
+        'x_studio_kgs_chg_1': 50.5,
+        'x_studio_kgs_wt': 75.25,
+        'x_studio_ratio': 1.5
+    } for i in range(1, n + 1)]
+
+def bench_decode(label, records, repeat):
+    """Bandingkan response XML-RPC vs JSON-RPC untuk hasil read yang sama"""
+    xml_body = xmlrpc.client.dumps((records,), methodresponse=True, allow_none=True).encode('utf-8')
+    json_body = json.dumps({'jsonrpc': '2.0', 'id': 1, 'result': records}).encode('utf-8')
+
+    xml_ms = min(timeit.repeat(lambda: xmlrpc.client.loads(xml_body), number=1, repeat=repeat)) * 1000
+    json_ms = min(timeit.repeat(lambda: loads(json_body), number=1, repeat=repeat)) * 1000
+
+    print(f"{label} ({len(records)} record)")
+    print(f"  {'xmlrpc':<10}{len(xml_body):>12} bytes{xml_ms:>10.2f} ms decode")
+    print(f"  {'jsonrpc':<10}{len(json_body):>12} bytes{json_ms:>10.2f} ms decode")
+    print(f"  jsonrpc: {len(xml_body) / len(json_body):.1f}x lebih kecil, {xml_ms / json_ms:.1f}x lebih cepat\n")
+
+def bench_live(records, repeat):
+    """Jalankan search_read yang sama lewat kedua transport ke Odoo sungguhan"""
+    from config import Config
+    from app.models.odoo_client import OdooClient
+
+    for transport in ('xmlrpc', 'jsonrpc'):
+        client = OdooClient(Config.ODOO_URL, Config.ODOO_DB, Config.ODOO_USERNAME, Config.ODOO_API_KEY, pool_size=1, transport=transport)
+        client.uid  # autentikasi di luar pengukuran
+        for model, fields in (('res.partner', ['id', 'name', 'email', 'phone', 'country_id', 'state_id']),
+                              ('sale.order', ['id', 'name', 'partner_id', 'create_date', 'state'])):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                rows = client.execute_kw(model, 'search_read', [[]], {'fields': fields, 'limit': records})
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"  {transport:<10}{model:<14}{len(rows):>6} record{min(timings):>10.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=500, help='jumlah record per read')
+    parser.add_argument('--repeat', type=int, default=10, help='jumlah pengulangan (diambil yang tercepat)')
+    parser.add_argument('--live', action='store_true', help='ukur round trip ke Odoo sungguhan')
+    args = parser.parse_args()
+
+    bench_decode('res.partner read', build_partner_records(args.records), args.repeat)
+    bench_decode('sale.order read', build_sale_order_records(args.records), args.repeat)
+    if args.live:
+        print('Round trip search_read ke Odoo')
+        bench_live(args.records, args.repeat)
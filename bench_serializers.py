@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark serializer JSON untuk payload tipikal GET /quotes
+
+Contoh:
+    python bench_serializers.py
+    python bench_serializers.py --records 1000 --repeat 20
+"""
+
+import argparse
+import json
+import timeit
+
+from app.functions.serializers import SERIALIZERS
+
+def build_quotes_payload(n):
+    """Bangun response /quotes sintetis dengan bentuk yang sama seperti API"""
+    quotes = []
+    for i in range(1, n + 1):
+        quotes.append({
+            'id': i,
+            'name': f'S{i:05d}',
+            'create_date': '2026-10-01 08:15:30',
+            'state': 'draft',
+            'amount_total': 1250000.0 + i,
+            'transportation_method': 'Ocean',
+            'pickup_origin': [12, 'Tanjung Priok, Jakarta'],
+            'pickup_destination': [34, 'Tanjung Perak, Surabaya'],
+            'terms_condition': 'Pieces, weights, dimensions, special handling — barang pecah belah',
+            'commodity': 7,
+            'uom': 'Unit(s)',
+            'qty': 100,
+            'kgs_chg': 50.5,
+            'kgs_wt': 75.25,
+            'ratio': 1.5,
+            'customer': {
+                'id': 1000 + i,
+                'name': f'Pelanggan {i}',
+                'email': f'pelanggan{i}@example.com',
+                'phone': '081234567890',
+                'state': 'DKI Jakarta',
+                'state_code': 'JK'
+            }
+        })
+    return {
+        'success': True,
+        'data': quotes,
+        'count': len(quotes),
+        'limit': n,
+        'offset': 0,
+        'next_cursor': None
+    }
+
+def bench(payload, repeat):
+    """Cetak waktu rata-rata dan ukuran output tiap backend"""
+    variants = [('json indent=2 (lama)', lambda: json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8'))]
+    for name, fn in SERIALIZERS.items():
+        variants.append((f'{name} compact', lambda fn=fn: fn(payload)))
+        variants.append((f'{name} pretty', lambda fn=fn: fn(payload, pretty=True)))
+
+    baseline = None
+    print(f"{'serializer':<24}{'ms/call':>10}{'bytes':>12}{'speedup':>10}")
+    for name, fn in variants:
+        size = len(fn())
+        elapsed = min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+        if baseline is None:
+            baseline = elapsed
+        print(f"{name:<24}{elapsed:>10.2f}{size:>12}{baseline / elapsed:>9.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=500, help='jumlah quote per payload')
+    parser.add_argument('--repeat', type=int, default=10, help='jumlah pengulangan (diambil yang tercepat)')
+    args = parser.parse_args()
+
+    print(f"Payload /quotes dengan {args.records} record\n")
+    bench(build_quotes_payload(args.records), args.repeat)
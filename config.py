@@ -13,3 +13,105 @@ class Config:
     DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
     HOST = os.getenv('FLASK_HOST', '0.0.0.0')
     PORT = int(os.getenv('FLASK_PORT', 5000))
+    
+    # Protokol RPC ke Odoo: xmlrpc atau jsonrpc
+    ODOO_TRANSPORT = os.getenv('ODOO_TRANSPORT', 'xmlrpc').lower()
+    
+    # Jeda (detik) sebelum mencoba autentikasi ulang setelah gagal
+    ODOO_AUTH_RETRY_INTERVAL = float(os.getenv('ODOO_AUTH_RETRY_INTERVAL', 10))
+    
+    # Ketahanan call Odoo: timeout per call, retry method read-only, circuit breaker
+    ODOO_CALL_TIMEOUT = float(os.getenv('ODOO_CALL_TIMEOUT', 30))
+    ODOO_RETRY_ATTEMPTS = int(os.getenv('ODOO_RETRY_ATTEMPTS', 3))
+    ODOO_RETRY_BACKOFF = float(os.getenv('ODOO_RETRY_BACKOFF', 0.5))  # detik, dikali 2 tiap percobaan
+    ODOO_RETRY_BACKOFF_MAX = float(os.getenv('ODOO_RETRY_BACKOFF_MAX', 5))
+    ODOO_BREAKER_THRESHOLD = int(os.getenv('ODOO_BREAKER_THRESHOLD', 5))  # kegagalan berturut-turut
+    ODOO_BREAKER_RESET_TIMEOUT = float(os.getenv('ODOO_BREAKER_RESET_TIMEOUT', 30))
+    
+    # Odoo Connection Pool
+    ODOO_POOL_SIZE = int(os.getenv('ODOO_POOL_SIZE', 8))
+    ODOO_POOL_TIMEOUT = float(os.getenv('ODOO_POOL_TIMEOUT', 30))
+    
+    # Batas waktu (detik) menunggu call Odoo paralel dalam satu request
+    ODOO_FANOUT_TIMEOUT = float(os.getenv('ODOO_FANOUT_TIMEOUT', 60))
+    
+    # Mode async (asgi.py): jumlah koneksi HTTP ke Odoo dan timeout per call
+    ODOO_ASYNC_POOL_SIZE = int(os.getenv('ODOO_ASYNC_POOL_SIZE', 100))
+    ODOO_ASYNC_TIMEOUT = float(os.getenv('ODOO_ASYNC_TIMEOUT', 60))
+    
+    # Cache metadata Odoo (fields_get), dalam detik
+    SCHEMA_CACHE_TTL = float(os.getenv('SCHEMA_CACHE_TTL', 300))
+    
+    # Refresh data referensi (country/state) di background, dalam detik
+    REFERENCE_DATA_REFRESH_INTERVAL = float(os.getenv('REFERENCE_DATA_REFRESH_INTERVAL', 3600))
+    
+    # Idempotency-Key untuk POST create: umur response tersimpan (detik), jumlah
+    # key maksimum (LRU) dan batas waktu menunggu request duplikat yang sedang berjalan
+    IDEMPOTENCY_TTL = float(os.getenv('IDEMPOTENCY_TTL', 86400))
+    IDEMPOTENCY_MAX_ENTRIES = int(os.getenv('IDEMPOTENCY_MAX_ENTRIES', 10000))
+    IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv('IDEMPOTENCY_WAIT_TIMEOUT', 120))
+    
+    # Jumlah quote maksimum per request POST /quotes/bulk
+    BULK_QUOTE_MAX_ITEMS = int(os.getenv('BULK_QUOTE_MAX_ITEMS', 500))
+    
+    # POST /contacts/bulk: jumlah contact maksimum per request dan ukuran potongan
+    # create/write/search ke Odoo (bisa di-override ?chunk_size= hingga batas maks)
+    BULK_CONTACT_MAX_ITEMS = int(os.getenv('BULK_CONTACT_MAX_ITEMS', 50000))
+    BULK_CONTACT_CHUNK_SIZE = int(os.getenv('BULK_CONTACT_CHUNK_SIZE', 500))
+    BULK_CONTACT_MAX_CHUNK_SIZE = int(os.getenv('BULK_CONTACT_MAX_CHUNK_SIZE', 2000))
+    
+    # Index partner (name + email) di memori untuk dedupe contact saat create quote
+    PARTNER_INDEX_ENABLED = os.getenv('PARTNER_INDEX_ENABLED', 'True').lower() == 'true'
+    PARTNER_INDEX_REFRESH_INTERVAL = float(os.getenv('PARTNER_INDEX_REFRESH_INTERVAL', 60))  # polling write_date
+    PARTNER_INDEX_FULL_RELOAD_INTERVAL = float(os.getenv('PARTNER_INDEX_FULL_RELOAD_INTERVAL', 21600))
+    PARTNER_INDEX_BATCH_SIZE = int(os.getenv('PARTNER_INDEX_BATCH_SIZE', 2000))
+    
+    # Katalog pickup di memori: cek perubahan (jumlah record + write_date terbaru)
+    # tiap PICKUP_CATALOG_CHECK_INTERVAL detik, reload penuh paling lama tiap PICKUP_CATALOG_TTL
+    PICKUP_CATALOG_TTL = float(os.getenv('PICKUP_CATALOG_TTL', 3600))
+    PICKUP_CATALOG_CHECK_INTERVAL = float(os.getenv('PICKUP_CATALOG_CHECK_INTERVAL', 60))
+    
+    # Katalog dropdown commodity/UoM/transportation (map factor UoM, normalisasi transportation) di memori;
+    # dimuat ulang dari Odoo jika umurnya melewati OPTION_CATALOG_TTL detik
+    OPTION_CATALOG_TTL = float(os.getenv('OPTION_CATALOG_TTL', 600))
+    
+    # Mirror lokal (SQLite) yang di-sync incremental dari Odoo (polling write_date)
+    # untuk endpoint baca; data mirror dipakai selama umurnya <= SYNC_MAX_STALENESS detik.
+    # SYNC_MODELS (dipisah koma) membatasi model yang boleh di-mirror; kosong = semua
+    # model yang dibaca endpoint listing/lookup.
+    # Model proses: mirror dan thread sync-nya per proses. Dengan N worker (mis. gunicorn
+    # -w N) ada N thread polling ke Odoo dan N salinan di memori; tiap worker memakai file
+    # sendiri (SYNC_DB_PATH, SYNC_DB_PATH.1, ... dikunci flock) dan /cache/invalidate hanya
+    # me-reset worker yang menerima request. Untuk tabel besar, pakai sedikit worker atau
+    # jalankan mode async (satu proses)
+    SYNC_ENABLED = os.getenv('SYNC_ENABLED', 'False').lower() == 'true'
+    SYNC_DB_PATH = os.getenv('SYNC_DB_PATH', 'odoo_mirror.sqlite3')
+    SYNC_INTERVAL = float(os.getenv('SYNC_INTERVAL', 10))
+    SYNC_MAX_STALENESS = int(os.getenv('SYNC_MAX_STALENESS', 60))
+    SYNC_RECONCILE_INTERVAL = float(os.getenv('SYNC_RECONCILE_INTERVAL', 3600))  # deteksi record yang dihapus
+    SYNC_BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE', 2000))
+    SYNC_WATERMARK_OVERLAP = int(os.getenv('SYNC_WATERMARK_OVERLAP', 60))  # detik, untuk commit yang terlambat
+    SYNC_MODELS = os.getenv('SYNC_MODELS', '')
+
+    # POST /cache/invalidate memicu reload penuh dari Odoo (mis. res.partner), jadi hanya
+    # dilayani jika token ini di-set dan dikirim di header X-Cache-Invalidate-Token
+    CACHE_INVALIDATE_TOKEN = os.getenv('CACHE_INVALIDATE_TOKEN', '')
+    
+    # Pagination endpoint list
+    DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', 100))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 1000))
+    
+    # Ukuran batch search_read untuk export streaming (NDJSON)
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 500))
+    
+    # Record per batch (row group Parquet) untuk export CSV/Parquet/Arrow
+    COLUMNAR_BATCH_SIZE = int(os.getenv('COLUMNAR_BATCH_SIZE', 5000))
+    
+    # Serializer JSON response: auto (orjson jika ter-install), orjson, stdlib
+    JSON_SERIALIZER = os.getenv('JSON_SERIALIZER', 'auto')
+    
+    # Kompresi response (gzip/brotli) via Accept-Encoding (opt-in)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'False').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))  # byte
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))  # gzip 1-9
+    COMPRESSION_BR_LEVEL = int(os.getenv('COMPRESSION_BR_LEVEL', 4))  # brotli 0-11
@@ -6,6 +6,7 @@ from config import Config
 from app.routes.system_routes import system_bp
 from app.routes.contact_routes import contact_bp
 from app.routes.quote_routes import quote_bp
+from app.functions.compression import init_compression
 
 # Create Flask app
 app = Flask(__name__)
@@ -15,5 +16,8 @@ app.register_blueprint(system_bp)
 app.register_blueprint(contact_bp)
 app.register_blueprint(quote_bp)
 
+# Kompresi response gzip/brotli
+init_compression(app)
+
 if __name__ == '__main__':
     app.run(debug=Config.DEBUG, host=Config.HOST, port=Config.PORT)
@@ -0,0 +1,146 @@
+"""
+Test evaluator domain/order OdooMirror terhadap hasil yang diharapkan dari Odoo
+
+Jalankan dengan: python -m pytest test_odoo_mirror.py
+"""
+import time
+import pytest
+from app.models.odoo_mirror import OdooMirror, MirrorMiss, claim_db_path
+
+MODEL = 'res.partner'
+TYPES = {
+    'name': 'char',
+    'email': 'char',
+    'state': 'selection',
+    'active': 'boolean',
+    'country_id': 'many2one',
+    'score': 'float',
+    'write_date': 'datetime',
+}
+RECORDS = [
+    {'id': 1, 'name': 'Ann', 'email': 'a@x.com', 'state': 'draft', 'active': True,
+     'country_id': [100, 'Indonesia'], 'score': 1.5, 'write_date': '2026-01-02 10:00:00'},
+    {'id': 2, 'name': 'bob', 'email': False, 'state': 'sent', 'active': True,
+     'country_id': False, 'score': 0.0, 'write_date': '2026-01-01 09:00:00'},
+    {'id': 3, 'name': 'Cid', 'email': 'C@Y.com', 'state': 'draft', 'active': False,
+     'country_id': [101, 'Singapore'], 'score': 2.0, 'write_date': '2026-01-03 00:00:00'},
+    {'id': 4, 'name': 'dan', 'email': 'd@x.com', 'state': False, 'active': True,
+     'country_id': [101, 'Singapore'], 'score': 3.0, 'write_date': False},
+    {'id': 5, 'name': 'Eve_1', 'email': 'e@x.com', 'state': 'sale', 'active': True,
+     'country_id': [100, 'Indonesia'], 'score': 1.0, 'write_date': '2026-01-02 10:00:00'},
+]
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    mirror = OdooMirror(str(tmp_path / 'mirror.sqlite3'))
+    mirror.configure(MODEL, TYPES, default_order='id')
+    mirror.upsert(MODEL, [dict(record) for record in RECORDS])
+    mirror.mark(MODEL, synced_at=time.time())
+    return mirror
+
+
+def search(mirror, domain, **kwargs):
+    return mirror.execute(MODEL, 'search', [domain], kwargs, max_staleness=60)
+
+
+# (domain, ID yang dikembalikan Odoo untuk search(domain, order='id'))
+DOMAIN_CASES = [
+    ([], [1, 2, 4, 5]),
+    # active_test: record yang diarsipkan hanya muncul jika domain menyebut active
+    ([['active', 'in', [True, False]]], [1, 2, 3, 4, 5]),
+    ([['active', '=', False]], [3]),
+    # "!=" nilai non-False juga mencocokkan NULL
+    ([['email', '!=', 'a@x.com']], [2, 4, 5]),
+    ([['email', '=', False]], [2]),
+    ([['email', '!=', False]], [1, 4, 5]),
+    ([['email', 'ilike', 'X.COM']], [1, 4, 5]),
+    ([['email', 'like', 'X.COM']], []),
+    ([['email', 'not ilike', 'x.com']], [2]),
+    ([['name', '=like', 'Eve_%']], [5]),
+    ([['name', '=ilike', 'ann']], [1]),
+    ([['country_id', '=', 101]], [4]),
+    ([['country_id', 'in', [101, False]]], [2, 4]),
+    ([['country_id', 'not in', [100]]], [2, 4]),
+    ([['state', 'in', ['draft', 'sent']]], [1, 2]),
+    (['|', ['state', '=', 'sale'], ['score', '>', 2.5]], [4, 5]),
+    (['!', ['state', '=', 'draft']], [2, 4, 5]),
+    ([['write_date', '>=', '2026-01-02 00:00:00']], [1, 5]),
+    ([['id', '>', 2], ['score', '<=', 3.0]], [4, 5]),
+    ([['score', '=', 0]], [2]),
+    ([(1, '=', 1)], [1, 2, 4, 5]),
+]
+
+
+@pytest.mark.parametrize('domain, expected', DOMAIN_CASES)
+def test_domain_matches_odoo(mirror, domain, expected):
+    assert search(mirror, domain, order='id') == expected
+
+
+# (order, ID yang dikembalikan Odoo; NULL di akhir untuk asc, di awal untuk desc)
+ORDER_CASES = [
+    ('id desc', [5, 4, 2, 1]),
+    ('write_date desc, id', [4, 1, 5, 2]),
+    ('write_date, id desc', [2, 5, 1, 4]),
+    ('score desc', [4, 1, 5, 2]),
+]
+
+
+@pytest.mark.parametrize('order, expected', ORDER_CASES)
+def test_order_matches_odoo(mirror, order, expected):
+    assert search(mirror, [], order=order) == expected
+
+
+def test_offset_limit_and_default_order(mirror):
+    assert search(mirror, [], order='write_date, id', offset=1, limit=2) == [1, 5]
+    assert search(mirror, []) == [1, 2, 4, 5]
+
+
+@pytest.mark.parametrize('order', ['name', 'email desc, id', 'state', 'country_id'])
+def test_collated_and_relational_order_goes_to_odoo(mirror, order):
+    with pytest.raises(MirrorMiss):
+        search(mirror, [], order=order)
+
+
+@pytest.mark.parametrize('domain', [
+    [['name', '>', 'b']],
+    [['score', '=', False]],
+    [['country_id.name', '=', 'Indonesia']],
+    [['phone', '=', '1']],
+    [['email', 'child_of', 1]],
+])
+def test_unsupported_domain_goes_to_odoo(mirror, domain):
+    with pytest.raises(MirrorMiss):
+        search(mirror, domain, order='id')
+
+
+def test_search_read_count_and_read(mirror):
+    rows = mirror.execute(MODEL, 'search_read', [[['country_id', '=', 100]]],
+                          {'fields': ['name', 'country_id'], 'order': 'id desc'}, max_staleness=60)
+    assert rows == [
+        {'id': 5, 'name': 'Eve_1', 'country_id': [100, 'Indonesia']},
+        {'id': 1, 'name': 'Ann', 'country_id': [100, 'Indonesia']},
+    ]
+    assert mirror.execute(MODEL, 'search_count', [[['state', '=', 'draft']]], {}, max_staleness=60) == 1
+    assert mirror.execute(MODEL, 'read', [[3]], {'fields': ['active']}, max_staleness=60) == [{'id': 3, 'active': False}]
+    with pytest.raises(MirrorMiss):
+        mirror.execute(MODEL, 'read', [[99]], {'fields': ['name']}, max_staleness=60)
+
+
+def test_stale_mirror_goes_to_odoo(mirror):
+    mirror.mark(MODEL, synced_at=time.time() - 120)
+    with pytest.raises(MirrorMiss):
+        search(mirror, [], order='id')
+
+
+def test_each_process_claims_its_own_db_file(tmp_path):
+    path = str(tmp_path / 'mirror.sqlite3')
+    first, first_lock = claim_db_path(path)
+    second, second_lock = claim_db_path(path)
+    assert (first, second) == (path, path + '.1')
+    first_lock.close()
+    # Slot yang dilepas (mis. worker di-restart) dipakai lagi beserta isinya
+    again, again_lock = claim_db_path(path)
+    assert again == path
+    again_lock.close()
+    second_lock.close()